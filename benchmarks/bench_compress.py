@@ -0,0 +1,106 @@
+"""
+Micro-benchmark: size-targeted JPEG compressor vs. the previous linear scale loop
+
+Usage:
+    python benchmarks/bench_compress.py                      # synthetic corpus
+    python benchmarks/bench_compress.py --corpus decks/      # images, .pdf and .pptx files in a folder
+    python benchmarks/bench_compress.py --max-bytes 80000 --json results.json
+"""
+
+import argparse
+import json
+import sys
+import time
+from io import BytesIO
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from PIL import Image, ImageDraw
+from pitch_deck_analyzer.analysis.compress import compress_to_limit
+from pitch_deck_analyzer.config import THUMB_MAX_DIM, THUMB_QUALITY
+
+def legacy_compress_to_limit(img: Image.Image, max_bytes: int) -> bytes:
+    """The loop OpenRouterClient._compress_to_limit used before analysis.compress"""
+    scale, quality = 1.0, THUMB_QUALITY
+    while True:
+        new_w, new_h = int(img.width * scale), int(img.height * scale)
+        resized = img.resize((max(1, new_w), max(1, new_h)), Image.LANCZOS)
+        bio = BytesIO()
+        resized.save(bio, format="JPEG", quality=max(30, int(quality * scale)))
+        data = bio.getvalue()
+
+        if len(data) <= max_bytes or scale <= 0.2:
+            return data
+        scale -= 0.15
+
+def synthetic_corpus():
+    """Deck-like images: photos (noise), charts (flat fills + lines) and screenshots (text-like detail)"""
+    for i, size in enumerate([(2400, 1600), (1920, 1080), (1600, 1200)]):
+        yield f"photo_{i}.png", Image.effect_noise(size, 30 + 10 * i).convert("RGB")
+
+        chart = Image.new("RGB", size, "white")
+        draw = ImageDraw.Draw(chart)
+        for b in range(12):
+            x = 80 + b * (size[0] - 160) // 12
+            draw.rectangle([x, size[1] - 100 - 70 * b, x + 60, size[1] - 80], fill=(30 + 18 * b, 90, 200 - 12 * b))
+        draw.line([(0, size[1] // 2), (size[0], size[1] // 3)], fill="red", width=6)
+        yield f"chart_{i}.png", chart
+
+        shot = Image.effect_noise(size, 90).convert("RGB").point(lambda v: 255 if v > 150 else 20)
+        yield f"screenshot_{i}.png", shot
+
+def corpus_from_dir(folder: Path):
+    """Images in `folder`, plus images embedded in any .pdf/.pptx decks there"""
+    from pitch_deck_analyzer.extractors import extract_from_pdf, extract_from_pptx
+    for path in sorted(folder.iterdir()):
+        suffix = path.suffix.lower()
+        if suffix in (".png", ".jpg", ".jpeg", ".gif"):
+            yield path.name, Image.open(path)
+        elif suffix in (".pdf", ".pptx"):
+            extract = extract_from_pdf if suffix == ".pdf" else extract_from_pptx
+            for handle in extract(str(path))["images"]:
+                yield f"{path.name}:{handle.name}", handle.open()
+
+def bench(fn, img, max_bytes, repeat):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        data = fn(img, max_bytes)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, len(data)
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark image compression for vision requests")
+    parser.add_argument("--corpus", type=Path, default=None, help="Folder of images and/or decks (default: synthetic)")
+    parser.add_argument("--max-bytes", type=int, default=150_000, help="Byte limit to target")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per image; best time is reported")
+    parser.add_argument("--json", type=Path, default=None, help="Write machine-readable results here")
+    args = parser.parse_args()
+
+    corpus = corpus_from_dir(args.corpus) if args.corpus else synthetic_corpus()
+    rows = []
+    print(f"{'image':40} {'legacy ms':>10} {'new ms':>10} {'legacy B':>10} {'new B':>10}")
+    for name, img in corpus:
+        img = img.convert("RGB")
+        img.thumbnail((THUMB_MAX_DIM, THUMB_MAX_DIM))  # same preprocessing as _image_to_dataurl
+        old_t, old_b = bench(legacy_compress_to_limit, img, args.max_bytes, args.repeat)
+        new_t, new_b = bench(compress_to_limit, img, args.max_bytes, args.repeat)
+        rows.append({"image": name, "legacy_s": old_t, "new_s": new_t, "legacy_bytes": old_b, "new_bytes": new_b})
+        print(f"{name[:40]:40} {old_t * 1000:10.1f} {new_t * 1000:10.1f} {old_b:10d} {new_b:10d}")
+
+    if not rows:
+        print("No images found")
+        return
+    total = {k: sum(r[k] for r in rows) for k in ("legacy_s", "new_s", "legacy_bytes", "new_bytes")}
+    over = {k: sum(1 for r in rows if r[k] > args.max_bytes) for k in ("legacy_bytes", "new_bytes")}
+    print(f"\nTotal encode time: legacy {total['legacy_s'] * 1000:.1f} ms, new {total['new_s'] * 1000:.1f} ms")
+    print(f"Total bytes sent:  legacy {total['legacy_bytes']}, new {total['new_bytes']}")
+    print(f"Over limit:        legacy {over['legacy_bytes']}, new {over['new_bytes']} (of {len(rows)})")
+
+    if args.json:
+        args.json.write_text(json.dumps({"max_bytes": args.max_bytes, "images": rows, "total": total}, indent=2))
+
+if __name__ == "__main__":
+    main()
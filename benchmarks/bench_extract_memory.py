@@ -0,0 +1,102 @@
+"""
+Memory benchmark: peak RSS of the extraction stage against deck length
+
+Generates image-heavy PDFs (one unique, poorly compressible image per page, like scanned data-room
+documents) of increasing length and runs the pipeline's extraction stage over each one in a fresh
+interpreter, once keeping every image in memory and once with the EXTRACT_MAX_RETAINED_BYTES cap.
+With the cap, peak RSS should stay roughly flat as the page count grows.
+
+Usage:
+    python benchmarks/bench_extract_memory.py
+    python benchmarks/bench_extract_memory.py --pages 50 300 --cap-mb 16 --json results.json
+"""
+
+import argparse
+import json
+import random
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from io import BytesIO
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+def make_scanned_pdf(path: Path, pages: int, seed: int = 0):
+    import fitz
+    from PIL import Image
+
+    rng = random.Random(seed)
+    doc = fitz.open()
+    for i in range(pages):
+        page = doc.new_page(width=960, height=540)
+        page.insert_text((48, 64), f"Exhibit {i + 1}", fontsize=30)
+        scan = Image.frombytes("L", (700, 500), rng.randbytes(700 * 500)).convert("RGB")
+        out = BytesIO()
+        scan.save(out, format="PNG")
+        page.insert_image(fitz.Rect(100, 100, 900, 500), stream=out.getvalue())
+    doc.save(str(path), garbage=3, deflate=True)
+    doc.close()
+
+def run_child(deck: Path, cap: int) -> dict:
+    """Run the extraction stage as analyze_pitchdeck does and report peak RSS of this process"""
+    from concurrent.futures import Future
+    from pitch_deck_analyzer.extractors.images import ImageSpool
+    from pitch_deck_analyzer.pipeline import _extract_stage, _iter_pages
+
+    start = time.perf_counter()
+    with ImageSpool(cap) as spool:
+        _, images, _ = _extract_stage(_iter_pages(deck), None, Future(), None, spool)
+        spilled = spool.spilled
+    return {"seconds": time.perf_counter() - start, "images": len(images),
+            "image_mb": sum(image.size for image in images) / 1e6, "spilled": spilled,
+            "peak_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024}
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark extraction peak memory against deck length")
+    parser.add_argument("--pages", nargs="+", type=int, default=[50, 150, 300], help="Deck lengths to generate")
+    parser.add_argument("--cap-mb", type=float, default=32, help="Retained image budget for the capped runs")
+    parser.add_argument("--json", type=Path, default=None, help="Write machine-readable results here")
+    parser.add_argument("--child", type=Path, default=None, help=argparse.SUPPRESS)
+    parser.add_argument("--cap", type=int, default=None, help=argparse.SUPPRESS)
+    parser.add_argument("--make", type=Path, default=None, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.make:
+        make_scanned_pdf(args.make, args.pages[0], seed=args.pages[0])
+        return 0
+    if args.child:
+        print("RESULT=" + json.dumps(run_child(args.child, args.cap)))
+        return 0
+
+    results = []
+    with tempfile.TemporaryDirectory(prefix="pda_mem_") as tmp:
+        print(f"{'pages':>6} {'image MB':>9} {'uncapped MB':>12} {'capped MB':>10} {'spilled':>8} {'capped s':>9}")
+        for pages in args.pages:
+            deck = Path(tmp) / f"scanned_{pages}.pdf"
+            # Generated in another process too: Linux carries ru_maxrss over exec, so a large parent
+            # would inflate every child's peak
+            subprocess.run([sys.executable, __file__, "--make", str(deck), "--pages", str(pages)], check=True,
+                           capture_output=True)
+            row = {"pages": pages}
+            for label, cap in (("uncapped", 1 << 62), ("capped", int(args.cap_mb * 1024 * 1024))):
+                proc = subprocess.run([sys.executable, __file__, "--child", str(deck), "--cap", str(cap)],
+                                      capture_output=True, text=True)
+                lines = [ln for ln in proc.stdout.splitlines() if ln.startswith("RESULT=")]
+                if proc.returncode != 0 or not lines:
+                    print(f"{deck.name} ({label}): failed\n{proc.stderr[-2000:]}")
+                    return 1
+                row[label] = json.loads(lines[-1][len("RESULT="):])
+            results.append(row)
+            print(f"{pages:6} {row['capped']['image_mb']:9.0f} {row['uncapped']['peak_rss_mb']:12.0f} "
+                  f"{row['capped']['peak_rss_mb']:10.0f} {row['capped']['spilled']:8} {row['capped']['seconds']:9.2f}")
+
+    if args.json:
+        args.json.write_text(json.dumps({"cap_mb": args.cap_mb, "results": results}, indent=2))
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,146 @@
+"""
+Micro-benchmark: streaming page fetch + incremental extractor vs. full download + BeautifulSoup
+
+Pages are served from a local HTTP server and fetched the way the pipeline does. The current
+`fetch_page_text` streams the body, skips non-HTML content types and stops at the paragraph
+limit or WEB_MAX_BODY_BYTES. The previous implementation read `r.text` in full and built a
+BeautifulSoup tree. Reported per page: CPU time of the fetching thread, peak traced memory
+and whether both produce the same text (pages cut off by the byte cap may differ). The small
+tag-soup pages (paragraphs without </p>) only check that both extractors agree.
+
+Usage:
+    python benchmarks/bench_fetch_extract.py
+    python benchmarks/bench_fetch_extract.py --repeat 5 --json results.json
+"""
+
+import argparse
+import json
+import statistics
+import sys
+import threading
+import time
+import tracemalloc
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import requests
+from bs4 import BeautifulSoup
+from pitch_deck_analyzer.web.fetcher import fetch_page_text
+
+def legacy_fetch_page_text(url: str) -> str:
+    """fetch_page_text before streaming: whole body via r.text, then a BeautifulSoup tree"""
+    r = requests.get(url, timeout=12, allow_redirects=True)
+    if r.status_code != 200:
+        return ""
+    soup = BeautifulSoup(r.text, "html.parser")
+    parts = []
+    if soup.title and soup.title.text:
+        parts.append(soup.title.text.strip())
+    meta = soup.find('meta', attrs={'name': 'description'}) or soup.find('meta', attrs={'property': 'og:description'})
+    if meta and meta.get('content'):
+        parts.append(meta.get('content').strip())
+    for p in soup.find_all('p')[:10]:
+        txt = p.get_text().strip()
+        if txt and len(txt) > 30:
+            parts.append(txt)
+    return "\n\n".join(parts)
+
+def _page(paragraphs: int, filler_kb: int = 0, script_kb: int = 0) -> bytes:
+    nav = "".join(f'<li><a href="/section/{i}">Section {i}</a></li>' for i in range(filler_kb * 20))
+    script = "<script>var data = '" + "x" * (script_kb * 1024) + "';</script>" if script_kb else ""
+    paras = "".join(
+        f"<p>Paragraph {i}: Acme Robotics builds <b>autonomous</b> warehouse robots &amp; reports steady growth "
+        f"across <a href='/m'>{i % 7 + 2} markets</a>.</p><div class='ad'>{'ad ' * 40}</div>"
+        for i in range(paragraphs)
+    )
+    return (f"<!doctype html><html><head><title>Acme Robotics &mdash; news</title>"
+            f"<meta name='description' content='Acme Robotics company profile'>{script}</head>"
+            f"<body><nav><ul>{nav}</ul></nav><main>{paras}</main></body></html>").encode("utf-8")
+
+def _tag_soup(body: str) -> bytes:
+    """Small page with HTML that omits optional end tags, to check both extractors agree on it"""
+    return (f"<html><head><title>Acme Robotics</title></head>{body}").encode("utf-8")
+
+SENTENCE = "Acme Robotics builds autonomous warehouse robots for mid-size retailers."
+
+# name -> (content type, body)
+PAGES = {
+    "article (60 KB)": ("text/html; charset=utf-8", _page(120)),
+    "long page (3 MB)": ("text/html; charset=utf-8", _page(12000)),
+    "heavy head (1 MB script)": ("text/html", _page(40, script_kb=1024)),
+    "no paragraphs (4 MB nav)": ("text/html; charset=utf-8", _page(0, filler_kb=4096)),
+    "PDF link (5 MB)": ("application/pdf", b"%PDF-1.7\n" + bytes(range(256)) * 20480),
+    "last <p> unclosed": ("text/html", _tag_soup(f"<body><p>{SENTENCE}</p><p>We build robots.. {SENTENCE}</body></html>")),
+    "unclosed <p> at EOF": ("text/html", _tag_soup(f"<p>{SENTENCE}</p><p>Second: {SENTENCE}")),
+    "block inside open <p>": ("text/html", _tag_soup(f"<body><p>Intro: {SENTENCE}<div>Nested: {SENTENCE}</div></body>")),
+}
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        content_type, body = PAGES[list(PAGES)[int(self.path.strip("/"))]]
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        try:
+            self.wfile.write(body)
+        except (BrokenPipeError, ConnectionResetError):
+            pass  # the streaming fetcher hung up early
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def handle_error(self, request, client_address):
+        pass  # connections dropped by the early-stopping fetcher
+
+def measure(fn, url: str, repeat: int) -> dict:
+    """CPU time and (in separate runs, as tracing slows everything down) peak traced memory"""
+    cpu, peaks = [], []
+    text = None
+    for _ in range(repeat):
+        start = time.thread_time()
+        text = fn(url)
+        cpu.append(time.thread_time() - start)
+    for _ in range(repeat):
+        tracemalloc.start()
+        fn(url)
+        peaks.append(tracemalloc.get_traced_memory()[1])
+        tracemalloc.stop()
+    return {"cpu_ms": statistics.median(cpu) * 1000, "peak_kb": statistics.median(peaks) / 1024, "text": text}
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark web page fetch + text extraction")
+    parser.add_argument("--repeat", type=int, default=3, help="Fetches per page; medians are reported")
+    parser.add_argument("--json", type=Path, default=None, help="Write machine-readable results here")
+    args = parser.parse_args()
+
+    server = _Server(("127.0.0.1", 0), _Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base = f"http://127.0.0.1:{server.server_address[1]}"
+
+    results = []
+    print(f"{'page':26} {'legacy ms':>9} {'stream ms':>9} {'legacy KB':>10} {'stream KB':>10}  same text")
+    for i, (name, (_, body)) in enumerate(PAGES.items()):
+        url = f"{base}/{i}"
+        legacy = measure(legacy_fetch_page_text, url, max(1, args.repeat))
+        current = measure(fetch_page_text, url, max(1, args.repeat))
+        same = legacy["text"] == current["text"]
+        print(f"{name:26} {legacy['cpu_ms']:9.1f} {current['cpu_ms']:9.1f} {legacy['peak_kb']:10.0f} "
+              f"{current['peak_kb']:10.0f}  {'yes' if same else 'no'}")
+        results.append({"page": name, "bytes": len(body), "same_text": same,
+                        "legacy": {k: v for k, v in legacy.items() if k != "text"},
+                        "streaming": {k: v for k, v in current.items() if k != "text"}})
+    server.shutdown()
+
+    if args.json:
+        args.json.write_text(json.dumps(results, indent=2))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""
+Import-time check: CLI startup cost and which heavy dependencies each entry point loads
+
+Each scenario runs in a fresh interpreter with `-X importtime`; the cumulative time of the
+top-level imports is summed, interpreter startup (a bare `pass`) is subtracted, and the heavy
+modules that were loaded are listed. The script exits non-zero when a scenario loads a module
+it must not, or exceeds --max-ms, so it can run in CI.
+
+Usage:
+    python benchmarks/bench_import_time.py
+    python benchmarks/bench_import_time.py --max-ms 150 --repeat 5 --json results.json
+"""
+
+import argparse
+import json
+import re
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+HEAVY = ("fitz", "pymupdf", "pptx", "PIL.Image", "bs4", "requests", "asyncio", "dotenv")
+
+# (name, code run after the import, modules that must stay unloaded)
+SCENARIOS = [
+    ("import cli", "import pitch_deck_analyzer.cli", HEAVY),
+    ("import pipeline", "import pitch_deck_analyzer.pipeline", HEAVY),
+    ("import package exports",
+     "import pitch_deck_analyzer.analysis, pitch_deck_analyzer.extractors, pitch_deck_analyzer.web", HEAVY),
+    ("cli --help",
+     "from pitch_deck_analyzer.cli import cli\ntry:\n    cli(['--help'])\nexcept SystemExit:\n    pass", HEAVY),
+    ("batch --help",
+     "from pitch_deck_analyzer.cli import cli\ntry:\n    cli(['batch', '--help'])\nexcept SystemExit:\n    pass", HEAVY),
+]
+
+IMPORT_LINE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)")
+
+def run_scenario(code: str) -> dict:
+    """Run `code` in a fresh interpreter; returns total top-level import time (ms) and loaded heavy modules"""
+    probe = code + "\nimport sys\nprint('LOADED=' + ','.join(m for m in %r if m in sys.modules))" % (HEAVY,)
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", probe], cwd=ROOT,
+                          capture_output=True, text=True, check=True)
+    total_us = 0
+    for line in proc.stderr.splitlines():
+        m = IMPORT_LINE.match(line)
+        if m and len(m.group(3)) == 1:  # top-level import: cumulative time includes its children
+            total_us += int(m.group(2))
+    loaded = []
+    for line in proc.stdout.splitlines():
+        if line.startswith("LOADED="):
+            loaded = [m for m in line[len("LOADED="):].split(",") if m]
+    return {"ms": total_us / 1000, "loaded": loaded}
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure import time and lazily-loaded dependencies")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per scenario; the median is reported")
+    parser.add_argument("--max-ms", type=float, default=None, help="Fail if a scenario's median exceeds this")
+    parser.add_argument("--json", type=Path, default=None, help="Also write results as JSON")
+    args = parser.parse_args()
+
+    repeat = max(1, args.repeat)
+    startup = statistics.median(run_scenario("pass")["ms"] for _ in range(repeat))
+    print(f"interpreter startup: {startup:.1f} ms (subtracted below)\n")
+
+    results, failures = [], []
+    print(f"{'scenario':24} {'median ms':>10}  heavy modules loaded")
+    for name, code, forbidden in SCENARIOS:
+        runs = [run_scenario(code) for _ in range(repeat)]
+        median = max(0.0, statistics.median(r["ms"] for r in runs) - startup)
+        loaded = sorted({m for r in runs for m in r["loaded"]})
+        print(f"{name:24} {median:10.1f}  {', '.join(loaded) or '-'}")
+        results.append({"scenario": name, "median_ms": median, "loaded": loaded})
+        bad = [m for m in loaded if m in forbidden]
+        if bad:
+            failures.append(f"{name}: loaded {', '.join(bad)}")
+        if args.max_ms is not None and median > args.max_ms:
+            failures.append(f"{name}: {median:.1f} ms > {args.max_ms} ms")
+
+    if args.json:
+        args.json.write_text(json.dumps(results, indent=2))
+    for failure in failures:
+        print(f"FAIL {failure}")
+    sys.exit(1 if failures else 0)
+
+if __name__ == "__main__":
+    main()
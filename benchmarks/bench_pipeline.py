@@ -0,0 +1,182 @@
+"""
+End-to-end benchmark: the full analyze_pitchdeck pipeline against local fake services
+
+Generated small/medium/large PDF and PPTX decks (benchmarks/corpus.py) are analyzed against
+the fake OpenRouter and DuckDuckGo/web servers in benchmarks/fake_services.py, with
+configurable latency, error rate and rate limit, so runs are offline and repeatable. Each
+deck runs in a fresh interpreter (clean caches and an honest peak RSS) and the run profile
+gives per-stage latency. Results can be written as JSON and compared with an earlier run.
+
+Usage:
+    python benchmarks/bench_pipeline.py
+    python benchmarks/bench_pipeline.py --sizes small medium --repeat 3 --json after.json --compare before.json
+    python benchmarks/bench_pipeline.py --latency 0.5 --error-rate 0.05 --rate-limit 10
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import resource
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+STAGES = ("extract", "company", "vision", "web", "map_reduce", "synthesis")
+COUNTED = ("llm.chat", "llm.chat_stream", "web.fetch")
+
+def run_child(deck: Path, repeat: int, out_dir: Path, use_cache: bool, search_online: bool,
+              stream: bool, image_workers: int, batch_images: bool = True) -> dict:
+    """Analyze `deck` `repeat` times in this process (configured by the parent's environment)"""
+    from pitch_deck_analyzer.pipeline import analyze_pitchdeck
+    from pitch_deck_analyzer.profiling import Profiler
+
+    runs = []
+    for i in range(repeat):
+        profiler = Profiler(deck.name)
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            analyze_pitchdeck(str(deck), str(out_dir / f"{deck.stem}_{i}.md"), search_online=search_online,
+                              use_cache=use_cache, use_manifest=False, stream=stream,
+                              image_workers=image_workers, batch_images=batch_images, profiler=profiler)
+        runs.append({"seconds": time.perf_counter() - start, "totals": profiler.totals()})
+    peak_kb = max(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+                  resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss)
+    return {"runs": runs, "peak_rss_mb": peak_kb / 1024}
+
+def summarize(deck: Path, size: str, slides: int, child: dict) -> dict:
+    """Medians over the repeats: wall time, per-stage seconds, throughput and call counters"""
+    runs = child["runs"]
+    wall = statistics.median(r["seconds"] for r in runs)
+    stages = {}
+    for stage in STAGES:
+        values = [r["totals"][stage]["seconds"] for r in runs if stage in r["totals"]]
+        if values:
+            stages[stage] = statistics.median(values)
+    calls = {}
+    for name in COUNTED:
+        values = [r["totals"].get(name, {}) for r in runs]
+        if any(values):
+            calls[name] = {key: statistics.median(v.get(key, 0) for v in values)
+                           for key in ("count", "retries", "request_bytes", "prompt_tokens", "completion_tokens")}
+    return {"deck": deck.name, "size": size, "slides": slides, "seconds": wall,
+            "runs": [r["seconds"] for r in runs], "stages": stages, "calls": calls,
+            "slides_per_second": slides / wall if wall else 0.0,
+            "decks_per_hour": 3600 / wall if wall else 0.0,
+            "peak_rss_mb": child["peak_rss_mb"]}
+
+def git_revision() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def print_results(results: list, baseline: dict = None):
+    base = {r["deck"]: r for r in (baseline or {}).get("results", [])}
+    header = f"{'deck':12} {'wall s':>7} " + " ".join(f"{s[:9]:>9}" for s in STAGES)
+    header += f" {'slides/s':>8} {'peak MB':>8} {'LLM calls':>9} {'retries':>7}"
+    if base:
+        header += f" {'vs base':>8}"
+    print(header)
+    for r in results:
+        chat = r["calls"].get("llm.chat", {})
+        line = f"{r['deck']:12} {r['seconds']:7.2f} "
+        line += " ".join(f"{r['stages'][s]:9.2f}" if s in r["stages"] else f"{'-':>9}" for s in STAGES)
+        line += f" {r['slides_per_second']:8.1f} {r['peak_rss_mb']:8.0f} {chat.get('count', 0):9.0f} {chat.get('retries', 0):7.0f}"
+        if r["deck"] in base and base[r["deck"]]["seconds"]:
+            line += f" {(r['seconds'] / base[r['deck']]['seconds'] - 1) * 100:+7.1f}%"
+        print(line)
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the full pipeline against fake OpenRouter and web servers")
+    parser.add_argument("--corpus", type=Path, default=None, help="Where generated decks are kept (default: a temp dir)")
+    parser.add_argument("--sizes", nargs="+", default=["small", "medium", "large"], help="Deck sizes to run")
+    parser.add_argument("--formats", nargs="+", default=[".pdf", ".pptx"], choices=(".pdf", ".pptx"),
+                        type=lambda fmt: "." + fmt.lower().lstrip("."), help="Deck formats to run (pdf, pptx)")
+    parser.add_argument("--repeat", type=int, default=1, help="Runs per deck; medians are reported")
+    parser.add_argument("--latency", type=float, default=0.2, help="Seconds per fake OpenRouter request")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of OpenRouter requests answered 503")
+    parser.add_argument("--rate-limit", type=float, default=0.0, help="OpenRouter requests/second before 429s (0 = off)")
+    parser.add_argument("--web-latency", type=float, default=0.05, help="Seconds per fake search/page request")
+    parser.add_argument("--web-error-rate", type=float, default=0.0, help="Fraction of web requests answered 500")
+    parser.add_argument("--no-web", action="store_true", help="Skip the web search stage")
+    parser.add_argument("--cache", action="store_true",
+                        help="Keep the LLM/web caches across repeats (the first run warms them)")
+    parser.add_argument("--stream", action="store_true", help="Stream the synthesis (SSE)")
+    parser.add_argument("--image-workers", type=int, default=None, help="Concurrent image analyses")
+    parser.add_argument("--no-batch-images", action="store_true", help="One image per vision request")
+    parser.add_argument("--json", type=Path, default=None, help="Write machine-readable results here")
+    parser.add_argument("--compare", type=Path, default=None, help="Earlier --json output to compare wall times with")
+    parser.add_argument("--child", type=Path, default=None, help=argparse.SUPPRESS)
+    parser.add_argument("--out-dir", type=Path, default=None, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        result = run_child(args.child, max(1, args.repeat), args.out_dir, args.cache, not args.no_web,
+                           args.stream, args.image_workers, not args.no_batch_images)
+        print("RESULT=" + json.dumps(result))
+        return 0
+
+    from corpus import SIZES, make_corpus
+    from fake_services import FakeOpenRouter, FakeWeb
+
+    with tempfile.TemporaryDirectory(prefix="pda_bench_") as tmp:
+        tmp = Path(tmp)
+        corpus = args.corpus or tmp / "corpus"
+        print(f"Generating decks in {corpus} ...")
+        decks = make_corpus(corpus, args.sizes, tuple(args.formats))
+
+        openrouter = FakeOpenRouter(latency=args.latency, error_rate=args.error_rate, rate_limit=args.rate_limit)
+        web = FakeWeb(latency=args.web_latency, error_rate=args.web_error_rate)
+        results = []
+        with openrouter, web:
+            for size, deck in decks:
+                env = dict(os.environ, OPENROUTER_API_URL=openrouter.url, OPENROUTER_API_KEY="bench",
+                           OPENROUTER_MODEL="openai/gpt-4o", OPENROUTER_VISION_MODEL="openai/gpt-4o",
+                           OPENROUTER_BACKOFF_BASE="0.05", OPENROUTER_BACKOFF_MAX="1",
+                           DUCKDUCKGO_URL=web.search_url, PDA_CACHE_DIR=str(tmp / f"cache_{deck.name}"))
+                out_dir = tmp / "reports"
+                out_dir.mkdir(exist_ok=True)
+                cmd = [sys.executable, __file__, "--child", str(deck), "--out-dir", str(out_dir),
+                       "--repeat", str(max(1, args.repeat))]
+                cmd += [flag for flag, on in (("--cache", args.cache), ("--no-web", args.no_web),
+                                              ("--stream", args.stream),
+                                              ("--no-batch-images", args.no_batch_images)) if on]
+                if args.image_workers:
+                    cmd += ["--image-workers", str(args.image_workers)]
+                proc = subprocess.run(cmd, env=env, cwd=tmp, capture_output=True, text=True)
+                lines = [ln for ln in proc.stdout.splitlines() if ln.startswith("RESULT=")]
+                if proc.returncode != 0 or not lines:
+                    print(f"{deck.name}: failed\n{proc.stderr[-2000:]}")
+                    continue
+                child = json.loads(lines[-1][len("RESULT="):])
+                results.append(summarize(deck, size, SIZES[size], child))
+                print(f"  {deck.name}: {results[-1]['seconds']:.2f}s")
+            server_stats = {"openrouter": openrouter.stats.snapshot(), "web": web.stats.snapshot()}
+
+    baseline = json.loads(args.compare.read_text()) if args.compare else None
+    print()
+    print_results(results, baseline)
+    print(f"\nfake OpenRouter: {server_stats['openrouter']}\nfake web: {server_stats['web']}")
+
+    if args.json:
+        report = {"revision": git_revision(), "python": platform.python_version(), "created": time.time(),
+                  "settings": {k: v for k, v in vars(args).items()
+                               if k not in ("child", "out_dir", "json", "compare", "corpus")},
+                  "results": results, "servers": server_stats}
+        args.json.write_text(json.dumps(report, indent=2, default=str))
+        print(f"Wrote {args.json}")
+    return 0 if len(results) == len(decks) else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,122 @@
+"""
+Generated benchmark decks: small, medium and large PDF and PPTX files
+
+Decks are deterministic (seeded) so results stay comparable between commits. Every slide
+has a title, a few lines of deck-like text, a repeated logo (exercises image dedup) and a
+unique chart image; the large decks are long enough to take the parallel PDF extraction
+and map-reduce summarization paths.
+
+Usage:
+    python benchmarks/corpus.py bench_corpus/
+"""
+
+import argparse
+import random
+import sys
+from io import BytesIO
+from pathlib import Path
+
+# name -> slides per deck
+SIZES = {"small": 8, "medium": 30, "large": 120}
+
+TOPICS = ["Problem", "Solution", "Product", "Market size", "Business model", "Traction", "Go-to-market",
+          "Competition", "Team", "Financials", "Roadmap", "The ask"]
+
+def _slide_text(rng: random.Random, number: int) -> str:
+    arr = rng.randint(2, 90) / 10
+    lines = [
+        f"Acme Robotics grew ARR to ${arr:.1f}M with {rng.randint(10, 60)}% month-over-month growth.",
+        f"{rng.randint(5, 400) * 100:,} warehouses run our autonomous picking robots across {rng.randint(3, 40)} countries.",
+        f"Gross margin {rng.randint(40, 80)}%, CAC payback {rng.randint(3, 18)} months, net revenue retention {rng.randint(95, 160)}%.",
+        f"Total addressable market ${rng.randint(5, 90)}B; serviceable market ${rng.randint(1, 9)}B growing {rng.randint(8, 30)}% a year.",
+        f"Slide {number}: we are raising ${rng.randint(2, 20)}M to expand sales and ship the next robot generation.",
+    ]
+    rng.shuffle(lines)
+    return "\n".join(lines[:rng.randint(3, 5)])
+
+def _chart(rng: random.Random, size=(640, 400)) -> bytes:
+    from PIL import Image, ImageDraw
+
+    img = Image.new("RGB", size, "white")
+    draw = ImageDraw.Draw(img)
+    bars = rng.randint(5, 12)
+    width = (size[0] - 80) // bars
+    for b in range(bars):
+        height = rng.randint(20, size[1] - 60)
+        color = (rng.randint(0, 200), rng.randint(60, 200), rng.randint(120, 255))
+        draw.rectangle([40 + b * width, size[1] - 30 - height, 40 + b * width + width - 8, size[1] - 30], fill=color)
+    noise = Image.frombytes("L", (size[0] // 4, size[1] // 4), rng.randbytes(size[0] * size[1] // 16))
+    img.paste(noise.resize((size[0] // 4, size[1] // 4)).convert("RGB"), (size[0] - size[0] // 4 - 10, 10))
+    out = BytesIO()
+    img.save(out, format="PNG")
+    return out.getvalue()
+
+def _logo() -> bytes:
+    from PIL import Image, ImageDraw
+
+    img = Image.new("RGB", (180, 80), (20, 40, 90))
+    ImageDraw.Draw(img).ellipse([10, 10, 70, 70], fill=(250, 180, 30))
+    out = BytesIO()
+    img.save(out, format="PNG")
+    return out.getvalue()
+
+def make_pdf(path: Path, slides: int, seed: int = 0):
+    import fitz
+
+    rng = random.Random(seed)
+    logo = _logo()
+    doc = fitz.open()
+    for i in range(slides):
+        page = doc.new_page(width=960, height=540)
+        title = "Acme Robotics" if i == 0 else f"{TOPICS[i % len(TOPICS)]} ({i + 1})"
+        page.insert_text((48, 64), title, fontsize=30)
+        page.insert_textbox(fitz.Rect(48, 100, 440, 500), _slide_text(rng, i + 1), fontsize=12)
+        page.insert_image(fitz.Rect(800, 16, 940, 78), stream=logo)
+        page.insert_image(fitz.Rect(470, 110, 930, 500), stream=_chart(rng))
+    doc.save(str(path), garbage=3, deflate=True)
+    doc.close()
+
+def make_pptx(path: Path, slides: int, seed: int = 0):
+    from pptx import Presentation
+    from pptx.util import Inches, Pt
+
+    rng = random.Random(seed)
+    logo = _logo()
+    prs = Presentation()
+    prs.slide_width, prs.slide_height = Inches(13.333), Inches(7.5)
+    for i in range(slides):
+        slide = prs.slides.add_slide(prs.slide_layouts[5])
+        slide.shapes.title.text = "Acme Robotics" if i == 0 else f"{TOPICS[i % len(TOPICS)]} ({i + 1})"
+        box = slide.shapes.add_textbox(Inches(0.6), Inches(1.6), Inches(5.8), Inches(4.5))
+        box.text_frame.word_wrap = True
+        box.text_frame.text = _slide_text(rng, i + 1)
+        for paragraph in box.text_frame.paragraphs:
+            for run in paragraph.runs:
+                run.font.size = Pt(14)
+        slide.shapes.add_picture(BytesIO(logo), Inches(11.3), Inches(0.2), height=Inches(0.8))
+        slide.shapes.add_picture(BytesIO(_chart(rng)), Inches(6.8), Inches(1.6), width=Inches(6))
+    prs.save(str(path))
+
+def make_corpus(folder: Path, sizes=None, formats=(".pdf", ".pptx")) -> list:
+    """Create missing decks in `folder`; returns [(size name, path)] in SIZES order"""
+    folder.mkdir(parents=True, exist_ok=True)
+    decks = []
+    for name in sizes or SIZES:
+        for suffix in formats:
+            path = folder / f"{name}{suffix}"
+            if not path.exists():
+                make = make_pdf if suffix == ".pdf" else make_pptx
+                make(path, SIZES[name], seed=SIZES[name])
+            decks.append((name, path))
+    return decks
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate the benchmark deck corpus")
+    parser.add_argument("folder", type=Path)
+    parser.add_argument("--sizes", nargs="+", choices=list(SIZES), default=list(SIZES))
+    args = parser.parse_args()
+    for name, path in make_corpus(args.folder, args.sizes):
+        print(f"{name:7} {path} ({path.stat().st_size / 1024:.0f} KiB)")
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,270 @@
+"""
+Local stand-ins for OpenRouter and DuckDuckGo/the web, for offline benchmarks
+
+`FakeOpenRouter` answers chat completions (plain and SSE streaming) with canned but
+size-plausible replies and `usage` token counts. `FakeWeb` serves a DuckDuckGo-style
+HTML results page whose links point back at itself, and the result pages. Both take a
+per-request latency, an error rate and (OpenRouter) a requests-per-second rate limit
+answered with 429 + Retry-After, so retry and backoff paths are exercised too.
+
+Usage (standalone, e.g. to point a manual run at them):
+    python benchmarks/fake_services.py --latency 0.3 --error-rate 0.05 --rate-limit 20
+"""
+
+import argparse
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, quote, urlparse
+
+class _Stats:
+    """Thread-safe request counters"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.counts = {}
+
+    def add(self, key: str, n: int = 1):
+        with self._lock:
+            self.counts[key] = self.counts.get(key, 0) + n
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return dict(self.counts)
+
+class _Server:
+    """ThreadingHTTPServer on a free port, served from a daemon thread"""
+
+    handler = None
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, latency: float = 0.0, error_rate: float = 0.0,
+                 seed: int = 0):
+        self.latency = latency
+        self.error_rate = error_rate
+        self.random = random.Random(seed)
+        self._random_lock = threading.Lock()
+        self.stats = _Stats()
+        self.httpd = ThreadingHTTPServer((host, port), self.handler)
+        self.httpd.daemon_threads = True
+        self.httpd.fake = self
+        self._thread = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def roll(self) -> float:
+        with self._random_lock:
+            return self.random.random()
+
+    def start(self):
+        self._thread = threading.Thread(target=self.httpd.serve_forever, name=type(self).__name__, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *args):
+        pass
+
+    def _send(self, status: int, body: bytes, content_type: str = "application/json", headers: dict = None):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+def _reply_text(messages: list) -> str:
+    """Canned reply shaped like the real one for each kind of prompt the pipeline sends"""
+    content = messages[-1].get("content") if messages else ""
+    if isinstance(content, list):
+        images = sum(1 for part in content if part.get("type") == "image_url")
+        if images > 1:
+            return "\n\n".join(f"### IMAGE {i + 1}\nSUMMARY: Bar chart of monthly revenue.\nKEY_METRICS: ARR $1.2M"
+                               for i in range(images))
+        return "SUMMARY: Bar chart of monthly revenue growing 35% MoM.\nKEY_METRICS: ARR $1.2M, 35% MoM\nTEXT_IN_IMAGE: Revenue"
+    system = " ".join(m.get("content", "") for m in messages if m.get("role") == "system" and isinstance(m.get("content"), str))
+    if "name of the company" in system or "name of the company" in str(content):
+        return "Acme Robotics"
+    if "Summarize" in system or "Merge" in system:
+        return "- Acme Robotics builds warehouse robots\n- ARR $1.2M, 35% MoM growth\n- Raising $3M seed"
+    sections = ["Executive summary", "Team", "Market", "Product", "Traction", "Business model", "Risks", "Recommendation"]
+    body = "\n\n".join(f"## {s}\n\n" + "Acme Robotics shows steady progress on this dimension. " * 6 for s in sections)
+    return f"```markdown\n# Acme Robotics — investment brief\n\n{body}\n```"
+
+class _OpenRouterHandler(_Handler):
+    def do_POST(self):
+        fake = self.server.fake
+        length = int(self.headers.get("Content-Length") or 0)
+        raw = self.rfile.read(length)
+        fake.stats.add("requests")
+        fake.stats.add("request_bytes", len(raw))
+        if fake.latency:
+            time.sleep(fake.latency)
+        if not fake.acquire():
+            fake.stats.add("rate_limited")
+            self._send(429, b'{"error": "rate limited"}', headers={"Retry-After": f"{fake.retry_after:g}"})
+            return
+        if fake.roll() < fake.error_rate:
+            fake.stats.add("errors")
+            self._send(503, b'{"error": "upstream unavailable"}')
+            return
+        try:
+            payload = json.loads(raw)
+        except ValueError:
+            self._send(400, b'{"error": "bad json"}')
+            return
+
+        text = _reply_text(payload.get("messages") or [])
+        usage = {"prompt_tokens": len(raw) // 4, "completion_tokens": len(text) // 4,
+                 "total_tokens": len(raw) // 4 + len(text) // 4}
+        if not payload.get("stream"):
+            self._send(200, json.dumps({"choices": [{"message": {"role": "assistant", "content": text}}],
+                                        "usage": usage}).encode("utf-8"))
+            return
+
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+
+        def chunk(data: bytes):
+            self.wfile.write(b"%x\r\n%s\r\n" % (len(data), data))
+
+        for i in range(0, len(text), 24):
+            event = {"choices": [{"delta": {"content": text[i:i + 24]}}]}
+            chunk(f"data: {json.dumps(event)}\n\n".encode("utf-8"))
+            time.sleep(fake.token_interval)
+        chunk(f"data: {json.dumps({'choices': [{'delta': {}}], 'usage': usage})}\n\n".encode("utf-8"))
+        chunk(b"data: [DONE]\n\n")
+        chunk(b"")
+
+class FakeOpenRouter(_Server):
+    """Chat-completions endpoint at `url`; `rate_limit` is requests per second (0 = unlimited)"""
+
+    handler = _OpenRouterHandler
+
+    def __init__(self, latency: float = 0.2, error_rate: float = 0.0, rate_limit: float = 0.0,
+                 retry_after: float = 0.2, token_interval: float = 0.005, **kwargs):
+        super().__init__(latency=latency, error_rate=error_rate, **kwargs)
+        self.rate_limit = rate_limit
+        self.retry_after = retry_after
+        self.token_interval = token_interval
+        self._tokens = rate_limit
+        self._refilled = time.monotonic()
+        self._bucket_lock = threading.Lock()
+
+    @property
+    def url(self) -> str:
+        return f"{self.base_url}/api/v1/chat/completions"
+
+    def acquire(self) -> bool:
+        """Token bucket holding one second's worth of requests"""
+        if not self.rate_limit:
+            return True
+        with self._bucket_lock:
+            now = time.monotonic()
+            self._tokens = min(self.rate_limit, self._tokens + (now - self._refilled) * self.rate_limit)
+            self._refilled = now
+            if self._tokens < 1:
+                return False
+            self._tokens -= 1
+            return True
+
+class _WebHandler(_Handler):
+    def do_GET(self):
+        fake = self.server.fake
+        url = urlparse(self.path)
+        fake.stats.add("requests")
+        if fake.latency:
+            time.sleep(fake.latency)
+        if fake.roll() < fake.error_rate:
+            fake.stats.add("errors")
+            self._send(500, b"error", content_type="text/plain")
+            return
+
+        if url.path.startswith("/html"):
+            query = parse_qs(url.query).get("q", [""])[0]
+            links = "".join(
+                f'<div class="result"><a class="result__a" href="/l/?uddg={quote(f"{fake.base_url}/site{i}/about", safe="")}">'
+                f"{query} result {i}</a></div>"
+                for i in range(fake.results)
+            )
+            body = f"<html><body>{links}</body></html>".encode("utf-8")
+            self._send(200, body, content_type="text/html; charset=utf-8")
+            return
+
+        fake.stats.add("pages")
+        etag = f'"{url.path}"'
+        if self.headers.get("If-None-Match") == etag:
+            self.send_response(304)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        paragraphs = "".join(
+            f"<p>Paragraph {i} on {url.path}: Acme Robotics builds autonomous warehouse robots for mid-size "
+            f"logistics operators and reports strong growth.</p>"
+            for i in range(fake.paragraphs)
+        )
+        body = (f"<html><head><title>Acme Robotics {url.path}</title>"
+                f"<meta name='description' content='Acme Robotics company profile'></head>"
+                f"<body><nav>Home About</nav>{paragraphs}<script>var x = 1;</script></body></html>").encode("utf-8")
+        self._send(200, body, content_type="text/html; charset=utf-8", headers={"ETag": etag})
+
+class FakeWeb(_Server):
+    """DuckDuckGo-style HTML search at `search_url`, plus the result pages it links to"""
+
+    handler = _WebHandler
+
+    def __init__(self, latency: float = 0.05, error_rate: float = 0.0, results: int = 10, paragraphs: int = 40,
+                 **kwargs):
+        super().__init__(latency=latency, error_rate=error_rate, **kwargs)
+        self.results = results
+        self.paragraphs = paragraphs
+
+    @property
+    def search_url(self) -> str:
+        return f"{self.base_url}/html/"
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the fake OpenRouter and web servers")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--openrouter-port", type=int, default=8765)
+    parser.add_argument("--web-port", type=int, default=8766)
+    parser.add_argument("--latency", type=float, default=0.2, help="Seconds per OpenRouter request")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of OpenRouter requests that get 503")
+    parser.add_argument("--rate-limit", type=float, default=0.0, help="OpenRouter requests per second before 429s")
+    parser.add_argument("--web-latency", type=float, default=0.05, help="Seconds per search/page request")
+    parser.add_argument("--web-error-rate", type=float, default=0.0, help="Fraction of web requests that get 500")
+    args = parser.parse_args()
+
+    openrouter = FakeOpenRouter(host=args.host, port=args.openrouter_port, latency=args.latency,
+                                error_rate=args.error_rate, rate_limit=args.rate_limit).start()
+    web = FakeWeb(host=args.host, port=args.web_port, latency=args.web_latency, error_rate=args.web_error_rate).start()
+    print(f"OPENROUTER_API_URL={openrouter.url}")
+    print(f"DUCKDUCKGO_URL={web.search_url}")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        openrouter.stop()
+        web.stop()
+
+if __name__ == "__main__":
+    main()
@@ -2,7 +2,27 @@
 AI analysis components
 """
 
-from .openrouter import OpenRouterClient, model_supports_vision
-from .image_analyzer import ImageAnalyzer
+import importlib
 
-__all__ = ['OpenRouterClient', 'model_supports_vision', 'ImageAnalyzer']
\ No newline at end of file
+# Exported name -> submodule; submodules (and requests / PIL behind them) load on first access
+_EXPORTS = {
+    'OpenRouterClient': '.openrouter',
+    'model_supports_vision': '.openrouter',
+    'ImageAnalyzer': '.image_analyzer',
+    'RateGovernor': '.ratelimit',
+    'CircuitOpenError': '.ratelimit',
+    'guess_company': '.heuristics',
+    'extract_kpis': '.heuristics',
+}
+
+__all__ = list(_EXPORTS)
+
+def __getattr__(name):
+    if name in _EXPORTS:
+        value = getattr(importlib.import_module(_EXPORTS[name], __name__), name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+def __dir__():
+    return sorted(set(globals()) | set(_EXPORTS))
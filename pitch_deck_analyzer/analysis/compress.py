@@ -0,0 +1,66 @@
+"""
+Size-targeted JPEG encoding for images sent to vision models
+"""
+
+import math
+from io import BytesIO
+from PIL import Image
+from pitch_deck_analyzer.config import IMAGE_SEND_MAX_BYTES, THUMB_QUALITY
+
+MIN_QUALITY = 30
+MIN_SCALE = 0.2
+
+def _encode(img: Image.Image, quality: int) -> bytes:
+    bio = BytesIO()
+    img.save(bio, format="JPEG", quality=quality)
+    return bio.getvalue()
+
+def _downscale(img: Image.Image, scale: float) -> Image.Image:
+    """Resize by `scale`, using a cheap integer box reduce for the bulk and LANCZOS only for the remainder"""
+    if scale >= 1.0:
+        return img
+    size = (max(1, int(img.width * scale)), max(1, int(img.height * scale)))
+    factor = int(1 / scale)
+    if factor >= 2:
+        img = img.reduce(factor)
+    if img.size != size:
+        img = img.resize(size, Image.LANCZOS)
+    return img
+
+def compress_to_limit(img: Image.Image, max_bytes: int = IMAGE_SEND_MAX_BYTES,
+                      quality: int = THUMB_QUALITY) -> bytes:
+    """Encode `img` as JPEG under `max_bytes`, keeping as much scale and quality as possible.
+
+    The first full-size encode gives a bytes-per-pixel estimate used to pick the starting scale;
+    at each scale the highest fitting quality is binary-searched. Like the previous loop, the
+    result is returned even if it is still too large at MIN_SCALE / MIN_QUALITY.
+    """
+    if img.mode not in ("RGB", "L"):
+        img = img.convert("RGB")
+
+    data = _encode(img, quality)
+    if len(data) <= max_bytes:
+        return data
+
+    # JPEG size grows roughly with pixel count, so scale linear dimensions by sqrt of the ratio
+    scale = max(MIN_SCALE, min(1.0, math.sqrt(max_bytes / len(data)) * 0.95))
+    while True:
+        resized = _downscale(img, scale)
+        data = _encode(resized, quality)
+        if len(data) <= max_bytes:
+            return data
+
+        best = None
+        lo, hi = MIN_QUALITY, quality - 1
+        while lo <= hi:
+            mid = (lo + hi) // 2
+            candidate = _encode(resized, mid)
+            if len(candidate) <= max_bytes:
+                best, lo = candidate, mid + 1
+            else:
+                hi = mid - 1
+        if best is not None:
+            return best
+        if scale <= MIN_SCALE:
+            return _encode(resized, MIN_QUALITY)
+        scale = max(MIN_SCALE, scale * 0.7)
@@ -0,0 +1,130 @@
+"""
+Token-budgeted context packing for the synthesis prompt
+"""
+
+import math
+import re
+from typing import Dict, List, Tuple
+from pitch_deck_analyzer.config import CONTEXT_TOKEN_BUDGET, MODEL_TOKEN_BUDGETS, CHARS_PER_TOKEN
+
+SECTION_MARKER = re.compile(r"^--- (?:SLIDE|PAGE)S? \d+(?:-\d+)? ---$", re.MULTILINE)
+SALIENT = re.compile(
+    r"\b(?:revenue|arr|mrr|gmv|growth|users?|customers?|clients?|retention|churn|margin|profit|"
+    r"traction|pilot|team|founder|ceo|cto|market|tam|sam|som|raise|raising|round|seed|series|"
+    r"valuation|funding|investors?|competitors?|competition|moat|patent|ip|pricing|business model)\b"
+    r"|[$€£]\s?\d|\d+(?:\.\d+)?\s?(?:%|[kmb]\b|x\b)",
+    re.IGNORECASE,
+)
+LOW_VALUE = re.compile(r"^\(skipped\)|^\[image analysis (?:failed|unavailable)|^failed to analyze image", re.IGNORECASE)
+
+# Default split of the budget; unused share flows to the other sections
+DEFAULT_SHARES = {"deck": 0.5, "images": 0.25, "web": 0.25}
+
+def estimate_tokens(text: str) -> int:
+    """Cheap token estimate (no tokenizer dependency): about CHARS_PER_TOKEN characters per token"""
+    return math.ceil(len(text) / CHARS_PER_TOKEN) if text else 0
+
+def model_token_budget(model: str) -> int:
+    """Prompt token budget for `model`: exact MODEL_TOKEN_BUDGETS entry, then substring match, then default"""
+    if model:
+        if model in MODEL_TOKEN_BUDGETS:
+            return MODEL_TOKEN_BUDGETS[model]
+        for name, budget in MODEL_TOKEN_BUDGETS.items():
+            if name in model:
+                return budget
+    return CONTEXT_TOKEN_BUDGET
+
+def split_sections(text: str) -> List[str]:
+    """Split deck text on slide/page markers, or on blank lines when there are none"""
+    if not text:
+        return []
+    starts = [m.start() for m in SECTION_MARKER.finditer(text)]
+    if starts:
+        bounds = ([0] if starts[0] > 0 else []) + starts + [len(text)]
+        parts = [text[a:b] for a, b in zip(bounds, bounds[1:])]
+    else:
+        parts = re.split(r"\n\s*\n", text)
+    return [p.strip() for p in parts if p.strip()]
+
+def salience(text: str, position: int = 0) -> float:
+    """Density of investor-relevant terms and figures, with a small bonus for early items"""
+    if LOW_VALUE.search(text.strip()):
+        return 0.0
+    hits = len(SALIENT.findall(text))
+    return (1 + hits) / math.sqrt(1 + estimate_tokens(text)) + 1.0 / (1 + position)
+
+def _truncate(text: str, tokens: int) -> str:
+    chars = max(0, tokens * CHARS_PER_TOKEN - len(" [TRUNCATED]"))
+    return text[:chars].rstrip() + " [TRUNCATED]" if chars else ""
+
+class ContextPacker:
+    """Selects deck sections, image summaries and web sources to fit a token budget.
+
+    Items are deduplicated, ranked by salience and admitted greedily per section; the most salient
+    item that does not fit is truncated into the remaining space. Output keeps the original order.
+    """
+
+    def __init__(self, budget_tokens: int, shares: Dict[str, float] = None):
+        self.budget_tokens = budget_tokens
+        self.shares = shares or DEFAULT_SHARES
+
+    def _select(self, items: List[str], budget: int) -> Tuple[List[str], int]:
+        """Greedy salience-ordered selection; returns (selected items in original order, omitted count)"""
+        ranked = sorted(range(len(items)), key=lambda i: salience(items[i], i), reverse=True)
+        chosen, used, truncated = {}, 0, False
+        for i in ranked:
+            cost = estimate_tokens(items[i])
+            if used + cost <= budget:
+                chosen[i] = items[i]
+                used += cost
+            elif not truncated and budget - used > 50:
+                chosen[i] = _truncate(items[i], budget - used)
+                used = budget
+                truncated = True
+        return [chosen[i] for i in sorted(chosen)], len(items) - len(chosen)
+
+    def _allocate(self, demands: Dict[str, int]) -> Dict[str, int]:
+        """Split the budget by share, handing any section's unused share to the others"""
+        alloc = {k: 0 for k in demands}
+        remaining = self.budget_tokens
+        open_keys = [k for k, d in demands.items() if d > 0]
+        while open_keys and remaining > 0:
+            total_share = sum(self.shares.get(k, 0) for k in open_keys) or len(open_keys)
+            grants = {k: int(remaining * (self.shares.get(k, 0) or 1) / total_share) for k in open_keys}
+            remaining = 0
+            for k in list(open_keys):
+                need = demands[k] - alloc[k]
+                give = min(need, grants[k])
+                alloc[k] += give
+                remaining += grants[k] - give
+                if alloc[k] >= demands[k]:
+                    open_keys.remove(k)
+            if all(grants[k] == 0 for k in grants):
+                break
+        return alloc
+
+    def pack(self, deck_text: str, images_analyses: dict, web_texts: list) -> Tuple[str, str, str]:
+        """Return (deck section, image section, web section) fitting the budget"""
+        deck_items = list(dict.fromkeys(split_sections(deck_text)))
+
+        # One entry per distinct analysis; repeated images (logos, backgrounds) are listed once
+        image_names: Dict[str, List[str]] = {}
+        for name, analysis in (images_analyses or {}).items():
+            image_names.setdefault(analysis, []).append(name)
+        image_items = []
+        for i, (analysis, names) in enumerate(image_names.items()):
+            label = f"Image {i+1} ({names[0]}" + (f", +{len(names) - 1} identical" if len(names) > 1 else "") + ")"
+            image_items.append(f"{label}:\n{analysis}")
+
+        web_items = list(dict.fromkeys(web_texts or []))
+
+        items = {"deck": deck_items, "images": image_items, "web": web_items}
+        alloc = self._allocate({k: sum(estimate_tokens(x) for x in v) for k, v in items.items()})
+
+        sections = {}
+        for key, sep in (("deck", "\n\n"), ("images", "\n\n"), ("web", "\n\n---\n\n")):
+            selected, omitted = self._select(items[key], alloc.get(key, 0))
+            if omitted:
+                selected.append(f"[{omitted} lower-priority {key} item(s) omitted to fit the token budget]")
+            sections[key] = sep.join(selected)
+        return sections["deck"], sections["images"], sections["web"]
@@ -0,0 +1,94 @@
+"""
+Image deduplication by content hash and perceptual hash
+"""
+
+import hashlib
+from io import BytesIO
+from pitch_deck_analyzer.config import IMAGE_DEDUP_THRESHOLD
+
+# Near-duplicate confirmation: both images are compared in grayscale at the smaller one's resolution (at most
+# PIXEL_CHECK_SIZE px); a dHash match only counts if no pixel differs by more than PIXEL_TOLERANCE, which
+# re-encoding and rescaling stay under but a changed figure, label or bar does not
+PIXEL_CHECK_SIZE = 1024
+PIXEL_TOLERANCE = 64
+
+def dhash(data: bytes, size: int = 8) -> int:
+    """64-bit difference hash: compares neighbouring pixels of a size+1 x size grayscale thumbnail"""
+    from PIL import Image
+
+    img = Image.open(BytesIO(data))
+    img.draft("L", (size * 4, size * 4))  # cheap JPEG downscale while decoding; no-op for other formats
+    img = img.convert("L").resize((size + 1, size), Image.BILINEAR)
+    pixels = list(img.getdata())
+    bits = 0
+    for row in range(size):
+        for col in range(size):
+            left = pixels[row * (size + 1) + col]
+            right = pixels[row * (size + 1) + col + 1]
+            bits = (bits << 1) | (left > right)
+    return bits
+
+def _grayscale(data: bytes):
+    from PIL import Image
+
+    img = Image.open(BytesIO(data)).convert("L")
+    img.thumbnail((PIXEL_CHECK_SIZE, PIXEL_CHECK_SIZE))
+    return img
+
+def same_pixels(a, b) -> bool:
+    """True if two grayscale images show the same picture: same aspect ratio, only re-encoding noise"""
+    from PIL import ImageChops
+
+    if abs(a.width / a.height - b.width / b.height) > 0.02:
+        return False
+    size = min(a.size, b.size)
+    a = a if a.size == size else a.resize(size)
+    b = b if b.size == size else b.resize(size)
+    return not any(ImageChops.difference(a, b).histogram()[PIXEL_TOLERANCE + 1:])
+
+class ImageDeduplicator:
+    """Maps each image to the first equivalent image seen: identical bytes, or (with `threshold` >= 0) a dHash
+    within `threshold` bits confirmed by a pixel comparison. Names matched the second way are in `near`."""
+
+    def __init__(self, threshold: int = None):
+        self.threshold = IMAGE_DEDUP_THRESHOLD if threshold is None else threshold
+        self.near = {}  # name -> representative, for images whose bytes differ from the representative's
+        self._by_digest = {}
+        self._near_digests = set()
+        self._by_phash = []
+
+    def add(self, image) -> str:
+        """Register an image; returns the name of its representative (its own name if new)"""
+        data = image.read_bytes()
+        digest = getattr(image, "digest", None) or hashlib.sha256(data).hexdigest()
+        name = str(image.name)
+        if digest in self._by_digest:
+            rep = self._by_digest[digest]
+            if digest in self._near_digests:
+                self.near[name] = rep
+            return rep
+
+        if self.threshold >= 0:
+            try:
+                phash = dhash(data)
+            except Exception:
+                phash = None
+            if phash is not None:
+                for other_hash, other in self._by_phash:
+                    if bin(phash ^ other_hash).count("1") <= self.threshold and self._confirm(data, other):
+                        rep = str(other.name)
+                        self._by_digest[digest] = rep
+                        self._near_digests.add(digest)
+                        self.near[name] = rep
+                        return rep
+                self._by_phash.append((phash, image))
+
+        self._by_digest[digest] = name
+        return name
+
+    @staticmethod
+    def _confirm(data: bytes, other) -> bool:
+        try:
+            return same_pixels(_grayscale(data), _grayscale(other.read_bytes()))
+        except Exception:
+            return False
@@ -0,0 +1,238 @@
+"""
+Local heuristics: company name from the title-slide layout and KPIs from deck text
+"""
+
+import re
+from collections import Counter
+from pathlib import Path
+from typing import Dict, List, Tuple
+from pitch_deck_analyzer.analysis.summarize import deck_sections
+from pitch_deck_analyzer.config import COMPANY_HINT_PAGES
+
+# Title-slide lines that are never the company name
+GENERIC = re.compile(
+    r"^(?:(?:the\s+)?(?:pitch|investor|investment|seed|pre-seed|series\s+[a-e]|fundraising|company|startup)\s*"
+    r"(?:deck|presentation|round|update|overview|memo|opportunity|pitch)?|confidential(?:\s+\w+)?|strictly confidential|"
+    r"agenda|overview|introduction|problem|solution|product|market(?:\s+size)?|team|traction|business model|"
+    r"competition|financials|roadmap|the ask|ask|thank you|thanks|contact(?:\s+us)?|appendix|executive summary|"
+    r"vision|mission|why now|use of funds|(?:slide|page)\s+\d+|\d{4}|(?:q[1-4]\s+)?\d{4}|draft|version\s+\d+)$",
+    re.IGNORECASE,
+)
+SEPARATORS = re.compile(r"\s+[-|–—:•]\s+")
+DOMAIN = re.compile(r"(?:https?://|www\.|@)([a-z0-9][a-z0-9-]{1,40})\.[a-z]{2,}", re.IGNORECASE)
+MARKER_LINE = re.compile(r"^--- (?:SLIDE|PAGE) \d+ ---$")
+
+# Size of text without an explicit font size in PPTX placeholders (points)
+PPTX_TITLE_PT = 40.0
+PPTX_BODY_PT = 18.0
+
+def _pdf_lines(path: str, pages: int) -> List[Tuple[str, float, int, bool]]:
+    import fitz
+
+    lines = []
+    with fitz.open(path) as doc:
+        for page_index in range(min(pages, len(doc))):
+            page = doc[page_index]
+            height = page.rect.height or 1.0
+            for block in page.get_text("dict").get("blocks", []):
+                for line in block.get("lines", []):
+                    spans = [s for s in line.get("spans", []) if s.get("text", "").strip()]
+                    if not spans:
+                        continue
+                    text = "".join(s["text"] for s in spans).strip()
+                    top = line["bbox"][1] / height < 0.4
+                    lines.append((text, max(s["size"] for s in spans), page_index + 1, top))
+    return lines
+
+def _pptx_lines(path: str, pages: int) -> List[Tuple[str, float, int, bool]]:
+    from pptx import Presentation
+    from pptx.enum.shapes import PP_PLACEHOLDER
+
+    titles = {PP_PLACEHOLDER.TITLE, PP_PLACEHOLDER.CENTER_TITLE}
+    prs = Presentation(path)
+    height = prs.slide_height or 1
+    lines = []
+    for slide_index, slide in enumerate(prs.slides):
+        if slide_index >= pages:
+            break
+        for shape in slide.shapes:
+            if not shape.has_text_frame:
+                continue
+            is_title = shape.is_placeholder and shape.placeholder_format.type in titles
+            top = is_title or (shape.top is not None and shape.top / height < 0.4)
+            for paragraph in shape.text_frame.paragraphs:
+                text = "".join(run.text for run in paragraph.runs).strip()
+                if not text:
+                    continue
+                sizes = [run.font.size.pt for run in paragraph.runs if run.font.size is not None]
+                size = max(sizes) if sizes else PPTX_TITLE_PT if is_title else PPTX_BODY_PT
+                lines.append((text, size, slide_index + 1, top))
+    return lines
+
+def layout_lines(path, pages: int = None) -> List[Tuple[str, float, int, bool]]:
+    """(text, font size, page, near the top) for every text line of the first `pages` pages; [] if unreadable"""
+    pages = pages or COMPANY_HINT_PAGES
+    suffix = Path(path).suffix.lower()
+    try:
+        if suffix == ".pdf":
+            return _pdf_lines(str(path), pages)
+        if suffix == ".pptx":
+            return _pptx_lines(str(path), pages)
+    except Exception as e:
+        print(f"Warning: could not read the title-slide layout: {e}")
+    return []
+
+def _candidates(text: str) -> List[str]:
+    """Plausible names in one line: the whole line and each part around separators like ' | '"""
+    parts = [text] + SEPARATORS.split(text)
+    out = []
+    for part in parts:
+        part = part.strip(" \t.,;:!|-–—•™®")
+        words = part.split()
+        if not (2 <= len(part) <= 50) or not 1 <= len(words) <= 6:
+            continue
+        if GENERIC.match(part) or any(ch in part for ch in "$%€£") or sum(ch.isdigit() for ch in part) > len(part) // 3:
+            continue
+        if part[0].islower() and len(words) > 2:  # a sentence fragment, not a name
+            continue
+        if part not in out:
+            out.append(part)
+    return out
+
+def _compact(text: str) -> str:
+    return re.sub(r"[^a-z0-9]", "", text.lower())
+
+def guess_company(path=None, first_text: str = "", lines: list = None) -> Tuple[str, float, List[Tuple[str, float]]]:
+    """Best company-name candidate from the first pages, its confidence (0-1) and all scored candidates.
+
+    Lines are scored on font size relative to the largest text on their page (page 1 counts most),
+    position near the top or in a title placeholder of the first page, repeat mentions in the first pages' text and
+    a match with a web or e-mail domain. Confidence is the best score, discounted when the runner-up
+    is close. Without layout (`path` unreadable) only the text signals remain, so confidence stays low.
+    """
+    if lines is None:
+        lines = layout_lines(path) if path is not None else []
+    text = first_text or "\n".join(line[0] for line in lines)
+    if not lines:
+        plain = [ln.strip() for ln in text.splitlines() if ln.strip() and not MARKER_LINE.match(ln.strip())]
+        lines = [(ln, 0.0, 1, i == 0) for i, ln in enumerate(plain[:12])]
+
+    largest = Counter()
+    for _, size, page, _ in lines:
+        largest[page] = max(largest[page], size)
+    domains = {_compact(d) for d in DOMAIN.findall(text)}
+    lowered = text.lower()
+
+    scores, seen = {}, Counter()
+    for line_text, size, page, top in lines:
+        for candidate in _candidates(line_text):
+            key = candidate.lower()
+            seen[key] += 1
+            size_score = size / largest[page] if largest[page] else 0.0
+            if page > 1:
+                size_score *= 0.5
+            mentions = len(re.findall(r"(?<!\w)" + re.escape(key) + r"(?!\w)", lowered)) - 1
+            compact = _compact(candidate)
+            first_word = _compact(candidate.split()[0])
+            domain = any(d and (compact.startswith(d) or (len(first_word) >= 3 and d.startswith(first_word)))
+                         for d in domains)
+            score = (0.45 * size_score + 0.15 * bool(top and page == 1) + 0.2 * min(1.0, max(0, mentions) / 2)
+                     + 0.2 * domain)
+            if candidate[0].islower() and not domain:
+                score *= 0.5  # wrapped body text rather than a name set in its own line
+            if score > scores.get(key, (None, 0.0))[1]:
+                scores[key] = (candidate, score)
+
+    ranked = sorted(((name, min(1.0, score + 0.05 * min(3, seen[key] - 1))) for key, (name, score) in scores.items()),
+                    key=lambda item: -item[1])
+    if not ranked:
+        return None, 0.0, []
+    best, top_score = ranked[0]
+    runner_up = ranked[1][1] if len(ranked) > 1 else 0.0
+    margin = (top_score - runner_up) / top_score if top_score else 0.0
+    confidence = round(top_score * (0.6 + 0.4 * margin), 3)
+    return best, confidence, ranked[:5]
+
+# --- KPIs -------------------------------------------------------------------------------------------
+
+NUMBER = r"\d{1,3}(?:,\d{3})+(?:\.\d+)?|\d+(?:\.\d+)?"
+SCALE = r"(?:\s?(?:k|m|mm|mn|b|bn|t)\b|\s(?:thousand|million|billion|trillion)\b)"
+MONEY = re.compile(
+    rf"(?:[$€£]|\b(?:USD|EUR|GBP)\s?)\s?(?P<n1>{NUMBER})(?P<s1>{SCALE})?"
+    rf"|(?<![\w.])(?P<n2>{NUMBER})(?P<s2>{SCALE})?\s?(?:USD|EUR|GBP|dollars|euros)\b",
+    re.IGNORECASE,
+)
+PERCENT = re.compile(rf"(?<![\w.])(?P<n1>{NUMBER})\s?%")
+COUNT = re.compile(
+    rf"(?<![\w.$€£])(?P<n1>{NUMBER})(?P<s1>{SCALE})?\+?\s+(?:[a-z-]+\s+){{0,2}}?"
+    r"(?:users|customers|clients|subscribers|downloads|installs|members|merchants|businesses|companies|"
+    r"accounts|patients|students|brands|partners|MAU|DAU)\b",
+    re.IGNORECASE,
+)
+SCALES = {"k": 1e3, "thousand": 1e3, "m": 1e6, "mm": 1e6, "mn": 1e6, "million": 1e6,
+          "b": 1e9, "bn": 1e9, "billion": 1e9, "t": 1e12, "trillion": 1e12}
+
+# (metric, keyword regex, value pattern); the value nearest the keyword (preferably after it) wins
+KPI_PATTERNS = [
+    ("ARR", re.compile(r"\bARR\b|annual(?:ized)? recurring revenue", re.IGNORECASE), MONEY),
+    ("MRR", re.compile(r"\bMRR\b|monthly recurring revenue", re.IGNORECASE), MONEY),
+    ("Revenue", re.compile(r"(?<!recurring )\b(?:revenues?|turnover|GMV|net sales|sales of)\b", re.IGNORECASE), MONEY),
+    ("Users / customers", re.compile(r"\b(?:users|customers|clients|subscribers|downloads|installs|members|merchants|"
+                                     r"businesses|accounts|patients|students|MAU|DAU)\b", re.IGNORECASE), COUNT),
+    ("Growth", re.compile(r"\b(?:MoM|YoY|QoQ|month[- ]over[- ]month|year[- ]over[- ]year|growth|grew|growing|CAGR)\b",
+                          re.IGNORECASE), PERCENT),
+    ("Gross margin", re.compile(r"\bgross margins?\b", re.IGNORECASE), PERCENT),
+    ("Raise", re.compile(r"\b(?:raising|raise|seeking|fundraising|the ask|investment of|round of)\b", re.IGNORECASE), MONEY),
+    ("TAM", re.compile(r"\bTAM\b|total addressable market", re.IGNORECASE), MONEY),
+    ("SAM", re.compile(r"\bSAM\b|serviceable (?:available |addressable )?market", re.IGNORECASE), MONEY),
+    ("SOM", re.compile(r"\bSOM\b|serviceable obtainable market", re.IGNORECASE), MONEY),
+]
+
+def parse_number(number: str, scale: str = None) -> float:
+    """'1,200' -> 1200.0; '1.2', 'M' -> 1200000.0"""
+    value = float(number.replace(",", ""))
+    return value * SCALES.get((scale or "").strip().lower(), 1.0)
+
+def _nearest(matches, keyword: re.Match):
+    """Value match closest to the keyword, preferring values that follow it"""
+    def distance(m):
+        if m.start() >= keyword.end():
+            return m.start() - keyword.end()
+        return (keyword.start() - m.end()) * 2 + 1 if m.end() <= keyword.start() else 0
+    return min(matches, key=distance) if matches else None
+
+def extract_kpis(deck_text: str) -> Dict[str, List[dict]]:
+    """Metric -> [{"text", "value", "page", "context"}] in deck order, with repeated values dropped.
+
+    Each line is checked for the metric's keywords and the number of the matching kind (money,
+    percentage or count) nearest to the keyword is taken; `page` is the slide/page number.
+    """
+    kpis: Dict[str, List[dict]] = {}
+    for _, number, body in deck_sections(deck_text or ""):
+        for line in body.splitlines():
+            line = line.strip()
+            if not line or len(line) > 400:
+                continue
+            for metric, keyword_re, value_re in KPI_PATTERNS:
+                keyword = keyword_re.search(line)
+                if not keyword:
+                    continue
+                m = _nearest(list(value_re.finditer(line)), keyword)
+                if m is None:
+                    continue
+                n = m.group("n1") or m.groupdict().get("n2")
+                scale = m.groupdict().get("s1") or m.groupdict().get("s2")
+                entry = {"text": m.group(0).strip(), "value": parse_number(n, scale), "page": number,
+                         "context": line[:160]}
+                found = kpis.setdefault(metric, [])
+                if all(e["value"] != entry["value"] for e in found):
+                    found.append(entry)
+    return {metric: kpis[metric] for metric, _, _ in KPI_PATTERNS if metric in kpis}
+
+def deck_outline(deck_text: str) -> List[Tuple[str, int, str]]:
+    """(kind, number, first line) per slide/page, e.g. ("SLIDE", 3, "Traction")"""
+    outline = []
+    for kind, number, body in deck_sections(deck_text or ""):
+        first = next((ln.strip() for ln in body.splitlines() if ln.strip()), "")
+        outline.append((kind, number, first[:100]))
+    return outline
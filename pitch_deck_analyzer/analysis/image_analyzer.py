@@ -2,23 +2,139 @@
 Image analysis functionality
 """
 
-from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
 from pitch_deck_analyzer.analysis.openrouter import OpenRouterClient
+from pitch_deck_analyzer.analysis.dedup import ImageDeduplicator
+from pitch_deck_analyzer.profiling import span, submit
+from pitch_deck_analyzer.config import IMAGE_ANALYSIS_WORKERS, IMAGE_BATCH_MAX_IMAGES, IMAGE_MIN_DIM, IMAGE_SEND_MAX_BYTES
 
 class ImageAnalyzer:
-    def __init__(self, openrouter_client: OpenRouterClient):
+    def __init__(self, openrouter_client: OpenRouterClient, max_workers: int = None,
+                 dedupe: bool = True, dedup_threshold: int = None, batch_size: int = None, min_dim: int = None):
         self.client = openrouter_client
+        self.max_workers = max_workers or IMAGE_ANALYSIS_WORKERS
+        self.dedupe = dedupe
+        self.dedup_threshold = dedup_threshold
+        self.near_duplicates = {}  # name -> representative, from the last analyze_images call
+        self.batch_size = IMAGE_BATCH_MAX_IMAGES if batch_size is None else batch_size
+        self.min_dim = IMAGE_MIN_DIM if min_dim is None else min_dim
 
-    def analyze_images(self, images: list, model: str, vision_model: str = None) -> dict:
-        """Analyze multiple images"""
-        images_analyses = {}
+    def _analyze_one(self, img_path, model: str) -> str:
+        """Analyze a single image, reporting failures as the analysis text"""
+        try:
+            return self.client.analyze_image(img_path, model)
+        except Exception as e:
+            return f"Failed to analyze image: {e}"
+
+    def _analyze_batch(self, images: list, model: str) -> dict:
+        """Analyze several images in one request; any the reply missed are analyzed one by one"""
+        results = {}
+        try:
+            results = self.client.analyze_images_batch(images, model)
+        except Exception as e:
+            print(f"Batched analysis of {len(images)} images failed, analyzing them one by one: {e}")
+        for image in images:
+            if str(image.name) not in results:
+                results[str(image.name)] = self._analyze_one(image, model)
+        return results
+
+    def _too_small(self, image) -> str:
+        """Skip note for icons, bullets and divider lines, or None; only the image header is read"""
+        if self.min_dim <= 0:
+            return None
+        try:
+            width, height = image.open().size
+        except Exception:
+            return None
+        if width < self.min_dim or height < self.min_dim:
+            return f"(skipped) image too small to analyze ({width}x{height} px)"
+        return None
+
+    def analyze_images(self, images, model: str, vision_model: str = None, known: dict = None) -> dict:
+        """Analyze multiple images, at most `max_workers` in flight; results keep deck order.
+
+        `images` may be a generator: images are submitted as they are produced (small ones once their
+        slide is complete, packed up to `batch_size` per request), so analysis overlaps with extraction.
+        Images under `min_dim` pixels are skipped. Duplicate images are analyzed once and the analysis
+        is reported for every occurrence (near-duplicates, which got another image's analysis, are listed in
+        `near_duplicates`). `known` maps image SHA-256 digests to analyses from an earlier run
+        (e.g. a previous deck version); those images are not sent again.
+        """
         chosen_model = vision_model or model
-        
-        for img_path in images:
-            try:
-                img_analysis = self.client.analyze_image(img_path, chosen_model)
-                images_analyses[str(img_path.name)] = img_analysis
-            except Exception as e:
-                images_analyses[str(img_path.name)] = f"Failed to analyze image: {e}"
-        
-        return images_analyses
\ No newline at end of file
+        dedup = ImageDeduplicator(self.dedup_threshold) if self.dedupe else None
+        order = []  # (name, representative name) in deck order
+        futures = {}  # name -> (future, batched)
+        reused = {}
+        skipped = {}
+        group, slide, slide_page = [], [], None
+        requests = 0
+
+        with span("vision", model=chosen_model) as s, ThreadPoolExecutor(max_workers=max(1, self.max_workers)) as pool:
+            def send(batch):
+                nonlocal requests
+                requests += 1
+                if len(batch) == 1:
+                    futures[str(batch[0].name)] = (submit(pool, self._analyze_one, batch[0], chosen_model), False)
+                    return
+                future = submit(pool, self._analyze_batch, list(batch), chosen_model)
+                for queued in batch:
+                    futures[str(queued.name)] = (future, True)
+
+            def cost(image):
+                return min(image.size, IMAGE_SEND_MAX_BYTES)
+
+            def add_slide(slide_images):
+                """Queue one slide's images, keeping a slide in one request where the limits allow"""
+                if group and (len(group) + len(slide_images) > self.batch_size
+                              or sum(map(cost, group + slide_images)) > IMAGE_SEND_MAX_BYTES):
+                    send(group)
+                    group.clear()
+                for queued in slide_images:
+                    if group and (len(group) >= self.batch_size
+                                  or sum(map(cost, group)) + cost(queued) > IMAGE_SEND_MAX_BYTES):
+                        send(group)
+                        group.clear()
+                    group.append(queued)
+
+            for image in images:
+                name = str(image.name)
+                rep = dedup.add(image) if dedup is not None else name
+                order.append((name, rep))
+                if rep != name:
+                    continue
+                if known and image.digest in known:
+                    reused[name] = known[image.digest]
+                    continue
+                note = self._too_small(image)
+                if note:
+                    skipped[name] = note
+                elif self.batch_size <= 1 or cost(image) * 2 > IMAGE_SEND_MAX_BYTES:
+                    send([image])  # large images get a request of their own
+                else:
+                    if slide and image.page != slide_page:
+                        add_slide(slide)
+                        slide = []
+                    slide.append(image)
+                    slide_page = image.page
+            if slide:
+                add_slide(slide)
+            if group:
+                send(group)
+
+            analyses = {}
+            for name, (future, batched) in futures.items():
+                analyses[name] = future.result()[name] if batched else future.result()
+            s.set(images=len(order), items=len(futures), requests=requests, reused=len(reused), skipped=len(skipped))
+        self.near_duplicates = dict(dedup.near) if dedup is not None else {}
+        analyses.update(reused)
+        analyses.update(skipped)
+
+        if len(analyses) < len(order):
+            print(f"Deduplicated {len(order)} images to {len(analyses)} unique")
+        if reused:
+            print(f"Reused {len(reused)} image analyses from the previous version")
+        if skipped:
+            print(f"Skipped {len(skipped)} images smaller than {self.min_dim} px")
+        if requests < len(futures):
+            print(f"Analyzed {len(futures)} images in {requests} vision requests")
+        return {name: analyses[rep] for name, rep in order}
@@ -3,13 +3,35 @@ OpenRouter API client
 """
 
 import base64
+import hashlib
 import json
-import requests
+import random
+import re
+import time
 from io import BytesIO
 from pathlib import Path
-from PIL import Image
+from typing import TYPE_CHECKING, Iterator
 from pitch_deck_analyzer.config import OPENROUTER_API_URL, OPENROUTER_API_KEY, USER_AGENT
-from pitch_deck_analyzer.config import THUMB_MAX_DIM, THUMB_QUALITY, IMAGE_SEND_MAX_BYTES
+from pitch_deck_analyzer.config import THUMB_MAX_DIM, IMAGE_SEND_MAX_BYTES
+from pitch_deck_analyzer.config import OPENROUTER_MAX_RETRIES, OPENROUTER_BACKOFF_BASE, OPENROUTER_BACKOFF_MAX
+from pitch_deck_analyzer.config import OPENROUTER_POOL_SIZE, OPENROUTER_MAX_THROTTLE_RETRIES
+from pitch_deck_analyzer.config import CACHE_DIR, LLM_CACHE_MAX_BYTES, LLM_CACHE_TTL
+from pitch_deck_analyzer.cache import DiskCache
+from pitch_deck_analyzer.analysis.ratelimit import RateGovernor
+from pitch_deck_analyzer.profiling import NULL_SPAN, span, start_span
+
+# requests, PIL and asyncio are imported where they are used, so local-only runs never load them
+if TYPE_CHECKING:
+    import requests
+    from PIL import Image
+
+# Section headers ("### IMAGE 2", "IMAGE 2:") in a batched vision reply
+# Only the "### IMAGE n" header the batch prompt asks for; body text such as "Image 2 repeats ..." is not one
+IMAGE_SECTION = re.compile(r"^[ \t]*###[ \t]*IMAGE[ \t]+(\d+)\b[ \t]*[:.)-]?[ \t]*(.*)$", re.MULTILINE)
+REFUSALS = ("cannot analyze images", "unable to analyze", "i'm sorry")
+
+# Status codes worth retrying: rate limiting and transient upstream failures
+RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
 
 def model_supports_vision(model_name: str) -> bool:
     """Check if model supports vision capabilities"""
@@ -18,18 +40,80 @@ def model_supports_vision(model_name: str) -> bool:
     low = model_name.lower()
     return any(k in low for k in ("vision", "image", "multimodal", "clip", "gpt-4o", "gpt-4"))
 
+def open_llm_cache(path: str = None) -> DiskCache:
+    """Open the on-disk chat response cache"""
+    return DiskCache(path or Path(CACHE_DIR) / "llm.sqlite3", max_bytes=LLM_CACHE_MAX_BYTES, ttl=LLM_CACHE_TTL)
+
+def chat_cache_key(model: str, messages, temperature: float, max_tokens: int) -> str:
+    """Content address of a chat request"""
+    blob = json.dumps(
+        {"model": model, "messages": messages, "temperature": temperature, "max_tokens": max_tokens},
+        sort_keys=True, ensure_ascii=False,
+    )
+    return hashlib.sha256(blob.encode("utf-8")).hexdigest()
+
+def iter_sse_data(lines) -> Iterator[str]:
+    """Yield the data payload of each server-sent event from an iterable of decoded lines"""
+    data = []
+    for line in lines:
+        if line is None:
+            continue
+        if line == "":
+            if data:
+                yield "\n".join(data)
+                data = []
+            continue
+        if line.startswith(":"):
+            continue  # comment / keep-alive
+        field, _, value = line.partition(":")
+        if field == "data":
+            data.append(value[1:] if value.startswith(" ") else value)
+    if data:
+        yield "\n".join(data)
+
+def _make_session(pool_size: int) -> "requests.Session":
+    """Create a keep-alive session whose connection pool fits `pool_size` concurrent requests"""
+    import requests
+    from requests.adapters import HTTPAdapter
+
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
 class OpenRouterClient:
-    def __init__(self, api_url: str = None, api_key: str = None):
+    def __init__(self, api_url: str = None, api_key: str = None, max_retries: int = None,
+                 session: "requests.Session" = None, pool_size: int = None, cache: DiskCache = None,
+                 governor: RateGovernor = None):
         self.api_url = api_url or OPENROUTER_API_URL
         self.api_key = api_key or OPENROUTER_API_KEY
+        self.max_retries = OPENROUTER_MAX_RETRIES if max_retries is None else max_retries
+        self.max_throttle_retries = OPENROUTER_MAX_THROTTLE_RETRIES
         
         if not self.api_key:
             raise RuntimeError("OPENROUTER_API_KEY not set in environment")
         if not self.api_url:
             raise RuntimeError("OPENROUTER_API_URL not configured")
 
-    def _image_to_dataurl(self,image_path: Path) -> tuple[str, int]:
-        """Convert image to base64 data URL with optional compression."""
+        # One pooled session per client so every stage reuses the same TCP/TLS connections
+        self.session = session or _make_session(pool_size or OPENROUTER_POOL_SIZE)
+        self.cache = cache
+        # Rate limits and upstream health are shared by every concurrent call on this client
+        self.governor = governor or RateGovernor()
+
+    def close(self):
+        """Close pooled connections"""
+        self.session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _image_to_dataurl(self,image_path) -> tuple[str, int]:
+        """Convert image (an ImageHandle or a Path) to base64 data URL with optional compression."""
         orig_bytes = image_path.read_bytes()
         ext = image_path.suffix.lower()
         mime_map = {".jpg": "image/jpeg", ".jpeg": "image/jpeg",
@@ -41,7 +125,8 @@ class OpenRouterClient:
             return f"data:{mime};base64,{base64.b64encode(orig_bytes).decode()}", len(orig_bytes)
 
         try:
-            img = Image.open(image_path)
+            from PIL import Image
+            img = Image.open(BytesIO(orig_bytes))
             img.thumbnail((THUMB_MAX_DIM, THUMB_MAX_DIM))  # resize in place
             thumb_bytes = self._compress_to_limit(img)
 
@@ -51,48 +136,204 @@ class OpenRouterClient:
             return f"data:application/octet-stream;base64,{base64.b64encode(orig_bytes).decode()}", len(orig_bytes)
 
 
-    def _compress_to_limit(self,img: Image.Image) -> bytes:
-        """Compress an image to fit under IMAGE_SEND_MAX_BYTES, reducing size/quality iteratively."""
-        scale, quality = 1.0, THUMB_QUALITY
-        while True:
-            new_w, new_h = int(img.width * scale), int(img.height * scale)
-            resized = img.resize((max(1, new_w), max(1, new_h)), Image.LANCZOS)
-            bio = BytesIO()
-            resized.save(bio, format="JPEG", quality=max(30, int(quality * scale)))
-            data = bio.getvalue()
+    def _compress_to_limit(self,img: "Image.Image") -> bytes:
+        """Compress an image to fit under IMAGE_SEND_MAX_BYTES (see analysis.compress)."""
+        from pitch_deck_analyzer.analysis.compress import compress_to_limit
+        return compress_to_limit(img, IMAGE_SEND_MAX_BYTES)
 
-            if len(data) <= IMAGE_SEND_MAX_BYTES or scale <= 0.2:
-                return data
-            scale -= 0.15
+    @staticmethod
+    def _retry_after(resp) -> float:
+        """Retry-After header in seconds (capped at OPENROUTER_BACKOFF_MAX), or None"""
+        retry_after = resp.headers.get("Retry-After") if resp is not None else None
+        if retry_after:
+            try:
+                return min(max(float(retry_after), 0.0), OPENROUTER_BACKOFF_MAX)
+            except ValueError:
+                pass
+        return None
+
+    def _backoff_delay(self, attempt: int, resp=None) -> float:
+        """Seconds to wait before retry `attempt`; honors Retry-After, otherwise full jitter."""
+        retry_after = self._retry_after(resp)
+        if retry_after is not None:
+            return retry_after
+        return random.uniform(0, min(OPENROUTER_BACKOFF_MAX, OPENROUTER_BACKOFF_BASE * (2 ** attempt)))
 
     def chat(self, messages, model: str, max_tokens: int = 1500, temperature: float = 0.0) -> str:
-        """Send chat completion request to OpenRouter"""
+        """Send chat completion request to OpenRouter, served from the cache when possible"""
+        with span("llm.chat", model=model) as s:
+            # Only deterministic (temperature 0.0) calls are worth replaying
+            cache_key = None
+            if self.cache is not None and temperature <= 0.0:
+                cache_key = chat_cache_key(model, messages, temperature, max_tokens)
+                cached = self.cache.get(cache_key)
+                if cached is not None:
+                    s.set(cache_hits=1)
+                    return cached
+                s.set(cache_misses=1)
+
+            out = self._request(messages, model, max_tokens, temperature, s)
+            if cache_key is not None:
+                self.cache.set(cache_key, out)
+            return out
+
+    def _request(self, messages, model: str, max_tokens: int, temperature: float, s=NULL_SPAN) -> str:
+        """POST a chat completion and parse the reply"""
         payload = {
             "model": model,
             "messages": messages,
             "temperature": temperature,
             "max_tokens": max_tokens,
         }
-        
+        resp = self._post(payload, s=s)
+        data = resp.json()
+        s.set(response_bytes=len(resp.content), **self._usage(data))
+        return self._parse_response(data)
+
+    @staticmethod
+    def _usage(data) -> dict:
+        """Prompt/completion token counts reported by OpenRouter (`usage`), if any"""
+        usage = data.get("usage") if isinstance(data, dict) else None
+        if not isinstance(usage, dict):
+            return {}
+        return {k: usage[k] for k in ("prompt_tokens", "completion_tokens") if isinstance(usage.get(k), int)}
+
+    def _post(self, payload: dict, stream: bool = False, s=NULL_SPAN) -> "requests.Response":
+        """POST to the chat endpoint through the rate governor.
+
+        429s slow the model's token bucket down and are retried up to OPENROUTER_MAX_THROTTLE_RETRIES
+        times; 5xx and connection errors are retried up to `max_retries` times with backoff and count
+        towards the circuit breaker, which fails fast with CircuitOpenError while it is open.
+        """
+        import requests
+
+        body = json.dumps(payload).encode("utf-8")
+        s.set(request_bytes=len(body))
         headers = {
             "Authorization": f"Bearer {self.api_key}",
             "Content-Type": "application/json",
             "User-Agent": USER_AGENT,
         }
+        model = payload.get("model")
+        bucket = self.governor.bucket(model)
+        breaker = self.governor.breaker
 
-        try:
-            resp = requests.post(self.api_url, headers=headers, json=payload, timeout=120)
-            resp.raise_for_status()
-        except requests.exceptions.HTTPError as e:
+        attempt = throttled = 0
+        while True:
+            breaker.before_call()
+            resp = None
             try:
-                body = resp.text
-            except Exception:
-                body = "(no body)"
-            raise RuntimeError(f"OpenRouter API request failed: {e} - response body: {body}")
-        except requests.exceptions.RequestException as e:
-            raise RuntimeError(f"OpenRouter API request failed: {e}")
+                waited = bucket.acquire()
+                if waited > 0.001:
+                    s.add("rate_wait", round(waited, 3))
+                resp = self.session.post(self.api_url, headers=headers, data=body, timeout=120, stream=stream)
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+                breaker.record_failure()
+                if attempt >= self.max_retries:
+                    raise RuntimeError(f"OpenRouter API request failed: {e}")
+                s.add("retries")
+                time.sleep(self._backoff_delay(attempt))
+                attempt += 1
+                continue
+            except requests.exceptions.RequestException as e:
+                breaker.record_failure()
+                raise RuntimeError(f"OpenRouter API request failed: {e}")
+            except BaseException:
+                breaker.release()  # abandoned (e.g. interrupted), not an upstream failure
+                raise
 
-        data = resp.json()
+            if resp.status_code >= 500:
+                breaker.record_failure()
+            else:
+                breaker.record_success()  # even a 4xx shows the upstream is up
+
+            if resp.status_code == 429 and throttled < self.max_throttle_retries:
+                s.add("retries")
+                s.add("throttled")
+                delay = self._retry_after(resp)
+                bucket.on_throttle(delay)
+                print(f"OpenRouter rate limited {model}, slowing to {bucket.rate:.1f} requests/s...")
+                resp.close()
+                throttled += 1
+                continue
+            if resp.status_code in RETRY_STATUS_CODES and resp.status_code != 429 and attempt < self.max_retries:
+                s.add("retries")
+                delay = self._backoff_delay(attempt, resp)
+                print(f"OpenRouter returned {resp.status_code}, retrying in {delay:.1f}s...")
+                resp.close()
+                time.sleep(delay)
+                attempt += 1
+                continue
+            try:
+                resp.raise_for_status()
+            except requests.exceptions.HTTPError as e:
+                try:
+                    text = resp.text
+                except Exception:
+                    text = "(no body)"
+                raise RuntimeError(f"OpenRouter API request failed: {e} - response body: {text}")
+            bucket.on_success()
+            return resp
+
+    def chat_stream(self, messages, model: str, max_tokens: int = 1500, temperature: float = 0.0) -> Iterator[str]:
+        """Stream a chat completion (`stream: true`), yielding content deltas as they arrive.
+
+        Cached replies are yielded in one piece; completed streams are written to the cache.
+        """
+        s = start_span("llm.chat_stream", model=model)
+        try:
+            cache_key = None
+            if self.cache is not None and temperature <= 0.0:
+                cache_key = chat_cache_key(model, messages, temperature, max_tokens)
+                cached = self.cache.get(cache_key)
+                if cached is not None:
+                    s.set(cache_hits=1)
+                    yield cached
+                    return
+                s.set(cache_misses=1)
+
+            payload = {
+                "model": model,
+                "messages": messages,
+                "temperature": temperature,
+                "max_tokens": max_tokens,
+                "stream": True,
+            }
+            parts = []
+            with self._post(payload, stream=True, s=s) as resp:
+                for data in iter_sse_data(resp.iter_lines(decode_unicode=True)):
+                    s.add("response_bytes", len(data))
+                    if data == "[DONE]":
+                        break
+                    event = json.loads(data)
+                    s.set(**self._usage(event))  # usage arrives with the final chunk
+                    delta = self._parse_stream_event(event)
+                    if delta:
+                        parts.append(delta)
+                        yield delta
+
+            if cache_key is not None:
+                self.cache.set(cache_key, "".join(parts))
+        finally:
+            s.finish()
+
+    @staticmethod
+    def _parse_stream_event(event) -> str:
+        """Extract the content delta from one streamed chunk"""
+        if isinstance(event, dict):
+            if "error" in event:
+                raise RuntimeError(f"OpenRouter API error: {event['error']}")
+            if event.get("choices"):
+                choice = event["choices"][0]
+                if isinstance(choice.get("delta"), dict):
+                    return choice["delta"].get("content") or ""
+                if "text" in choice:
+                    return choice["text"] or ""
+        return ""
+
+    @staticmethod
+    def _parse_response(data) -> str:
+        """Extract the completion text from an OpenRouter response body"""
         if isinstance(data, dict):
             if "choices" in data and data["choices"]:
                 choice = data["choices"][0]
@@ -105,13 +346,23 @@ class OpenRouterClient:
         
         return json.dumps(data)
 
-    def analyze_image(self, image_path: Path, model: str) -> str:
+    async def achat(self, messages, model: str, max_tokens: int = 1500, temperature: float = 0.0) -> str:
+        """Async variant of `chat`; runs on a worker thread over the same pooled session"""
+        import asyncio
+        return await asyncio.to_thread(self.chat, messages, model, max_tokens, temperature)
+
+    def analyze_image(self, image_path, model: str) -> str:
         """Analyze image using vision-capable model"""
         if not model_supports_vision(model):
             return f"(skipped) Model '{model}' does not appear to support vision."
 
+        with span("vision.image", image=str(image_path.name)) as s:
+            return self._analyze_image(image_path, model, s)
+
+    def _analyze_image(self, image_path, model: str, s) -> str:
         try:
             data_url, sent_bytes = self._image_to_dataurl(image_path)
+            s.set(image_bytes=sent_bytes)
             print(f"Analyzing image {image_path.name} ({sent_bytes} bytes)...")
             if len(data_url) > 250_000:
                 embedded = f"[base64 image omitted due to size: {sent_bytes} bytes]"
@@ -131,22 +382,78 @@ Start with: SUMMARY:
             messages = [{"role": "user", "content": prompt}]
             out = self.chat(messages, model=model)
             
-            if out and isinstance(out, str) and any(phrase in out.lower() for phrase in ("cannot analyze images", "unable to analyze", "i'm sorry")):
+            if out and isinstance(out, str) and any(phrase in out.lower() for phrase in REFUSALS):
                 return f"[Image analysis unavailable from model '{model}']: {out}"
             return f"Image analysis ({sent_bytes} bytes sent):\n{out}"
         except Exception as e:
             return f"[Image analysis failed: {e}]"
 
-    def summarize_text(self, text: str, model: str, instruction: str = None) -> str:
-        """Summarize text using OpenRouter"""
+    def analyze_images_batch(self, images: list, model: str) -> dict:
+        """Analyze several images in one multimodal request; returns {name: analysis} for the images
+        the reply covered (callers fall back to `analyze_image` for the rest)"""
+        if not model_supports_vision(model):
+            return {str(image.name): f"(skipped) Model '{model}' does not appear to support vision." for image in images}
+
+        with span("vision.batch", images=len(images)) as s:
+            parts, listing, sent = [], [], {}
+            for i, image in enumerate(images, 1):
+                data_url, sent_bytes = self._image_to_dataurl(image)
+                sent[str(image.name)] = sent_bytes
+                page = f", slide {image.page}" if getattr(image, "page", None) else ""
+                listing.append(f"IMAGE {i}: {image.name}{page} ({sent_bytes} bytes)")
+                parts.append({"type": "image_url", "image_url": {"url": data_url}})
+            s.set(image_bytes=sum(sent.values()))
+            print(f"Analyzing {len(images)} images in one request ({sum(sent.values())} bytes)...")
+
+            prompt = f"""
+You are an expert early-stage investor analyst with vision capabilities.
+The {len(images)} images attached, in this order, come from a pitch deck:
+{chr(10).join(listing)}
+
+For EACH image give a concise (<=120 words) investor-focused summary.
+Focus on: visible text or numbers, image type (logo, chart, screenshot, team photo), and any red flags or notable signals for due diligence.
+Answer with one section per image, in order, each starting with its own header line "### IMAGE <n>" followed by a line starting with SUMMARY:
+"""
+            out = self.chat([{"role": "user", "content": [{"type": "text", "text": prompt}] + parts}],
+                            model=model, max_tokens=min(4000, 400 * len(images) + 200))
+            if out and any(phrase in out.lower() for phrase in REFUSALS) and not IMAGE_SECTION.search(out):
+                return {name: f"[Image analysis unavailable from model '{model}']: {out}" for name in sent}
+
+            sections = self.split_image_sections(out or "")
+            results = {}
+            for i, image in enumerate(images, 1):
+                section = sections.get(i)
+                if section:
+                    name = str(image.name)
+                    results[name] = f"Image analysis ({sent[name]} bytes sent, batch of {len(images)}):\n{section}"
+            s.set(items=len(results))
+            return results
+
+    @staticmethod
+    def split_image_sections(text: str) -> dict:
+        """{image number: section text} from a reply with "### IMAGE n" headers; numbers with an empty or
+        repeated section are left out, since their text cannot be attributed to one image"""
+        matches = list(IMAGE_SECTION.finditer(text))
+        sections, repeated = {}, set()
+        for m, nxt in zip(matches, matches[1:] + [None]):
+            body = (m.group(2) + "\n" + text[m.end():nxt.start() if nxt else len(text)]).strip()
+            number = int(m.group(1))
+            if number in sections:
+                repeated.add(number)
+            sections[number] = body
+        return {number: body for number, body in sections.items() if body and number not in repeated}
+
+    def summarize_text(self, text: str, model: str, instruction: str = None, max_chars: int = 4000) -> str:
+        """Summarize text using OpenRouter; text beyond `max_chars` (None = no limit) is cut with a warning"""
         if not instruction:
             instruction = (
                 "You are an expert early-stage investor analyst. Given the text from a startup pitch deck or web pages, extract the most important information an Investment Manager needs: one-line summary, company name (if any), founder names and backgrounds, product description, business model, target market and TAM (explicit if present), traction metrics (revenue, users, growth %), fundraising history / ask, competitors and moat, risks/uncertainties, and 3 quick red flags (if any). Return the answer in MARKDOWN with headings and short bullet points, and include a \"Sources:\" section listing short URLs or snippets of where the info came from (if known). If you are guessing, mark it as a guess."
             )
 
-        max_chunk = 4000
-        if len(text) > max_chunk:
-            text = text[:max_chunk] + "\n\n[TRUNCATED]"
+        if max_chars and len(text) > max_chars:
+            print(f"Warning: summarizing only the first {max_chars} of {len(text)} characters; "
+                  "use map_reduce_summarize for long text")
+            text = text[:max_chars] + "\n\n[TRUNCATED]"
 
         prompt = f"Context:\n\n{text}\n\n{instruction}"
         messages = [{"role": "user", "content": prompt}]
@@ -0,0 +1,150 @@
+"""
+Client-side rate limiting and circuit breaking for OpenRouter calls
+"""
+
+import threading
+import time
+from typing import Dict
+from pitch_deck_analyzer.config import OPENROUTER_RATE_LIMIT, OPENROUTER_RATE_MIN, OPENROUTER_RATE_MAX, OPENROUTER_BURST
+from pitch_deck_analyzer.config import OPENROUTER_CIRCUIT_FAILURES, OPENROUTER_CIRCUIT_RESET
+
+class CircuitOpenError(RuntimeError):
+    """Raised instead of calling OpenRouter while the circuit breaker is open"""
+
+class TokenBucket:
+    """Blocking token bucket with an adaptive rate (AIMD).
+
+    Each success adds `increase / rate` requests/second (about `increase` per second of traffic); a 429
+    halves the rate, at most once per `Retry-After` window since one burst usually earns several 429s,
+    and pauses the bucket until the window has passed.
+    """
+
+    def __init__(self, rate: float = None, burst: int = None, min_rate: float = None, max_rate: float = None,
+                 increase: float = 1.0, decrease: float = 0.5):
+        self.min_rate = OPENROUTER_RATE_MIN if min_rate is None else min_rate
+        self.max_rate = OPENROUTER_RATE_MAX if max_rate is None else max_rate
+        self.rate = min(self.max_rate, max(self.min_rate, OPENROUTER_RATE_LIMIT if rate is None else rate))
+        self.burst = max(1, OPENROUTER_BURST if burst is None else burst)
+        self.increase = increase
+        self.decrease = decrease
+        self.tokens = float(self.burst)
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._cooldown_until = 0.0
+        self._cond = threading.Condition()
+
+    def _refill(self, now: float):
+        self.tokens = min(self.burst, self.tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def acquire(self) -> float:
+        """Wait for a token; returns the seconds spent waiting"""
+        start = time.monotonic()
+        with self._cond:
+            while True:
+                now = time.monotonic()
+                self._refill(now)
+                if now < self._paused_until:
+                    wait = self._paused_until - now
+                elif self.tokens >= 1:
+                    self.tokens -= 1
+                    return now - start
+                else:
+                    wait = (1 - self.tokens) / self.rate
+                self._cond.wait(wait)
+
+    def on_success(self):
+        with self._cond:
+            self.rate = min(self.max_rate, self.rate + self.increase / self.rate)
+
+    def on_throttle(self, retry_after: float = None):
+        """Back off after a 429: cut the rate and hold all requests for `retry_after` seconds"""
+        with self._cond:
+            now = time.monotonic()
+            self._refill(now)
+            pause = retry_after if retry_after else 1.0 / self.rate
+            if now >= self._cooldown_until:
+                self.rate = max(self.min_rate, self.rate * self.decrease)
+                self._cooldown_until = now + max(pause, 1.0)
+            self.tokens = min(self.tokens, 0.0)
+            self._paused_until = max(self._paused_until, now + pause)
+            self._cond.notify_all()
+
+class CircuitBreaker:
+    """Opens after `failures` consecutive failures; after `reset` seconds one probe request is let
+    through (half-open) and its outcome closes or re-opens the circuit."""
+
+    def __init__(self, failures: int = None, reset: float = None, name: str = "OpenRouter"):
+        self.threshold = max(1, OPENROUTER_CIRCUIT_FAILURES if failures is None else failures)
+        self.reset = OPENROUTER_CIRCUIT_RESET if reset is None else reset
+        self.name = name
+        self.failures = 0
+        self._opened_at = None
+        self._probing = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            if self._opened_at is None:
+                return "closed"
+            return "half-open" if time.monotonic() - self._opened_at >= self.reset else "open"
+
+    def before_call(self):
+        """Raise CircuitOpenError while open; in half-open state only one caller may probe"""
+        with self._lock:
+            if self._opened_at is None:
+                return
+            remaining = self._opened_at + self.reset - time.monotonic()
+            if remaining > 0 or self._probing:
+                raise CircuitOpenError(f"{self.name} circuit open after {self.failures} consecutive failures; "
+                                       f"failing fast for {max(remaining, 0):.0f}s more")
+            self._probing = True
+
+    def record_success(self):
+        with self._lock:
+            if self._opened_at is not None:
+                print(f"{self.name} recovered, circuit closed")
+            self.failures = 0
+            self._opened_at = None
+            self._probing = False
+
+    def release(self):
+        """Give back a half-open probe whose call ended without an outcome, so another caller may probe"""
+        with self._lock:
+            self._probing = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            reopen = self._probing
+            self._probing = False
+            if reopen or (self._opened_at is None and self.failures >= self.threshold):
+                self._opened_at = time.monotonic()
+                print(f"{self.name} failing ({self.failures} consecutive failures), circuit open for {self.reset:.0f}s")
+
+class RateGovernor:
+    """Per-model token buckets plus one circuit breaker for the endpoint, shared by every call of a client"""
+
+    def __init__(self, rate: float = None, burst: int = None, failures: int = None, reset: float = None):
+        self.rate = rate
+        self.burst = burst
+        self.breaker = CircuitBreaker(failures, reset)
+        self._buckets: Dict[str, TokenBucket] = {}
+        self._lock = threading.Lock()
+
+    def bucket(self, model: str) -> TokenBucket:
+        with self._lock:
+            bucket = self._buckets.get(model)
+            if bucket is None:
+                bucket = self._buckets[model] = TokenBucket(self.rate, self.burst)
+            return bucket
+
+    def acquire(self, model: str) -> float:
+        """Fail fast if the circuit is open, otherwise wait for the model's bucket; returns seconds waited"""
+        self.breaker.before_call()
+        return self.bucket(model).acquire()
+
+    def rates(self) -> Dict[str, float]:
+        with self._lock:
+            return {model: bucket.rate for model, bucket in self._buckets.items()}
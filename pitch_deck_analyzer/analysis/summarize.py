@@ -0,0 +1,139 @@
+"""
+Map-reduce summarization of long decks
+"""
+
+import re
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Tuple
+from pitch_deck_analyzer.analysis.context import split_sections
+from pitch_deck_analyzer.profiling import span, submit
+from pitch_deck_analyzer.config import MAP_REDUCE_CHUNK_CHARS, MAP_REDUCE_WORKERS
+
+MARKER = re.compile(r"^--- (SLIDE|PAGE) (\d+) ---\n?", re.MULTILINE)
+
+CHUNK_INSTRUCTION = (
+    "You are an expert early-stage investor analyst. The context is a consecutive excerpt of a startup pitch deck. "
+    "Summarize it in concise MARKDOWN bullet points, keeping every concrete fact an Investment Manager needs: "
+    "company and product names, founders and team, market and TAM figures, traction metrics, business model, pricing, "
+    "fundraising ask, competitors and risks. Keep numbers exactly as written. Do not add information that is not in the excerpt."
+)
+REDUCE_INSTRUCTION = (
+    "You are an expert early-stage investor analyst. The context is a sequence of summaries of consecutive parts of one "
+    "startup pitch deck. Merge them into one concise MARKDOWN bullet summary, removing repetition but keeping every "
+    "concrete fact and number exactly as written."
+)
+
+def deck_sections(deck_text: str) -> List[Tuple[str, int, str]]:
+    """(kind, number, body without marker) per slide/page; unmarked text is split into numbered parts"""
+    matches = list(MARKER.finditer(deck_text or ""))
+    if not matches:
+        return [("PART", i + 1, body) for i, body in enumerate(split_sections(deck_text))]
+    sections = []
+    head = deck_text[:matches[0].start()].strip()
+    if head:
+        sections.append(("PART", 0, head))
+    for m, nxt in zip(matches, matches[1:] + [None]):
+        body = deck_text[m.end():nxt.start() if nxt else len(deck_text)].strip()
+        if body:
+            sections.append((m.group(1), int(m.group(2)), body))
+    return sections
+
+def _split_long(body: str, max_chars: int) -> List[str]:
+    """Split an oversized section on line boundaries (hard-cutting single overlong lines)"""
+    pieces, current = [], ""
+    for line in body.splitlines():
+        while len(line) > max_chars:
+            if current:
+                pieces.append(current)
+                current = ""
+            pieces.append(line[:max_chars])
+            line = line[max_chars:]
+        if current and len(current) + len(line) + 1 > max_chars:
+            pieces.append(current)
+            current = ""
+        current = f"{current}\n{line}" if current else line
+    if current:
+        pieces.append(current)
+    return pieces
+
+def _label(kind: str, first: int, last: int) -> str:
+    if first == last:
+        return f"--- {kind} {first} ---"
+    return f"--- {kind}S {first}-{last} ---"
+
+def chunk_sections(sections: List[Tuple[str, int, str]], max_chars: int = None) -> List[Tuple[str, str]]:
+    """Group consecutive sections into (label, text) chunks of at most `max_chars`.
+
+    Boundaries are content-defined: a chunk closes after a section whose checksum hits 1 in 4 (once
+    the chunk is at least a quarter full) or when the next section would overflow it. Editing or
+    inserting a slide therefore only changes the chunks around it; the other chunk prompts stay
+    byte-identical and hit the response cache. Slide numbers are
+    kept in the labels, not the prompts, for the same reason.
+    """
+    max_chars = max_chars or MAP_REDUCE_CHUNK_CHARS
+    chunks = []
+    current, kind, first, last = [], None, None, None
+
+    def close():
+        if current:
+            chunks.append((_label(kind, first, last), "\n\n".join(current)))
+        current.clear()
+
+    for sec_kind, number, body in sections:
+        for piece in _split_long(body, max_chars) if len(body) > max_chars else [body]:
+            if current and (sum(len(p) + 2 for p in current) + len(piece) > max_chars or sec_kind != kind):
+                close()
+            if not current:
+                kind, first = sec_kind, number
+            current.append(piece)
+            last = number
+            if sum(len(p) + 2 for p in current) >= max_chars // 4 and zlib.crc32(piece.encode("utf-8")) % 4 == 0:
+                close()
+    close()
+    return chunks
+
+def _merge_labels(labels: List[str]) -> str:
+    """Label spanning the first and last of several chunk labels"""
+    first = re.match(r"--- (\w+?)S? (\d+)", labels[0])
+    last = re.findall(r"\d+", labels[-1])
+    return _label(first.group(1), int(first.group(2)), int(last[-1]))
+
+def map_reduce_summarize(client, deck_text: str, model: str, max_chars: int = None,
+                         target_chars: int = None, workers: int = None) -> str:
+    """Summarize deck chunks concurrently, then merge summaries until they fit `target_chars`.
+
+    Returns labelled summaries (one `--- SLIDES a-b ---` section each) in deck order. Every chunk is a
+    separate deterministic chat call, so unchanged chunks are served from the client's response cache.
+    """
+    max_chars = max_chars or MAP_REDUCE_CHUNK_CHARS
+    chunks = chunk_sections(deck_sections(deck_text), max_chars)
+    if not chunks:
+        return ""
+
+    def run(items, instruction, stage):
+        with span(stage, items=len(items)), ThreadPoolExecutor(max_workers=max(1, workers or MAP_REDUCE_WORKERS)) as pool:
+            futures = [submit(pool, client.summarize_text, text, model, instruction=instruction, max_chars=None)
+                       for text in items]
+            return [f.result().strip() for f in futures]
+
+    print(f"Summarizing {len(deck_text)} characters of deck text in {len(chunks)} chunks")
+    labels = [label for label, _ in chunks]
+    summaries = run([text for _, text in chunks], CHUNK_INSTRUCTION, "map_reduce.map")
+
+    # Reduce: merge adjacent summaries while the whole still exceeds the target
+    while target_chars and len(summaries) > 1 and sum(len(s) for s in summaries) > target_chars:
+        groups, group = [], []
+        for i, summary in enumerate(summaries):
+            if group and sum(len(summaries[j]) + 2 for j in group) + len(summary) > max_chars:
+                groups.append(group)
+                group = []
+            group.append(i)
+        groups.append(group)
+        if len(groups) == len(summaries):
+            # Summaries too long to pair up; merge them two at a time
+            groups = [list(range(i, min(i + 2, len(summaries)))) for i in range(0, len(summaries), 2)]
+        labels = [_merge_labels([labels[i] for i in g]) for g in groups]
+        summaries = run(["\n\n".join(summaries[i] for i in g) for g in groups], REDUCE_INSTRUCTION, "map_reduce.reduce")
+
+    return "\n\n".join(f"{label}\n{summary}" for label, summary in zip(labels, summaries))
@@ -0,0 +1,140 @@
+"""
+Batch analysis of many decks through shared clients and caches
+"""
+
+import glob
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from pathlib import Path
+from typing import Dict, List
+
+from pitch_deck_analyzer.pipeline import analyze_pitchdeck, report_failed
+from pitch_deck_analyzer.profiling import Profiler, write_prometheus
+from pitch_deck_analyzer.analysis.openrouter import OpenRouterClient, open_llm_cache
+from pitch_deck_analyzer.web import open_page_cache
+from pitch_deck_analyzer.index import open_run_index
+from pitch_deck_analyzer.utils import slugify_filename
+from pitch_deck_analyzer.config import BATCH_WORKERS, IMAGE_ANALYSIS_WORKERS, OPENROUTER_POOL_SIZE
+
+DECK_SUFFIXES = (".pdf", ".pptx")
+
+def collect_inputs(source: str) -> List[Path]:
+    """Decks named by a directory, a glob pattern or a manifest file (one path per line, # comments)"""
+    path = Path(source)
+    if path.is_dir():
+        return sorted(p for p in path.iterdir() if p.suffix.lower() in DECK_SUFFIXES)
+    if path.is_file() and path.suffix.lower() not in DECK_SUFFIXES:
+        decks = []
+        for line in path.read_text(encoding="utf-8").splitlines():
+            line = line.strip()
+            if line and not line.startswith("#"):
+                deck = Path(line)
+                decks.append(deck if deck.is_absolute() else path.parent / deck)
+        return decks
+    if path.is_file():
+        return [path]
+    return sorted(Path(p) for p in glob.glob(source, recursive=True) if Path(p).suffix.lower() in DECK_SUFFIXES)
+
+def _output_paths(inputs: List[Path], output_dir: Path) -> Dict[Path, Path]:
+    """One report path per deck; decks with the same stem get a numeric suffix"""
+    outputs, used = {}, set()
+    for deck in inputs:
+        stem = slugify_filename(deck.stem)
+        name, n = stem, 1
+        while name in used:
+            n += 1
+            name = f"{stem}_{n}"
+        used.add(name)
+        outputs[deck] = output_dir / f"{name}.md"
+    return outputs
+
+def is_up_to_date(deck: Path, report: Path) -> bool:
+    """True if the report exists, is newer than the deck and is not the fallback of a failed synthesis"""
+    return report.exists() and report.stat().st_mtime >= deck.stat().st_mtime and not report_failed(report)
+
+def run_batch(inputs: List[Path], output_dir: Path, workers: int = None, force: bool = False,
+              use_openrouter: bool = True, use_cache: bool = True, image_workers: int = None,
+              profile: bool = False, prometheus: str = None, **analyze_kwargs) -> List[dict]:
+    """Analyze decks concurrently, skipping up-to-date reports; returns one status dict per deck in input order.
+
+    `profile` writes `<report>.profile.json` per deck; `prometheus` is a path for span totals over all decks.
+    """
+    workers = workers or BATCH_WORKERS
+    output_dir.mkdir(parents=True, exist_ok=True)
+    outputs = _output_paths(inputs, output_dir)
+
+    results = {}
+    pending = []
+    for deck in inputs:
+        if not deck.exists():
+            results[deck] = {"deck": str(deck), "report": None, "status": "failed", "seconds": 0.0,
+                             "error": "file not found"}
+        elif not force and is_up_to_date(deck, outputs[deck]):
+            results[deck] = {"deck": str(deck), "report": str(outputs[deck]), "status": "skipped", "seconds": 0.0}
+        else:
+            pending.append(deck)
+
+    # Clients and caches are shared by every deck; the pool covers all concurrent image requests
+    client = None
+    if use_openrouter and pending:
+        pool_size = max(OPENROUTER_POOL_SIZE, workers * (image_workers or IMAGE_ANALYSIS_WORKERS))
+        client = OpenRouterClient(cache=open_llm_cache() if use_cache else None, pool_size=pool_size)
+    page_cache = open_page_cache() if use_cache and pending else None
+    index = open_run_index() if analyze_kwargs.get("use_index", True) and pending else None
+
+    profilers = []
+
+    def run(deck: Path) -> dict:
+        start = time.perf_counter()
+        result = {"deck": str(deck), "report": str(outputs[deck])}
+        profiler = Profiler(deck.name) if profile or prometheus else None
+        if profiler is not None:
+            profilers.append(profiler)
+        try:
+            analyze_pitchdeck(str(deck), str(outputs[deck]), use_openrouter=use_openrouter, use_cache=use_cache,
+                              image_workers=image_workers, client=client, page_cache=page_cache,
+                              index=index, profiler=profiler, profile_path=f"{outputs[deck]}.profile.json" if profile else None,
+                              **analyze_kwargs)
+            result["status"] = "ok"
+        except Exception as e:
+            result["status"] = "failed"
+            result["error"] = str(e)
+        result["seconds"] = time.perf_counter() - start
+        return result
+
+    started = time.perf_counter()
+    try:
+        with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+            futures = {pool.submit(run, deck): deck for deck in pending}
+            for future in as_completed(futures):
+                results[futures[future]] = future.result()
+    finally:
+        if client is not None:
+            client.close()
+            if client.cache is not None:
+                client.cache.close()
+        if page_cache is not None:
+            page_cache.close()
+        if index is not None:
+            index.close()
+
+    ordered = [results[deck] for deck in inputs]
+    print_summary(ordered, time.perf_counter() - started)
+    if prometheus:
+        write_prometheus(prometheus, profilers)
+        print(f"Wrote Prometheus metrics for {len(profilers)} decks to {prometheus}")
+    return ordered
+
+def print_summary(results: List[dict], elapsed: float):
+    """Per-deck status table plus totals"""
+    print("\nBatch summary")
+    print(f"{'status':8} {'seconds':>8}  deck")
+    for r in results:
+        line = f"{r['status']:8} {r['seconds']:8.1f}  {r['deck']}"
+        if r.get("error"):
+            line += f"  ({r['error']})"
+        print(line)
+    counts = {s: sum(1 for r in results if r["status"] == s) for s in ("ok", "skipped", "failed")}
+    rate = counts["ok"] / elapsed * 3600 if elapsed > 0 else 0.0
+    print(f"\n{counts['ok']} ok, {counts['skipped']} skipped, {counts['failed']} failed "
+          f"in {elapsed:.1f}s ({rate:.0f} decks/hour)")
@@ -3,130 +3,16 @@ Command-line interface
 """
 
 import argparse
+import sys
 from pathlib import Path
-from tqdm import tqdm
-
-from pitch_deck_analyzer.utils import ensure_requirements, slugify_filename
-from pitch_deck_analyzer.extractors import extract_from_pdf, extract_from_pptx
-from pitch_deck_analyzer.web import duckduckgo_search, fetch_page_text
-from pitch_deck_analyzer.analysis.openrouter import OpenRouterClient, model_supports_vision
-from pitch_deck_analyzer.analysis.image_analyzer import ImageAnalyzer
-from pitch_deck_analyzer.report_generator import ReportGenerator
-from pitch_deck_analyzer.config import DEFAULT_MODEL, VISION_MODEL
-
-def analyze_pitchdeck(input_path: str, output_path: str, search_online: bool = True, 
-                     model: str = None, vision_model: str = None, use_openrouter: bool = True):
-    """Main analysis pipeline"""
-    model = model or DEFAULT_MODEL
-    vision_model = vision_model or VISION_MODEL or model
-    in_path = Path(input_path)
-    out_path = Path(output_path)
-    tmp_dir = Path(".pda_tmp")
-    tmp_dir.mkdir(parents=True, exist_ok=True)
-    assets_dir = tmp_dir / slugify_filename(in_path.stem)
-    assets_dir.mkdir(parents=True, exist_ok=True)
-
-    if not in_path.exists():
-        raise FileNotFoundError(f"Input file not found: {input_path}")
-
-    print(f"Analyzing: {in_path.name}")
-    print(f"Using model (text): {model}")
-    print(f"Vision model: {vision_model}")
-    print(f"OpenRouter enabled: {use_openrouter}")
-
-    # Extract content
-    if in_path.suffix.lower() == ".pdf":
-        print("Extracting from PDF...")
-        extracted = extract_from_pdf(str(in_path), assets_dir)
-    elif in_path.suffix.lower() == ".pptx":
-        print("Extracting from PPTX...")
-        extracted = extract_from_pptx(str(in_path), assets_dir)
-    else:
-        raise ValueError("Unsupported input format. Only .pdf and .pptx are supported.")
-
-    deck_text = extracted.get("text", "")
-    images = extracted.get("images", [])
-    print(f"Extracted {len(deck_text)} characters of text and {len(images)} images")
-
-    # Get company hint
-    company_hint = None
-    if deck_text:
-        first_lines = [ln.strip() for ln in deck_text.splitlines() if ln.strip()]
-        company_hint = first_lines
-        # if first_lines:
-        #     candidate = first_lines[0]
-        #     if len(candidate.split()) <= 12:
-        #         company_hint = candidate
-
-    client = OpenRouterClient()
-    instruction = "You are an expert analyzer. The provided information is the extracted text from the first page of a pitcher deck. Identify the name of the company from the text. The name is there in the text. Return from you should be just the name of the company, and nothing else."
-    prompt = "\n\n".join(company_hint) + "\n\n" + instruction 
-    messages = [{"role": "user", "content": prompt}]
-    company_hint = client.chat(messages, model=model, max_tokens=1800)
-
-    # Analyze images
-    images_analyses = {}
-    if images and use_openrouter:
-        if not model_supports_vision(vision_model):
-            print(f"Warning: chosen vision model '{vision_model}' does not look vision-capable. Skipping image analyses.")
-            for p in images:
-                images_analyses[str(p.name)] = f"(skipped) model '{vision_model}' not vision-capable"
-        else:
-            
-            analyzer = ImageAnalyzer(client)
-            images_analyses = analyzer.analyze_images(images, model, vision_model)
-
-    # Web search
-    web_texts = []
-    if search_online:
-        query = company_hint or (deck_text.strip().split('\n')[0] if deck_text else "")
-        if query:
-            print(f"Searching web for: {query}")
-            try:
-                results = duckduckgo_search(query)
-                for r in results:
-                    t = fetch_page_text(r)
-                    if t:
-                        web_texts.append(f"Source: {r}\n\n{t}")
-                    if len(web_texts) >= 5:
-                        break
-            except Exception as e:
-                print(f"Web search failed: {e}")
-
-    # Generate report
-    if use_openrouter:
-        try:
-            client = OpenRouterClient()
-            generator = ReportGenerator(client)
-            final_markdown = generator.synthesize_report(
-                deck_text, images_analyses, web_texts, company_hint, model, vision_model
-            )
-        except Exception as e:
-            print(f"OpenRouter synthesis failed: {e}")
-            final_markdown = f"# Analysis failed\nOpenRouter synthesis failed: {e}\n\nRaw extracted text attached below.\n\n---\n\n" + deck_text[:10000]
-    else:
-        generator = ReportGenerator(None)
-        final_markdown = generator.generate_local_report(deck_text, images_analyses)
-
-    # Clean and write report
-    cleaned_markdown = final_markdown
-    if cleaned_markdown.startswith("```markdown"):
-        cleaned_markdown = cleaned_markdown[len("```markdown"):].lstrip("\n")
-    if cleaned_markdown.endswith("```"):
-        cleaned_markdown = cleaned_markdown[:-len("```")].rstrip("\n")
-
-    with open(out_path, "w", encoding="utf-8") as f:
-        f.write(cleaned_markdown)
-
-    print(f"Wrote report to {out_path}")
-    print(f"Assets and extracted images are in: {assets_dir}")
-
-def cli():
-    """Command-line interface"""
-    parser = argparse.ArgumentParser(description="PitchDeck Analyzer: PDF/PPTX -> investor Markdown brief")
-    parser.add_argument("--input", "-i", required=True, help="Input .pdf or .pptx file path")
-    parser.add_argument("--output", "-o", default="report.md", help="Output markdown file path")
-    
+
+from pitch_deck_analyzer.utils import ensure_requirements
+
+# The pipeline and its dependencies are imported after argument parsing, so `--help` and
+# argument errors return without loading them
+
+def _add_analysis_arguments(parser: argparse.ArgumentParser):
+    """Options shared by the single-deck and batch commands"""
     # default = True, and allow disabling it explicitly
     parser.add_argument("--no-search-online", action="store_false", dest="search_online", 
                         help="Disable web search for company info")
@@ -134,15 +20,212 @@ def cli():
     parser.add_argument("--model", default=None, help="OpenRouter model name to use (override default)")
     parser.add_argument("--vision-model", default=None, help="Explicit vision-capable OpenRouter model name (optional)")
     parser.add_argument("--no-openrouter", action="store_true", help="Disable OpenRouter calls and run local-only extraction")
-    
-    args = parser.parse_args()
-    ensure_requirements()
-
-    analyze_pitchdeck(
-        args.input, 
-        args.output, 
+    parser.add_argument("--no-dedup", action="store_true", help="Analyze every image even if it repeats across slides")
+    parser.add_argument("--dedup-threshold", type=int, default=None,
+                        help="Max perceptual-hash distance (0-64) for near-duplicate images; -1 = exact matches only")
+    parser.add_argument("--no-batch-images", action="store_true",
+                        help="Send one image per vision request instead of packing small images by slide")
+    parser.add_argument("--extract-workers", type=int, default=None,
+                        help="Processes used to extract large PDFs (default: PDF_EXTRACT_WORKERS; 1 = serial)")
+    parser.add_argument("--keep-assets", action="store_true",
+                        help="Write extracted images to .pda_tmp/<deck>/ for debugging")
+    parser.add_argument("--no-cache", action="store_true", help="Bypass the on-disk LLM response and web caches")
+    parser.add_argument("--clear-cache", action="store_true", help="Clear the on-disk LLM response and web caches before running")
+    parser.add_argument("--image-workers", type=int, default=None,
+                        help="Maximum concurrent image analysis requests (default: IMAGE_ANALYSIS_WORKERS or 4)")
+    parser.add_argument("--map-reduce", action="store_true", dest="map_reduce", default=None,
+                        help="Summarize the deck in chunks before synthesis (default: only when it exceeds the prompt budget)")
+    parser.add_argument("--no-map-reduce", action="store_false", dest="map_reduce",
+                        help="Never summarize in chunks; long decks are trimmed to the prompt budget instead")
+    parser.add_argument("--no-manifest", action="store_false", dest="use_manifest",
+                        help="Do not compare with or record a per-deck manifest of slide hashes and analyses")
+    parser.add_argument("--no-index", action="store_false", dest="use_index",
+                        help="Do not record the run in the search index or reuse its earlier web results")
+
+def _analysis_kwargs(args) -> dict:
+    """analyze_pitchdeck keyword arguments from parsed shared options"""
+    return dict(
         search_online=args.search_online,   # now defaults to True
         model=args.model, 
         vision_model=args.vision_model, 
-        use_openrouter=not args.no_openrouter
+        use_openrouter=not args.no_openrouter,
+        image_workers=args.image_workers,
+        dedupe_images=not args.no_dedup,
+        dedup_threshold=args.dedup_threshold,
+        batch_images=not args.no_batch_images,
+        extract_workers=args.extract_workers,
+        use_cache=not args.no_cache,
+        keep_assets=args.keep_assets,
+        map_reduce=args.map_reduce,
+        use_manifest=args.use_manifest,
+        use_index=args.use_index
     )
+
+def _clear_caches():
+    from pitch_deck_analyzer.web.cache import open_page_cache
+    from pitch_deck_analyzer.analysis.openrouter import open_llm_cache
+
+    for cache in (open_llm_cache(), open_page_cache()):
+        cache.clear()
+        cache.close()
+    print("Cleared LLM response and web caches")
+
+def batch_cli(argv: list = None):
+    """`batch` subcommand: analyze a directory, glob or manifest of decks"""
+    parser = argparse.ArgumentParser(prog="main.py batch",
+                                     description="Analyze many decks with shared clients and caches")
+    parser.add_argument("source", help="Directory of decks, glob pattern (quote it), or manifest file with one path per line")
+    parser.add_argument("--output-dir", "-o", default="reports", help="Directory for the Markdown reports")
+    parser.add_argument("--workers", "-w", type=int, default=None,
+                        help="Decks processed concurrently (default: BATCH_WORKERS or 4)")
+    parser.add_argument("--force", action="store_true", help="Re-analyze decks whose report is newer than the deck")
+    parser.add_argument("--profile", action="store_true",
+                        help="Write a JSON timing/token profile next to each report (<report>.profile.json)")
+    parser.add_argument("--prometheus", default=None, metavar="PATH",
+                        help="Write span totals over all analyzed decks as Prometheus text to PATH")
+    _add_analysis_arguments(parser)
+
+    args = parser.parse_args(argv)
+    from pitch_deck_analyzer.batch import collect_inputs, run_batch
+
+    if args.clear_cache:
+        _clear_caches()
+
+    inputs = collect_inputs(args.source)
+    if not inputs:
+        print(f"No .pdf or .pptx decks found in {args.source}")
+        return 1
+    ensure_requirements({deck.suffix.lower() for deck in inputs})
+    results = run_batch(inputs, Path(args.output_dir), workers=args.workers, force=args.force,
+                        profile=args.profile, prometheus=args.prometheus, **_analysis_kwargs(args))
+    return 1 if any(r["status"] == "failed" for r in results) else 0
+
+def serve_cli(argv: list = None):
+    """`serve` subcommand: local HTTP service with a persistent job queue"""
+    parser = argparse.ArgumentParser(prog="main.py serve",
+                                     description="Serve deck analysis over HTTP with a persistent job queue")
+    parser.add_argument("--host", default="127.0.0.1", help="Interface to bind (default: 127.0.0.1)")
+    parser.add_argument("--port", type=int, default=8080, help="Port to listen on (default: 8080)")
+    parser.add_argument("--workers", "-w", type=int, default=None,
+                        help="Jobs analyzed concurrently (default: SERVICE_WORKERS or 2)")
+    parser.add_argument("--queue-size", type=int, default=None,
+                        help="Queued jobs before new uploads get 429 (default: SERVICE_QUEUE_SIZE or 16)")
+    parser.add_argument("--data-dir", default=None,
+                        help="Job store, uploads and reports (default: PDA_SERVICE_DIR or .pda_service)")
+    _add_analysis_arguments(parser)
+
+    args = parser.parse_args(argv)
+    ensure_requirements()
+    from pitch_deck_analyzer.service import serve
+
+    if args.clear_cache:
+        _clear_caches()
+
+    serve(args.host, args.port, data_dir=args.data_dir, workers=args.workers, queue_size=args.queue_size,
+          **_analysis_kwargs(args))
+    return 0
+
+def search_cli(argv: list = None):
+    """`search` subcommand: ranked full-text search over the index of analyzed decks"""
+    parser = argparse.ArgumentParser(prog="main.py search",
+                                     description="Search the index of analyzed decks, image summaries, web sources and reports")
+    parser.add_argument("query", nargs="?", default=None,
+                        help='Words, "exact phrases", AND/OR/NOT and prefix* terms (SQLite FTS5 syntax)')
+    parser.add_argument("--company", default=None,
+                        help="Only runs of this company; without a query, list its runs and their KPIs")
+    parser.add_argument("--since", default=None, help="Only runs analyzed on or after this date (YYYY-MM-DD)")
+    parser.add_argument("--limit", "-n", type=int, default=10, help="Maximum results (default: 10)")
+    parser.add_argument("--json", action="store_true", help="Print the results as JSON")
+    parser.add_argument("--index", default=None,
+                        help="Index file (default: PDA_INDEX_PATH or .pda_cache/index.sqlite3)")
+
+    args = parser.parse_args(argv)
+    if not args.query and not args.company:
+        parser.error("give a query, --company, or both")
+    import json
+    import time
+    from pitch_deck_analyzer.index import RunIndex
+
+    since = None
+    if args.since:
+        try:
+            since = time.mktime(time.strptime(args.since, "%Y-%m-%d"))
+        except ValueError:
+            parser.error(f"--since expects YYYY-MM-DD, got {args.since!r}")
+    index = RunIndex(args.index)
+    start = time.perf_counter()
+    try:
+        if args.query:
+            results = index.search(args.query, limit=args.limit, company=args.company, since=since)
+        else:
+            results = [r for r in index.runs_for(args.company, limit=args.limit) if since is None or r["analyzed"] >= since]
+    finally:
+        index.close()
+    elapsed = time.perf_counter() - start
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return 0
+    for rank, r in enumerate(results, 1):
+        analyzed = time.strftime("%Y-%m-%d %H:%M", time.localtime(r["analyzed"]))
+        print(f"{rank}. {r['company'] or '(unknown company)'} - {r['deck']} ({analyzed})")
+        print(f"   report: {r['report_path']}")
+        if r.get("snippet"):
+            print(f"   {' '.join(r['snippet'].split())}")
+        for metric, entries in (r.get("kpis") or {}).items():
+            print(f"   {metric}: {', '.join(e['text'] for e in entries[:3])}")
+    print(f"{len(results)} result(s) in {elapsed * 1000:.0f} ms")
+    return 0
+
+def cli(argv: list = None):
+    """Command-line interface"""
+    argv = sys.argv[1:] if argv is None else argv
+    if argv and argv[0] == "batch":
+        sys.exit(batch_cli(argv[1:]))
+    if argv and argv[0] == "serve":
+        sys.exit(serve_cli(argv[1:]))
+    if argv and argv[0] == "search":
+        sys.exit(search_cli(argv[1:]))
+
+    parser = argparse.ArgumentParser(description="PitchDeck Analyzer: PDF/PPTX -> investor Markdown brief",
+                                     epilog="Run 'main.py batch -h' to analyze a folder of decks, "
+                                            "'main.py serve -h' to run the HTTP service, "
+                                            "or 'main.py search -h' to search earlier analyses.")
+    parser.add_argument("--input", "-i", required=True, help="Input .pdf or .pptx file path")
+    parser.add_argument("--output", "-o", default="report.md", help="Output markdown file path")
+    parser.add_argument("--stream", action="store_true",
+                        help="Stream the synthesized report to the output file and stdout as it is generated")
+    parser.add_argument("--manifest", default=None,
+                        help="Manifest file to compare with and update (default: .pda_cache/manifests/<deck name without version>-<folder hash>.json)")
+    parser.add_argument("--profile", nargs="?", const="", default=None, metavar="PATH",
+                        help="Write a JSON timing/token profile of the run (default PATH: <output>.profile.json)")
+    parser.add_argument("--prometheus", default=None, metavar="PATH",
+                        help="Write the run's span totals as Prometheus text to PATH")
+    _add_analysis_arguments(parser)
+    
+    args = parser.parse_args(argv)
+    ensure_requirements({Path(args.input).suffix.lower()})
+
+    if args.clear_cache:
+        _clear_caches()
+
+    from pitch_deck_analyzer.pipeline import SynthesisError, analyze_pitchdeck
+    profiler = profile_path = None
+    if args.profile is not None or args.prometheus:
+        from pitch_deck_analyzer.profiling import Profiler
+        profiler = Profiler(Path(args.input).name)
+        if args.profile is not None:
+            profile_path = args.profile or f"{args.output}.profile.json"
+    failed = False
+    try:
+        analyze_pitchdeck(args.input, args.output, stream=args.stream, manifest=args.manifest,
+                          profiler=profiler, profile_path=profile_path, **_analysis_kwargs(args))
+    except SynthesisError as e:
+        print(f"Error: {e}; {args.output} only holds the extracted text")
+        failed = True
+    if args.prometheus:
+        from pitch_deck_analyzer.profiling import write_prometheus
+        write_prometheus(args.prometheus, [profiler])
+        print(f"Wrote Prometheus metrics to {args.prometheus}")
+    if failed:
+        sys.exit(1)
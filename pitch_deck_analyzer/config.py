@@ -3,9 +3,21 @@ Configuration settings
 """
 
 import os
-from dotenv import load_dotenv
+from pathlib import Path
 
-load_dotenv()
+def _find_dotenv() -> Path:
+    """Nearest .env walking up from this package, where load_dotenv() looks by default"""
+    for directory in Path(__file__).resolve().parents:
+        candidate = directory / ".env"
+        if candidate.is_file():
+            return candidate
+    return None
+
+# python-dotenv is only imported when there is a .env file to load
+_DOTENV = _find_dotenv()
+if _DOTENV is not None:
+    from dotenv import load_dotenv
+    load_dotenv(_DOTENV)
 
 # API Configuration
 OPENROUTER_API_URL = os.environ.get("OPENROUTER_API_URL")
@@ -17,8 +29,89 @@ VISION_MODEL = os.environ.get("OPENROUTER_VISION_MODEL")
 THUMB_MAX_DIM = 1024
 THUMB_QUALITY = 70
 IMAGE_SEND_MAX_BYTES = int(os.environ.get("IMAGE_SEND_MAX_BYTES", 600_000))
+IMAGE_ANALYSIS_WORKERS = int(os.environ.get("IMAGE_ANALYSIS_WORKERS", 4))
+# Batched vision: up to IMAGE_BATCH_MAX_IMAGES images (within IMAGE_SEND_MAX_BYTES in total) per request; 1 disables
+IMAGE_BATCH_MAX_IMAGES = int(os.environ.get("IMAGE_BATCH_MAX_IMAGES", 6))
+# Images narrower or shorter than this many pixels (icons, bullets, divider lines) are not analyzed
+IMAGE_MIN_DIM = int(os.environ.get("IMAGE_MIN_DIM", 48))
+# Max dHash Hamming distance (of 64 bits) for two images to count as near-duplicates; -1 = exact only
+IMAGE_DEDUP_THRESHOLD = int(os.environ.get("IMAGE_DEDUP_THRESHOLD", -1))
+
+# OpenRouter retries (429 / 5xx), exponential backoff with full jitter
+OPENROUTER_MAX_RETRIES = int(os.environ.get("OPENROUTER_MAX_RETRIES", 3))
+OPENROUTER_BACKOFF_BASE = float(os.environ.get("OPENROUTER_BACKOFF_BASE", 1.0))
+OPENROUTER_BACKOFF_MAX = float(os.environ.get("OPENROUTER_BACKOFF_MAX", 30.0))
+# Client-side rate governor: per-model token bucket (requests/second) that halves on 429 and creeps back
+# up on success, and 429 retries that wait for it (separate from the 5xx / connection-error budget)
+OPENROUTER_RATE_LIMIT = float(os.environ.get("OPENROUTER_RATE_LIMIT", 8.0))
+OPENROUTER_RATE_MIN = float(os.environ.get("OPENROUTER_RATE_MIN", 0.2))
+OPENROUTER_RATE_MAX = float(os.environ.get("OPENROUTER_RATE_MAX", 50.0))
+OPENROUTER_BURST = int(os.environ.get("OPENROUTER_BURST", 8))
+OPENROUTER_MAX_THROTTLE_RETRIES = int(os.environ.get("OPENROUTER_MAX_THROTTLE_RETRIES", 8))
+# Circuit breaker: fail fast for OPENROUTER_CIRCUIT_RESET seconds after this many consecutive 5xx/connection failures
+OPENROUTER_CIRCUIT_FAILURES = int(os.environ.get("OPENROUTER_CIRCUIT_FAILURES", 5))
+OPENROUTER_CIRCUIT_RESET = float(os.environ.get("OPENROUTER_CIRCUIT_RESET", 30.0))
+# Keep-alive connections held per client; should cover the image workers plus synthesis
+OPENROUTER_POOL_SIZE = int(os.environ.get("OPENROUTER_POOL_SIZE", max(10, IMAGE_ANALYSIS_WORKERS)))
+
+# PDF extraction: documents with at least PDF_PARALLEL_MIN_PAGES pages are split across processes
+PDF_EXTRACT_WORKERS = int(os.environ.get("PDF_EXTRACT_WORKERS", min(4, os.cpu_count() or 1)))
+PDF_PARALLEL_MIN_PAGES = int(os.environ.get("PDF_PARALLEL_MIN_PAGES", 32))
+# Extraction keeps at most this many image bytes in memory; older images are spilled to a temp directory
+EXTRACT_MAX_RETAINED_BYTES = int(os.environ.get("EXTRACT_MAX_RETAINED_BYTES", 256 * 1024 * 1024))
+
+# Pipeline: the company-name stage starts once this many pages are extracted
+COMPANY_HINT_PAGES = int(os.environ.get("COMPANY_HINT_PAGES", 3))
+# The company name is guessed locally from the title-slide layout; the LLM is only asked below this confidence
+COMPANY_MIN_CONFIDENCE = float(os.environ.get("COMPANY_MIN_CONFIDENCE", 0.5))
+
+# Synthesis prompt budget (estimated input tokens). MODEL_TOKEN_BUDGETS overrides per model,
+# e.g. "openai/gpt-4o=30000,mistral=8000" (substring match on the model name)
+CONTEXT_TOKEN_BUDGET = int(os.environ.get("CONTEXT_TOKEN_BUDGET", 12000))
+MODEL_TOKEN_BUDGETS = {
+    name.strip(): int(budget)
+    for name, _, budget in (item.partition("=") for item in os.environ.get("MODEL_TOKEN_BUDGETS", "").split(","))
+    if name.strip() and budget.strip()
+}
+CHARS_PER_TOKEN = 4
+
+# Map-reduce summarization: decks whose text exceeds the deck share of the prompt budget are
+# summarized in chunks of about MAP_REDUCE_CHUNK_CHARS characters before synthesis
+MAP_REDUCE_CHUNK_CHARS = int(os.environ.get("MAP_REDUCE_CHUNK_CHARS", 6000))
+MAP_REDUCE_WORKERS = int(os.environ.get("MAP_REDUCE_WORKERS", 4))
+
+# Batch mode: decks analyzed concurrently
+BATCH_WORKERS = int(os.environ.get("BATCH_WORKERS", 4))
+
+# HTTP service mode (`main.py serve`): job store, uploads and reports live in SERVICE_DIR
+SERVICE_DIR = os.environ.get("PDA_SERVICE_DIR", ".pda_service")
+SERVICE_WORKERS = int(os.environ.get("SERVICE_WORKERS", 2))
+SERVICE_QUEUE_SIZE = int(os.environ.get("SERVICE_QUEUE_SIZE", 16))   # queued jobs before POST /jobs returns 429
+SERVICE_MAX_UPLOAD_BYTES = int(os.environ.get("SERVICE_MAX_UPLOAD_BYTES", 100 * 1024 * 1024))
+
+# Response cache (deterministic temperature 0.0 chat calls)
+CACHE_DIR = os.environ.get("PDA_CACHE_DIR", ".pda_cache")
+LLM_CACHE_MAX_BYTES = int(os.environ.get("LLM_CACHE_MAX_BYTES", 256 * 1024 * 1024))
+LLM_CACHE_TTL = float(os.environ.get("LLM_CACHE_TTL", 30 * 24 * 3600))
+
+# Run index: every analysis is recorded in a full-text index (`main.py search`); web results of a
+# company's run younger than INDEX_WEB_REUSE_TTL seconds are reused instead of searching again (0 = never)
+INDEX_PATH = os.environ.get("PDA_INDEX_PATH", os.path.join(CACHE_DIR, "index.sqlite3"))
+INDEX_WEB_REUSE_TTL = float(os.environ.get("INDEX_WEB_REUSE_TTL", 7 * 24 * 3600))
 
 # Web search
-MAX_SEARCH_RESULTS = 5
-MAX_RESOURCES = 15
+MAX_SEARCH_RESULTS = 5   # pages of web text passed to synthesis
+MAX_RESOURCES = 15       # candidate URLs requested from search
+WEB_FETCH_WORKERS = int(os.environ.get("WEB_FETCH_WORKERS", 8))
+WEB_FETCH_PER_HOST = int(os.environ.get("WEB_FETCH_PER_HOST", 2))
+WEB_FETCH_DEADLINE = float(os.environ.get("WEB_FETCH_DEADLINE", 20.0))
+DUCKDUCKGO_URL = os.environ.get("DUCKDUCKGO_URL", "https://duckduckgo.com/html/")
+# Page bodies are streamed: non-HTML responses are skipped and reading stops after WEB_MAX_PARAGRAPHS
+# <p> elements or WEB_MAX_BODY_BYTES, whichever comes first
+WEB_MAX_BODY_BYTES = int(os.environ.get("WEB_MAX_BODY_BYTES", 2 * 1024 * 1024))
+WEB_MAX_PARAGRAPHS = int(os.environ.get("WEB_MAX_PARAGRAPHS", 10))
+
+# Web cache: pages are revalidated with ETag/Last-Modified, search results expire after WEB_SEARCH_TTL
+WEB_CACHE_MAX_BYTES = int(os.environ.get("WEB_CACHE_MAX_BYTES", 128 * 1024 * 1024))
+WEB_SEARCH_TTL = float(os.environ.get("WEB_SEARCH_TTL", 24 * 3600))
 USER_AGENT = "Mozilla/5.0 (compatible; PitchDeckAnalyzer/1.0; +https://example.com)"
\ No newline at end of file
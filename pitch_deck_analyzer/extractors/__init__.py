@@ -2,7 +2,31 @@
 File extractors for different formats
 """
 
-from .pdf import extract_from_pdf
-from .pptx import extract_from_pptx
+import importlib
 
-__all__ = ['extract_from_pdf', 'extract_from_pptx']
\ No newline at end of file
+# Exported name -> submodule; submodules (and PyMuPDF / python-pptx behind them) load on first access
+_EXPORTS = {
+    'extract_from_pdf': '.pdf',
+    'extract_from_pptx': '.pptx',
+    'iter_pdf_pages': '.pdf',
+    'iter_pptx_slides': '.pptx',
+    'ImageHandle': '.images',
+    'ImageSpool': '.images',
+    'BaseExtractor': '.base',
+    'PageRecord': '.base',
+    'extractor_for': '.base',
+    'PdfExtractor': '.pdf',
+    'PptxExtractor': '.pptx',
+}
+
+__all__ = list(_EXPORTS)
+
+def __getattr__(name):
+    if name in _EXPORTS:
+        value = getattr(importlib.import_module(_EXPORTS[name], __name__), name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+def __dir__():
+    return sorted(set(globals()) | set(_EXPORTS))
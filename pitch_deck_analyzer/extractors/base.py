@@ -4,9 +4,67 @@ Base extractor interface
 
 from abc import ABC, abstractmethod
 from pathlib import Path
-from typing import Dict, List
+from typing import Dict, Iterator, List
+
+class PageRecord:
+    """One extracted page or slide: its number, marked-up text and image handles.
+
+    Unpacks like the (number, text, images) tuples the streaming extractors used to yield.
+    """
+
+    __slots__ = ("number", "kind", "text", "images")
+
+    def __init__(self, number: int, kind: str, text: str, images: List = None):
+        self.number = number
+        self.kind = kind  # "PAGE" or "SLIDE", as in the "--- PAGE n ---" text marker
+        self.text = text
+        self.images = images or []
+
+    @property
+    def title(self) -> str:
+        """First line of the page text after its marker"""
+        lines = [ln.strip() for ln in self.text.splitlines()[1:] if ln.strip()]
+        return lines[0] if lines else ""
+
+    @property
+    def image_bytes(self) -> int:
+        return sum(image.size for image in self.images)
+
+    def __iter__(self):
+        return iter((self.number, self.text, self.images))
+
+    def __repr__(self) -> str:
+        return f"PageRecord({self.kind} {self.number}, {len(self.text)} chars, {len(self.images)} images)"
 
 class BaseExtractor(ABC):
+    """Extractors stream one PageRecord per page/slide; `extract` collects them for callers that want it all"""
+
     @abstractmethod
-    def extract(self, file_path: str, output_dir: Path) -> Dict[str, any]:
-        pass
\ No newline at end of file
+    def iter_pages(self, file_path: str) -> Iterator[PageRecord]:
+        pass
+
+    def extract(self, file_path: str, output_dir: Path = None) -> Dict[str, any]:
+        """Whole-document text and image list; images are only written to disk when `output_dir` is given"""
+        full_text = []
+        images = []
+        for record in self.iter_pages(file_path):
+            if record.text:
+                full_text.append(record.text)
+            images.extend(record.images)
+
+        if output_dir is not None:
+            for image in images:
+                image.spill(output_dir)
+
+        return {"text": "\n".join(full_text), "images": images}
+
+def extractor_for(file_path, workers: int = None) -> BaseExtractor:
+    """Extractor for a .pdf or .pptx path; only that format's parser is imported"""
+    suffix = Path(file_path).suffix.lower()
+    if suffix == ".pdf":
+        from pitch_deck_analyzer.extractors.pdf import PdfExtractor
+        return PdfExtractor(workers)
+    if suffix == ".pptx":
+        from pitch_deck_analyzer.extractors.pptx import PptxExtractor
+        return PptxExtractor()
+    raise ValueError("Unsupported input format. Only .pdf and .pptx are supported.")
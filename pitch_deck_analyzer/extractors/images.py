@@ -0,0 +1,123 @@
+"""
+In-memory handles for extracted images
+"""
+
+import hashlib
+import shutil
+import tempfile
+from collections import deque
+from io import BytesIO
+from pathlib import Path
+from pitch_deck_analyzer.config import EXTRACT_MAX_RETAINED_BYTES
+
+class ImageHandle:
+    """Extracted image kept in memory; exposes the Path-like bits (name, suffix, read_bytes) the pipeline uses.
+
+    Once spilled, the bytes can be released from memory; they are then re-read from `path` on use.
+    """
+
+    __slots__ = ("name", "page", "path", "_data", "_size", "_digest")
+
+    def __init__(self, data: bytes, name: str, page: int = None):
+        self._data = data
+        self._size = len(data)
+        self.name = name
+        self.page = page
+        self.path = None  # set once spilled to disk
+        self._digest = None
+
+    @property
+    def suffix(self) -> str:
+        return Path(self.name).suffix
+
+    @property
+    def buffer(self) -> memoryview:
+        """Zero-copy view of the encoded bytes"""
+        return memoryview(self.read_bytes())
+
+    @property
+    def size(self) -> int:
+        return self._size
+
+    @property
+    def in_memory(self) -> bool:
+        return self._data is not None
+
+    @property
+    def digest(self) -> str:
+        """SHA-256 of the encoded bytes (computed once)"""
+        if self._digest is None:
+            self._digest = hashlib.sha256(self.read_bytes()).hexdigest()
+        return self._digest
+
+    def read_bytes(self) -> bytes:
+        data = self._data
+        return data if data is not None else self.path.read_bytes()
+
+    def open(self):
+        """Open as a PIL image; pixels are only decoded when first accessed"""
+        from PIL import Image
+        return Image.open(BytesIO(self.read_bytes()))
+
+    def spill(self, out_dir: Path) -> Path:
+        """Write the image to `out_dir` (for debugging) and remember where it went"""
+        out_dir.mkdir(parents=True, exist_ok=True)
+        self.path = out_dir / self.name
+        self.path.write_bytes(self.read_bytes())
+        return self.path
+
+    def release(self) -> int:
+        """Drop the in-memory bytes of a spilled image (its digest is kept); returns the bytes freed"""
+        if self._data is None or self.path is None:
+            return 0
+        self.digest  # hashed while the bytes are at hand
+        self._data = None
+        return self._size
+
+    def __repr__(self) -> str:
+        where = "" if self._data is not None else f", on disk at {self.path}"
+        return f"ImageHandle({self.name!r}, {self._size} bytes{where})"
+
+class ImageSpool:
+    """Bounds the image bytes an extraction keeps in memory.
+
+    Images are added in extraction order; once more than `max_bytes` are held, the oldest are written
+    to `spill_dir` (a temporary directory removed by `close()` unless given) and released, so memory
+    stays flat however long the deck is. Images already spilled elsewhere are just released.
+    """
+
+    def __init__(self, max_bytes: int = None, spill_dir: Path = None):
+        self.max_bytes = EXTRACT_MAX_RETAINED_BYTES if max_bytes is None else max_bytes
+        self.spill_dir = spill_dir
+        self._owns_dir = False
+        self._held = deque()
+        self.retained = 0
+        self.spilled = 0
+
+    def add(self, image: ImageHandle):
+        if not image.in_memory:
+            return
+        self._held.append(image)
+        self.retained += image.size
+        while self.retained > self.max_bytes and self._held:
+            oldest = self._held.popleft()
+            if oldest.path is None:
+                if self.spill_dir is None:
+                    self.spill_dir = Path(tempfile.mkdtemp(prefix="pda_spool_"))
+                    self._owns_dir = True
+                oldest.spill(self.spill_dir)
+            self.retained -= oldest.release()
+            self.spilled += 1
+
+    def close(self):
+        """Remove the spill directory if the spool created it (spilled images can no longer be read)"""
+        if self._owns_dir and self.spill_dir is not None:
+            shutil.rmtree(self.spill_dir, ignore_errors=True)
+            self.spill_dir = None
+            self._owns_dir = False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -3,39 +3,108 @@ PDF extraction using PyMuPDF
 """
 
 import fitz
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
-from typing import Dict, List
-
-def extract_from_pdf(pdf_path: str, out_dir: Path) -> Dict[str, any]:
-    """Extract text and images from PDF"""
-    doc = fitz.open(pdf_path)
-    full_text = []
-    images = []
-    out_dir.mkdir(parents=True, exist_ok=True)
-
-    for page_num in range(len(doc)):
-        page = doc[page_num]
-        text = page.get_text().strip()
-        if text:
-            full_text.append(text + "\n")
-
-        image_list = page.get_images(full=True)
-        for img_index, img in enumerate(image_list):
-            xref = img[0]
-            try:
-                pix = fitz.Pixmap(doc, xref)
-                ext = "png"
-                if pix.n < 5:
-                    img_bytes = pix.tobytes()
-                else:
-                    pix = fitz.Pixmap(fitz.csRGB, pix)
-                    img_bytes = pix.tobytes()
-                filename = out_dir / f"page{page_num+1}_img{img_index+1}.{ext}"
-                with open(filename, "wb") as f:
-                    f.write(img_bytes)
-                images.append(filename)
-                pix = None
-            except Exception as e:
-                print(f"Warning: failed to extract image on page {page_num+1}: {e}")
-    
-    return {"text": "\n".join(full_text), "images": images}
\ No newline at end of file
+from typing import Dict, Iterator, List, Tuple
+from pitch_deck_analyzer.config import PDF_EXTRACT_WORKERS, PDF_PARALLEL_MIN_PAGES
+from pitch_deck_analyzer.extractors.base import BaseExtractor, PageRecord
+from pitch_deck_analyzer.extractors.images import ImageHandle
+
+# Rendered images kept per document handle so repeated logos/backgrounds are decoded once
+RENDER_CACHE_BYTES = 32 * 1024 * 1024
+# MuPDF keeps decoded streams in a process-wide store of up to 256 MB; emptying it every few pages keeps
+# memory flat on long image-heavy documents without re-parsing fonts on every page
+STORE_SHRINK_PAGES = 8
+
+def _iter_page_range(pdf_path: str, start: int, stop: int) -> Iterator[PageRecord]:
+    """Yield a PageRecord per page in [start, stop); opens its own document handle"""
+    rendered = {}  # xref -> PNG bytes, up to RENDER_CACHE_BYTES
+    rendered_bytes = 0
+    with fitz.open(pdf_path) as doc:
+        for page_num in range(start, stop):
+            page = doc[page_num]
+            text = page.get_text().strip()
+            images = []
+
+            image_list = page.get_images(full=True)
+            for img_index, img in enumerate(image_list):
+                xref = img[0]
+                try:
+                    ext = "png"
+                    img_bytes = rendered.get(xref)
+                    if img_bytes is None:
+                        pix = fitz.Pixmap(doc, xref)
+                        if pix.n < 5:
+                            img_bytes = pix.tobytes()
+                        else:
+                            pix = fitz.Pixmap(fitz.csRGB, pix)
+                            img_bytes = pix.tobytes()
+                        if rendered_bytes + len(img_bytes) <= RENDER_CACHE_BYTES:
+                            rendered[xref] = img_bytes
+                            rendered_bytes += len(img_bytes)
+                        pix = None
+                    images.append(ImageHandle(img_bytes, f"page{page_num+1}_img{img_index+1}.{ext}", page_num + 1))
+                except Exception as e:
+                    print(f"Warning: failed to extract image on page {page_num+1}: {e}")
+
+            if (page_num - start + 1) % STORE_SHRINK_PAGES == 0:
+                fitz.TOOLS.store_shrink(100)
+            yield PageRecord(page_num + 1, "PAGE", f"--- PAGE {page_num + 1} ---\n{text}\n" if text else "", images)
+
+def _extract_page_range(pdf_path: str, start: int, stop: int) -> List[PageRecord]:
+    """List form of _iter_page_range, for worker processes"""
+    return list(_iter_page_range(pdf_path, start, stop))
+
+def _page_ranges(page_count: int, parts: int) -> List[Tuple[int, int]]:
+    """Split [0, page_count) into at most `parts` contiguous ranges"""
+    parts = max(1, min(parts, page_count))
+    step, extra = divmod(page_count, parts)
+    ranges, start = [], 0
+    for i in range(parts):
+        stop = start + step + (1 if i < extra else 0)
+        ranges.append((start, stop))
+        start = stop
+    return ranges
+
+def iter_pdf_pages(pdf_path: str, workers: int = None) -> Iterator[PageRecord]:
+    """Yield a PageRecord (unpacks as (page number, text, image handles)) per page, in page order.
+
+    Small documents are read serially, page by page. Documents with at least PDF_PARALLEL_MIN_PAGES
+    pages are split into contiguous ranges extracted by worker processes, each with its own fitz
+    handle; a range is yielded as soon as it and all earlier ranges are done. Only a window of
+    ranges is in flight at a time, so finished-but-unconsumed pages never pile up in memory.
+    """
+    workers = workers or PDF_EXTRACT_WORKERS
+    with fitz.open(pdf_path) as doc:
+        page_count = len(doc)
+
+    if workers <= 1 or page_count < PDF_PARALLEL_MIN_PAGES:
+        yield from _iter_page_range(pdf_path, 0, page_count)
+        return
+
+    # Small ranges (about 8 pages, at least workers * 4 of them) so the first pages are handed downstream
+    # early and each in-flight range holds few images
+    ranges = deque(_page_ranges(page_count, max(workers * 4, page_count // 8)))
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        window = deque()
+        while ranges or window:
+            while ranges and len(window) < workers * 2:
+                window.append(pool.submit(_extract_page_range, pdf_path, *ranges.popleft()))
+            yield from window.popleft().result()
+
+class PdfExtractor(BaseExtractor):
+    """PyMuPDF extractor; `workers` processes share large documents (see iter_pdf_pages)"""
+
+    def __init__(self, workers: int = None):
+        self.workers = workers
+
+    def iter_pages(self, file_path: str) -> Iterator[PageRecord]:
+        return iter_pdf_pages(str(file_path), self.workers)
+
+def extract_from_pdf(pdf_path: str, out_dir: Path = None, workers: int = None) -> Dict[str, any]:
+    """Extract text and in-memory images from PDF, splitting large documents across worker processes.
+
+    Images are only written to disk when `out_dir` is given.
+    """
+    return PdfExtractor(workers).extract(pdf_path, out_dir)
@@ -5,17 +5,18 @@ PPTX extraction using python-pptx
 from pptx import Presentation
 from pptx.enum.shapes import MSO_SHAPE_TYPE
 from pathlib import Path
-from typing import Dict
+from typing import Dict, Iterator
+from pitch_deck_analyzer.extractors.base import BaseExtractor, PageRecord
+from pitch_deck_analyzer.extractors.images import ImageHandle
 
-def extract_from_pptx(pptx_path: str, out_dir: Path) -> Dict[str, any]:
-    """Extract text and images from PPTX"""
+def iter_pptx_slides(pptx_path: str) -> Iterator[PageRecord]:
+    """Yield a PageRecord (unpacks as (slide number, slide text, image handles)) one slide at a time"""
     prs = Presentation(pptx_path)
-    out_dir.mkdir(parents=True, exist_ok=True)
-    full_text = []
-    images = []
+    image_count = 0
 
     for slide_index, slide in enumerate(prs.slides):
         slide_texts = []
+        images = []
         for shape in slide.shapes:
             try:
                 if hasattr(shape, "text"):
@@ -29,15 +30,20 @@ def extract_from_pptx(pptx_path: str, out_dir: Path) -> Dict[str, any]:
                 if shape.shape_type == MSO_SHAPE_TYPE.PICTURE:
                     img = shape.image
                     ext = img.ext or "png"
-                    blob = img.blob
-                    filename = out_dir / f"slide{slide_index+1}_img_{len(images)+1}.{ext}"
-                    with open(filename, "wb") as f:
-                        f.write(blob)
-                    images.append(filename)
+                    image_count += 1
+                    images.append(ImageHandle(img.blob, f"slide{slide_index+1}_img_{image_count}.{ext}", slide_index + 1))
             except Exception:
                 pass
 
-        if slide_texts:
-            full_text.append(f"--- SLIDE {slide_index + 1} ---\n" + "\n".join(slide_texts) + "\n")
+        text = (f"--- SLIDE {slide_index + 1} ---\n" + "\n".join(slide_texts) + "\n") if slide_texts else ""
+        yield PageRecord(slide_index + 1, "SLIDE", text, images)
 
-    return {"text": "\n".join(full_text), "images": images}
\ No newline at end of file
+class PptxExtractor(BaseExtractor):
+    """python-pptx extractor"""
+
+    def iter_pages(self, file_path: str) -> Iterator[PageRecord]:
+        return iter_pptx_slides(str(file_path))
+
+def extract_from_pptx(pptx_path: str, out_dir: Path = None) -> Dict[str, any]:
+    """Extract text and in-memory images from PPTX; images are only written to disk when `out_dir` is given"""
+    return PptxExtractor().extract(pptx_path, out_dir)
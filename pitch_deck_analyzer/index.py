@@ -0,0 +1,133 @@
+"""
+Full-text index of analyzed decks and reports (SQLite FTS5)
+"""
+
+import json
+import re
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import List
+from pitch_deck_analyzer.config import INDEX_PATH, INDEX_WEB_REUSE_TTL
+
+# bm25 weights for the runs_fts columns: company, deck, text, images, web, report
+COLUMN_WEIGHTS = (8.0, 4.0, 1.0, 1.0, 0.5, 2.0)
+SNIPPET_TOKENS = 16
+
+def company_key(name: str) -> str:
+    """Case- and punctuation-insensitive key, so "Acme Robotics, Inc." finds "acme robotics inc" """
+    return re.sub(r"[^a-z0-9]+", " ", (name or "").lower()).strip()
+
+def _fts_query(query: str) -> str:
+    """Quote every term, for queries that are not valid FTS5 syntax (e.g. "series-a", "ARR:")"""
+    return " ".join('"' + term.replace('"', '""') + '"' for term in query.split())
+
+class RunIndex:
+    """One row per analyze_pitchdeck run: metadata in `runs`, searchable text in the `runs_fts` FTS5 table"""
+
+    def __init__(self, path=None):
+        self.path = Path(path or INDEX_PATH)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), timeout=30, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS runs ("
+            " id INTEGER PRIMARY KEY, deck TEXT, deck_path TEXT, report_path TEXT, company TEXT,"
+            " company_key TEXT, model TEXT, analyzed REAL, kpis TEXT, web TEXT)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS runs_company ON runs(company_key, analyzed)")
+        try:
+            self._conn.execute(
+                "CREATE VIRTUAL TABLE IF NOT EXISTS runs_fts USING fts5("
+                " company, deck, text, images, web, report, tokenize = 'porter unicode61')"
+            )
+        except sqlite3.OperationalError as e:
+            self._conn.close()
+            raise RuntimeError(f"SQLite was built without FTS5, the run index is unavailable: {e}")
+        self._conn.commit()
+
+    def add_run(self, deck_path, report_path, company: str, deck_text: str, images_analyses: dict = None,
+                web_texts: list = None, report: str = "", model: str = None, kpis: dict = None) -> int:
+        """Index one finished run; returns its id. Earlier runs of the same deck stay searchable."""
+        images = "\n\n".join(f"{name}: {analysis}" for name, analysis in (images_analyses or {}).items())
+        web_texts = list(web_texts or [])
+        with self._lock:
+            cur = self._conn.execute(
+                "INSERT INTO runs (deck, deck_path, report_path, company, company_key, model, analyzed, kpis, web)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (Path(deck_path).name, str(deck_path), str(report_path), company, company_key(company), model,
+                 time.time(), json.dumps(kpis or {}), json.dumps(web_texts)),
+            )
+            self._conn.execute(
+                "INSERT INTO runs_fts (rowid, company, deck, text, images, web, report) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (cur.lastrowid, company or "", Path(deck_path).name, deck_text or "", images,
+                 "\n\n".join(web_texts), report or ""),
+            )
+            self._conn.commit()
+        return cur.lastrowid
+
+    def search(self, query: str, limit: int = 10, company: str = None, since: float = None) -> List[dict]:
+        """Best-ranked runs for an FTS5 query (plain words, "phrases", AND/OR/NOT, prefix*), best first.
+
+        Each result has the run metadata, its bm25 `score` (lower is better) and a highlighted `snippet`.
+        """
+        sql = ("SELECT runs.id, runs.deck, runs.deck_path, runs.report_path, runs.company, runs.model,"
+               " runs.analyzed, bm25(runs_fts, ?, ?, ?, ?, ?, ?) AS score,"
+               f" snippet(runs_fts, -1, '[', ']', ' ... ', {SNIPPET_TOKENS}) AS snippet"
+               " FROM runs_fts JOIN runs ON runs.id = runs_fts.rowid WHERE runs_fts MATCH ?")
+        params = list(COLUMN_WEIGHTS)
+        if company:
+            sql += " AND runs.company_key = ?"
+            params.append(company_key(company))
+        if since is not None:
+            sql += " AND runs.analyzed >= ?"
+            params.append(since)
+        sql += " ORDER BY score LIMIT ?"
+        with self._lock:
+            try:
+                rows = self._conn.execute(sql, [*params[:6], query, *params[6:], limit]).fetchall()
+            except sqlite3.OperationalError:
+                rows = self._conn.execute(sql, [*params[:6], _fts_query(query), *params[6:], limit]).fetchall()
+        return [dict(row) for row in rows]
+
+    def runs_for(self, company: str, limit: int = 10) -> List[dict]:
+        """Latest runs of a company, newest first"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT id, deck, deck_path, report_path, company, model, analyzed, kpis FROM runs"
+                " WHERE company_key = ? ORDER BY analyzed DESC LIMIT ?",
+                (company_key(company), limit),
+            ).fetchall()
+        return [dict(row, kpis=json.loads(row["kpis"] or "{}")) for row in rows]
+
+    def web_results_for(self, company: str, max_age: float = None) -> list:
+        """Web texts of the newest run of `company` within `max_age` seconds that found any, else None"""
+        max_age = INDEX_WEB_REUSE_TTL if max_age is None else max_age
+        if not company_key(company) or max_age <= 0:
+            return None
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT web FROM runs WHERE company_key = ? AND analyzed >= ? AND web NOT IN ('', '[]')"
+                " ORDER BY analyzed DESC LIMIT 1",
+                (company_key(company), time.time() - max_age),
+            ).fetchone()
+        return json.loads(row["web"]) if row is not None else None
+
+    def stats(self) -> dict:
+        with self._lock:
+            runs, companies = self._conn.execute("SELECT COUNT(*), COUNT(DISTINCT company_key) FROM runs").fetchone()
+        return {"runs": runs, "companies": companies, "bytes": self.path.stat().st_size}
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+def open_run_index(path=None) -> RunIndex:
+    """The run index at INDEX_PATH, or None (with a warning) if it cannot be opened"""
+    try:
+        return RunIndex(path)
+    except (RuntimeError, sqlite3.Error, OSError) as e:
+        print(f"Warning: run index disabled: {e}")
+        return None
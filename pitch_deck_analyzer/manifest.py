@@ -0,0 +1,293 @@
+"""
+Per-deck manifests for incremental re-analysis of new deck versions
+"""
+
+import difflib
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import List
+from pitch_deck_analyzer.analysis.context import LOW_VALUE
+from pitch_deck_analyzer.utils import slugify_filename
+from pitch_deck_analyzer.config import CACHE_DIR
+
+MANIFEST_FORMAT = 4  # 2: no near-duplicate aliases; 3: scoped by directory, vision model; 4: one entry per version
+# Versions (deck files) remembered per manifest; the oldest are dropped first
+MANIFEST_MAX_VERSIONS = 20
+# Trailing version markers stripped from file names so v2, v3 and "final" share one manifest
+VERSION_SUFFIX = re.compile(r"[\s_\-.]*(?:v\d+(?:[._]\d+)*|version[\s_\-]*\d+|rev[\s_\-]*\d+|final|draft|updated|\(\d+\))$",
+                            re.IGNORECASE)
+MARKER_LINE = re.compile(r"^--- (?:SLIDE|PAGE) \d+ ---$")
+
+def deck_key(path) -> str:
+    """Manifest name shared by all versions of a deck: the file stem without version suffixes"""
+    stem = Path(path).stem
+    while True:
+        stripped = VERSION_SUFFIX.sub("", stem)
+        if stripped == stem or not stripped:
+            break
+        stem = stripped
+    return slugify_filename(stem.lower())
+
+def manifest_path(deck_path) -> Path:
+    """Manifest shared by the versions of a deck in one directory; same-named decks elsewhere get their own"""
+    folder = str(Path(deck_path).resolve().parent)
+    scope = hashlib.sha256(folder.encode("utf-8")).hexdigest()[:12]
+    return Path(CACHE_DIR) / "manifests" / f"{deck_key(deck_path)}-{scope}.json"
+
+def file_digest(path) -> str:
+    """SHA-256 of a deck file: identifies one version of the deck"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+_save_locks = {}
+_save_locks_guard = threading.Lock()
+
+@contextmanager
+def _locked(path: Path, stale_after: float = 60.0):
+    """Exclusive access to one manifest: a lock per path for threads, plus a lock file for other processes"""
+    with _save_locks_guard:
+        lock = _save_locks.setdefault(str(path), threading.Lock())
+    lock_path = path.with_name(f"{path.name}.lock")
+    with lock:
+        while True:
+            try:
+                fd = os.open(lock_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+                break
+            except FileExistsError:
+                try:
+                    if time.time() - lock_path.stat().st_mtime > stale_after:
+                        lock_path.unlink()  # left behind by a run that crashed while saving
+                        continue
+                except OSError:
+                    continue
+                time.sleep(0.05)
+        try:
+            yield
+        finally:
+            os.close(fd)
+            try:
+                lock_path.unlink()
+            except OSError:
+                pass
+
+def text_hash(text: str) -> str:
+    """Hash of slide text, ignoring the slide marker and whitespace differences"""
+    lines = [ln.strip() for ln in (text or "").splitlines() if ln.strip() and not MARKER_LINE.match(ln.strip())]
+    return hashlib.sha256("\n".join(lines).encode("utf-8")).hexdigest()
+
+def slide_title(text: str) -> str:
+    for line in (text or "").splitlines():
+        line = line.strip()
+        if line and not MARKER_LINE.match(line):
+            return line[:80]
+    return ""
+
+class DeckVersion:
+    """One analyzed version (file) of a deck: slide hashes, the file's modification time, and the change
+    list its report got against the version with digest `compared_with` (`changes` is None until computed)"""
+
+    def __init__(self, data: dict = None):
+        data = data or {}
+        self.digest = data.get("digest")
+        self.deck = data.get("deck")
+        self.analyzed = data.get("analyzed")
+        self.modified = data.get("modified", 0.0)
+        self.unit = data.get("unit", "Slide")
+        self.slides = data.get("slides", [])
+        self.changes = data.get("changes")
+        self.compared_with = data.get("compared_with")
+
+    @classmethod
+    def from_pages(cls, digest: str, deck: str, unit: str, modified: float, pages: list) -> "DeckVersion":
+        """Version record for this run; `pages` is [(number, text, [image handles])]"""
+        return cls({
+            "digest": digest, "deck": deck, "unit": unit, "modified": modified, "analyzed": time.strftime("%Y-%m-%d %H:%M"),
+            "slides": [{"number": number, "title": slide_title(text), "text_hash": text_hash(text),
+                        "images": [image.digest for image in page_images]}
+                       for number, text, page_images in pages],
+        })
+
+    def to_dict(self) -> dict:
+        return {"digest": self.digest, "deck": self.deck, "analyzed": self.analyzed, "modified": self.modified,
+                "unit": self.unit, "slides": self.slides, "changes": self.changes, "compared_with": self.compared_with}
+
+    def overlaps(self, other: "DeckVersion") -> bool:
+        """True if the two share any slide text or image, i.e. look like versions of the same deck"""
+        empty = text_hash("")
+        texts = {s["text_hash"] for s in self.slides} - {empty}
+        images = {d for s in self.slides for d in s["images"]}
+        return any(s["text_hash"] in texts or images.intersection(s["images"]) for s in other.slides)
+
+class DeckManifest:
+    """Every analyzed version of one deck plus reusable analysis artifacts.
+
+    `versions` maps the SHA-256 of each deck file to its DeckVersion; `image_analyses` maps image
+    SHA-256 to its vision analysis by `vision_model`; `company` holds the company name with the hash
+    of the text it was derived from.
+    """
+
+    def __init__(self, path: Path, data: dict = None):
+        self.path = Path(path)
+        data = data or {}
+        self.versions = {digest: DeckVersion(dict(v, digest=digest)) for digest, v in data.get("versions", {}).items()}
+        self.image_analyses = data.get("image_analyses", {})
+        self.vision_model = data.get("vision_model")
+        self.company = data.get("company")
+        self._recorded = set()  # digests of the versions update() recorded since loading
+
+    @classmethod
+    def load(cls, path) -> "DeckManifest":
+        """Read a manifest; a missing or unreadable file gives an empty one"""
+        path = Path(path)
+        try:
+            data = json.loads(path.read_text(encoding="utf-8"))
+            if data.get("format") != MANIFEST_FORMAT:
+                data = None
+        except (OSError, ValueError):
+            data = None
+        return cls(path, data)
+
+    @property
+    def exists(self) -> bool:
+        return bool(self.versions)
+
+    def previous_version(self, digest: str, modified: float) -> DeckVersion:
+        """Newest stored version of a different file that is not newer than `modified` (the deck file's
+        modification time), or None"""
+        earlier = [v for d, v in self.versions.items() if d != digest and v.modified <= modified]
+        return max(earlier, key=lambda v: v.modified, default=None)
+
+    def known_analyses(self, vision_model: str = None) -> dict:
+        """Image analyses to reuse; none if they were made by a different vision model"""
+        if vision_model and self.vision_model != vision_model:
+            return {}
+        return dict(self.image_analyses)
+
+    def company_for(self, source_text: str) -> str:
+        """Previously extracted company name if it came from the same text"""
+        if self.company and self.company.get("source_hash") == text_hash(source_text):
+            return self.company.get("name")
+        return None
+
+    def update(self, version: DeckVersion, images_analyses: dict, images: list,
+               company: str = None, company_source: str = None, borrowed=(), vision_model: str = None):
+        """Record `version` under its file digest, with this run's image analyses.
+
+        Names in `borrowed` got a near-duplicate's analysis, which is not stored under their own digest.
+        `vision_model` is the model behind `images_analyses` (None if this run analyzed no images).
+        """
+        self.versions[version.digest] = version
+        self._recorded.add(version.digest)
+        # Never cache failures; analyses from earlier runs survive runs that skipped image analysis
+        # (e.g. --no-openrouter)
+        if vision_model and vision_model != self.vision_model:
+            self.image_analyses = {}
+            self.vision_model = vision_model
+        by_name = {str(image.name): image.digest for image in images}
+        for name, analysis in images_analyses.items():
+            if name in by_name and name not in borrowed and analysis and not LOW_VALUE.search(analysis.strip()):
+                self.image_analyses[by_name[name]] = analysis
+        if company and company_source is not None:
+            self.company = {"name": company, "source_hash": text_hash(company_source)}
+        self._prune()
+
+    def _prune(self):
+        """Keep the newest MANIFEST_MAX_VERSIONS versions and the analyses of images they contain"""
+        newest = sorted(self.versions.items(), key=lambda item: item[1].modified, reverse=True)
+        self.versions = dict(newest[:MANIFEST_MAX_VERSIONS])
+        digests = {d for v in self.versions.values() for s in v.slides for d in s["images"]}
+        self.image_analyses = {d: a for d, a in self.image_analyses.items() if d in digests}
+
+    def save(self):
+        """Write atomically under a lock, keeping versions and analyses other runs saved meanwhile
+        (batch mode analyzes several versions of a deck at once)"""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with _locked(self.path):
+            on_disk = DeckManifest.load(self.path)
+            mine = {digest: self.versions[digest] for digest in self._recorded if digest in self.versions}
+            self.versions = dict(on_disk.versions, **mine)
+            if on_disk.vision_model == self.vision_model:
+                for digest, analysis in on_disk.image_analyses.items():
+                    self.image_analyses.setdefault(digest, analysis)
+            if self.company is None:
+                self.company = on_disk.company
+            self._prune()
+            data = {"format": MANIFEST_FORMAT,
+                    "versions": {digest: v.to_dict() for digest, v in self.versions.items()},
+                    "image_analyses": self.image_analyses, "vision_model": self.vision_model,
+                    "company": self.company}
+            tmp = self.path.with_name(f"{self.path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+            tmp.write_text(json.dumps(data, indent=1), encoding="utf-8")
+            os.replace(tmp, self.path)
+
+def _pair(old: List[dict], new: List[dict], key) -> List[tuple]:
+    """Align two slide lists on `key`; returns (old opcode slice, new opcode slice, opcode) triples"""
+    matcher = difflib.SequenceMatcher(None, [key(s) for s in old], [key(s) for s in new], autojunk=False)
+    return [(old[i1:i2], new[j1:j2], op) for op, i1, i2, j1, j2 in matcher.get_opcodes()]
+
+def diff_slides(old: List[dict], new: List[dict]) -> List[dict]:
+    """Slide-level changes between two slide lists, matching moved slides by content.
+
+    Slides are aligned on their full signature (text and image hashes); within changed runs they are
+    paired by title, so an edited slide is reported as modified rather than removed and re-added.
+    Returns dicts with `change` (added / removed / modified), `old` / `new` slide records and,
+    for modified slides, `text_changed` and `images_changed` flags.
+    """
+    changes = []
+    for old_run, new_run, op in _pair(old, new, lambda s: (s["text_hash"], tuple(s["images"]))):
+        if op == "equal":
+            continue
+        for o_part, n_part, inner in _pair(old_run, new_run, lambda s: s["title"]):
+            paired = len(o_part) if inner == "equal" else min(len(o_part), len(n_part)) if inner == "replace" else 0
+            for o, n in zip(o_part[:paired], n_part[:paired]):
+                changes.append({"change": "modified", "old": o, "new": n,
+                                "text_changed": o["text_hash"] != n["text_hash"],
+                                "images_changed": o["images"] != n["images"]})
+            for o in o_part[paired:]:
+                changes.append({"change": "removed", "old": o, "new": None})
+            for n in n_part[paired:]:
+                changes.append({"change": "added", "old": None, "new": n})
+    return changes
+
+def changes_section(previous: DeckVersion, current: DeckVersion) -> str:
+    """Markdown 'Changes since previous version' section, or "" when there is no previous version (or the
+    previous deck shares no slide or image with this one, e.g. an unrelated deck with the same name)"""
+    if previous is None or not previous.overlaps(current):
+        return ""
+    unit = current.unit
+    changes = diff_slides(previous.slides, current.slides)
+    lines = ["## Changes since previous version", "",
+             f"Compared with `{previous.deck}` (analyzed {previous.analyzed}).", ""]
+    if not changes:
+        lines.append(f"No {unit.lower()} changes.")
+        return "\n".join(lines) + "\n"
+
+    def describe(slide):
+        return f"{unit} {slide['number']}" + (f" \"{slide['title']}\"" if slide["title"] else "")
+
+    changes.sort(key=lambda c: (c["new"] or c["old"])["number"])
+    for c in changes:
+        if c["change"] == "added":
+            lines.append(f"- {describe(c['new'])}: added")
+        elif c["change"] == "removed":
+            lines.append(f"- {describe(c['old'])} of the previous version: removed")
+        else:
+            what = []
+            if c["text_changed"]:
+                what.append("text changed")
+            if c["images_changed"]:
+                what.append("images changed")
+            moved = f" (was {unit.lower()} {c['old']['number']})" if c["old"]["number"] != c["new"]["number"] else ""
+            lines.append(f"- {describe(c['new'])}{moved}: {', '.join(what)}")
+    unchanged = len(current.slides) - sum(1 for c in changes if c["change"] != "removed")
+    lines += ["", f"{unchanged} of {len(current.slides)} {unit.lower()}s unchanged."]
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,408 @@
+"""
+Analysis pipeline: overlapping extraction, company-name, image, web search and synthesis stages
+"""
+
+import queue
+import sys
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import nullcontext
+from pathlib import Path
+
+from pitch_deck_analyzer.utils import slugify_filename
+from pitch_deck_analyzer.extractors.base import extractor_for
+from pitch_deck_analyzer.extractors.images import ImageSpool
+from pitch_deck_analyzer.web.cache import PageCache, open_page_cache
+from pitch_deck_analyzer.analysis.openrouter import OpenRouterClient, model_supports_vision, open_llm_cache
+from pitch_deck_analyzer.analysis.image_analyzer import ImageAnalyzer
+from pitch_deck_analyzer.analysis.context import DEFAULT_SHARES, SECTION_MARKER, estimate_tokens, model_token_budget
+from pitch_deck_analyzer.analysis.summarize import map_reduce_summarize
+from pitch_deck_analyzer.analysis.heuristics import extract_kpis, guess_company
+from pitch_deck_analyzer.report_generator import ReportGenerator, strip_markdown_fence
+from pitch_deck_analyzer.manifest import DeckManifest, DeckVersion, changes_section, file_digest, manifest_path
+from pitch_deck_analyzer.index import RunIndex, open_run_index
+from pitch_deck_analyzer.profiling import Profiler, span, submit
+from pitch_deck_analyzer.config import DEFAULT_MODEL, VISION_MODEL, MAX_SEARCH_RESULTS, MAX_RESOURCES
+from pitch_deck_analyzer.config import COMPANY_HINT_PAGES, COMPANY_MIN_CONFIDENCE, CHARS_PER_TOKEN
+
+# Stage graph (each arrow is a dependency; independent stages run concurrently):
+#
+#   extraction --pages--> first pages --> company name --> web search --+
+#        |                                                               |
+#        +--deck text (long decks)--> map-reduce summary ----------------+--> synthesis
+#        |                                                               |
+#        +--images (as extracted)--> image analysis ---------------------+
+
+_END = object()
+# Written at the top of the fallback report of a failed synthesis (see report_failed)
+FAILED_MARKER = "<!-- pitch-deck-analyzer: analysis failed -->"
+
+class SynthesisError(RuntimeError):
+    """The report could not be synthesized; a fallback report with the raw deck text was written instead"""
+
+def _failure_report(error: Exception, deck_text: str) -> str:
+    return (f"{FAILED_MARKER}\n# Analysis failed\nOpenRouter synthesis failed: {error}\n\n"
+            "Raw extracted text attached below.\n\n---\n\n" + deck_text[:10000])
+
+def report_failed(report_path) -> bool:
+    """True if the report at `report_path` is the fallback of a failed synthesis"""
+    try:
+        with open(report_path, encoding="utf-8") as f:
+            return any(line.rstrip("\n") == FAILED_MARKER for line in f)
+    except OSError:
+        return False
+
+def _iter_pages(in_path: Path, extract_workers: int = None):
+    """PageRecord stream for a supported deck; only that format's parser is imported"""
+    extractor = extractor_for(in_path, extract_workers)
+    print(f"Extracting from {in_path.suffix.lower().lstrip('.').upper()}...")
+    return extractor.iter_pages(str(in_path))
+
+def _drain(image_queue: queue.Queue):
+    """Yield images from the extraction stage until it signals the end"""
+    while True:
+        item = image_queue.get()
+        if item is _END:
+            return
+        yield item
+
+def _extract_stage(pages, image_queue: queue.Queue, first_pages: Future, assets_dir: Path = None,
+                   spool: ImageSpool = None):
+    """Consume the page stream, forwarding images downstream as they appear.
+
+    Returns (deck text, images, [PageRecord]). Images beyond the `spool` memory budget are moved to
+    disk as extraction goes on; the handles stay valid and read them back when needed.
+
+    `first_pages` resolves with the text of the first COMPANY_HINT_PAGES pages (or the whole deck
+    if shorter) so the company-name stage does not wait for the full extraction.
+    """
+    with span("extract") as s:
+        full_text = []
+        images = []
+        page_records = []
+        try:
+            for record in pages:
+                page_num, text, page_images = record
+                page_records.append(record)
+                if text:
+                    full_text.append(text)
+                for image in page_images:
+                    if assets_dir is not None:
+                        image.spill(assets_dir)
+                    images.append(image)
+                    if image_queue is not None:
+                        image_queue.put(image)
+                    if spool is not None:
+                        spool.add(image)
+                if page_num >= COMPANY_HINT_PAGES and not first_pages.done():
+                    first_pages.set_result("\n".join(full_text))
+        except BaseException as e:
+            if not first_pages.done():
+                first_pages.set_exception(e)
+            raise
+        finally:
+            if image_queue is not None:
+                image_queue.put(_END)
+        if not first_pages.done():
+            first_pages.set_result("\n".join(full_text))
+        s.set(pages=len(page_records), images=len(images), chars=sum(len(t) for t in full_text))
+        if spool is not None and spool.spilled:
+            s.set(spilled=spool.spilled)
+            print(f"Kept {spool.retained / 1e6:.0f} MB of images in memory, spilled {spool.spilled} to disk")
+        return "\n".join(full_text), images, page_records
+
+def _company_stage(first_pages: Future, client: OpenRouterClient, model: str, deck_manifest: DeckManifest = None,
+                   in_path: Path = None) -> str:
+    """Company name from the first pages: reused if those pages are unchanged, else guessed locally from
+    the title-slide layout; the LLM is only asked when that guess is below COMPANY_MIN_CONFIDENCE"""
+    lines = [ln.strip() for ln in first_pages.result().splitlines() if ln.strip()]
+    if not lines:
+        return None
+    with span("company") as s:
+        known = deck_manifest.company_for(first_pages.result()) if deck_manifest is not None else None
+        if known:
+            s.set(cache_hits=1)
+            return known
+        guess, confidence, _ = guess_company(in_path, first_pages.result())
+        s.set(source="heuristic", confidence=confidence)
+        if guess and (confidence >= COMPANY_MIN_CONFIDENCE or client is None):
+            print(f"Company: {guess} (local guess, confidence {confidence:.2f})")
+            return guess
+        if client is None:
+            return None
+        s.set(source="llm")
+        instruction = "You are an expert analyzer. The provided information is the extracted text from the first page of a pitcher deck. Identify the name of the company from the text. The name is there in the text. Return from you should be just the name of the company, and nothing else."
+        prompt = "\n\n".join(lines) + "\n\n" + instruction
+        messages = [{"role": "user", "content": prompt}]
+        return client.chat(messages, model=model, max_tokens=1800)
+
+def _web_stage(company: Future, first_pages: Future, page_cache: PageCache, use_cache: bool,
+               index: RunIndex = None, use_index: bool = False) -> list:
+    """Search the web for the company and fetch the top pages, unless a recent run of the same company
+    in the run index already did"""
+    from pitch_deck_analyzer.web.search import duckduckgo_search
+    from pitch_deck_analyzer.web.fetcher import fetch_pages
+
+    company_hint = company.result()
+    first_text = first_pages.result()
+    first_lines = [ln for ln in (first_text or "").strip().split('\n') if not SECTION_MARKER.match(ln)]
+    query = company_hint or (first_lines[0] if first_lines else "")
+    web_texts = []
+    if not query:
+        return web_texts
+
+    with span("web", query=query) as s:
+        if company_hint and use_cache and use_index:
+            owns_index = index is None
+            if owns_index:
+                index = open_run_index()
+            known = index.web_results_for(company_hint) if index is not None else None
+            if owns_index and index is not None:
+                index.close()
+            if known:
+                print(f"Reusing {len(known)} web results from an earlier analysis of {company_hint}")
+                s.set(cache_hits=1, items=len(known))
+                return known
+        print(f"Searching web for: {query}")
+        owns_page_cache = page_cache is None and use_cache
+        if owns_page_cache:
+            page_cache = open_page_cache()
+        try:
+            # Ask for extra candidates so slow or empty pages can be dropped
+            results = duckduckgo_search(query, max_results=MAX_RESOURCES, cache=page_cache)
+            for url, text in fetch_pages(results, limit=MAX_SEARCH_RESULTS, cache=page_cache):
+                web_texts.append(f"Source: {url}\n\n{text}")
+        except Exception as e:
+            print(f"Web search failed: {e}")
+        if page_cache is not None:
+            stats = page_cache.stats()
+            print(f"Web cache: {stats['hits']} hits, {stats['misses']} misses")
+            if owns_page_cache:
+                page_cache.close()
+        s.set(items=len(web_texts))
+        return web_texts
+
+def _summary_stage(deck_text: str, client: OpenRouterClient, model: str) -> str:
+    """Map-reduce the deck text down to the deck share of the model's prompt budget"""
+    target_chars = int(model_token_budget(model) * DEFAULT_SHARES["deck"] * CHARS_PER_TOKEN)
+    with span("map_reduce", chars=len(deck_text)):
+        return map_reduce_summarize(client, deck_text, model, target_chars=target_chars)
+
+def _record_run(index: RunIndex, in_path: Path, out_path: Path, company: str, deck_text: str,
+                images_analyses: dict, web_texts: list, model: str):
+    """Add the finished run to the run index (opened here if `index` is None); failures only warn"""
+    with span("index"):
+        owns_index = index is None
+        if owns_index:
+            index = open_run_index()
+        if index is None:
+            return
+        try:
+            index.add_run(in_path.resolve(), out_path.resolve(), company, deck_text, images_analyses, web_texts,
+                          out_path.read_text(encoding="utf-8"), model, extract_kpis(deck_text))
+        except Exception as e:
+            print(f"Warning: could not add the run to the index: {e}")
+        finally:
+            if owns_index:
+                index.close()
+
+def needs_map_reduce(deck_text: str, model: str) -> bool:
+    """True if the deck text alone overflows its share of the model's prompt budget"""
+    return estimate_tokens(deck_text) > model_token_budget(model) * DEFAULT_SHARES["deck"]
+
+def analyze_pitchdeck(input_path: str, output_path: str, search_online: bool = True,
+                     model: str = None, vision_model: str = None, use_openrouter: bool = True,
+                     image_workers: int = None, dedupe_images: bool = True, dedup_threshold: int = None,
+                     batch_images: bool = True,
+                     extract_workers: int = None, client: OpenRouterClient = None, use_cache: bool = True,
+                     keep_assets: bool = False, page_cache: PageCache = None, stream: bool = False,
+                     map_reduce: bool = None, use_manifest: bool = True, manifest: str = None,
+                     profiler: Profiler = None, profile_path: str = None, max_retained_bytes: int = None,
+                     use_index: bool = True, index: RunIndex = None):
+    """Main analysis pipeline; pass `client` / `page_cache` to share them across runs.
+
+    Image analysis starts on the first extracted image and web search runs alongside it, so the
+    end-to-end latency approaches the slowest stage rather than the sum of all stages.
+    With `stream`, the synthesized report is written to the output file and stdout as it is generated.
+    With `batch_images`, small images are sent several per vision request, grouped by slide.
+    `map_reduce` summarizes the deck in chunks before synthesis; None enables it for decks too long
+    for the prompt budget.
+    With `use_manifest`, slide hashes of every version and image analyses are kept in a per-deck manifest
+    (shared by the versions of the deck in its directory, or the file given as `manifest`): images already
+    analyzed for another version are reused (unless `use_cache` is off or the vision model changed) and the
+    report gains a "Changes since previous version" section against the newest older version; a file
+    analyzed before gets the same section as its first report.
+    Stages and API calls are recorded as spans on `profiler` (created when `profile_path` is given,
+    which receives the JSON profile).
+    At most `max_retained_bytes` (default EXTRACT_MAX_RETAINED_BYTES) of extracted images are held in
+    memory; older ones are spilled to a temporary directory for the rest of the run.
+    With `use_index`, the finished run is added to the full-text run index (`index`, or the one at
+    INDEX_PATH), and recent web results for the same company are reused from it.
+    If synthesis fails, a fallback report with the raw deck text is written (marked with FAILED_MARKER,
+    never indexed) and SynthesisError is raised.
+    """
+    model = model or DEFAULT_MODEL
+    vision_model = vision_model or VISION_MODEL or model
+    in_path = Path(input_path)
+    out_path = Path(output_path)
+    # Images stay in memory; they are only spilled to .pda_tmp when debugging
+    assets_dir = Path(".pda_tmp") / slugify_filename(in_path.stem) if keep_assets else None
+
+    if not in_path.exists():
+        raise FileNotFoundError(f"Input file not found: {input_path}")
+
+    print(f"Analyzing: {in_path.name}")
+    print(f"Using model (text): {model}")
+    print(f"Vision model: {vision_model}")
+    print(f"OpenRouter enabled: {use_openrouter}")
+
+    profiler = profiler or (Profiler(in_path.name) if profile_path else None)
+    with (profiler.activate() if profiler is not None else nullcontext()), span("run", deck=in_path.name):
+        pages = _iter_pages(in_path, extract_workers)
+
+        # A single pooled client is shared by the company-name, image and synthesis stages
+        owns_client = False
+        spool = ImageSpool(max_retained_bytes, assets_dir)
+        if use_openrouter and client is None:
+            client = OpenRouterClient(cache=open_llm_cache() if use_cache else None)
+            owns_client = True
+
+        deck_manifest = seen = previous = None
+        if use_manifest:
+            deck_manifest = DeckManifest.load(manifest or manifest_path(in_path))
+            deck_digest = file_digest(in_path)
+            modified = in_path.stat().st_mtime
+            seen = deck_manifest.versions.get(deck_digest)
+            previous = deck_manifest.previous_version(deck_digest, modified)
+            base = previous.digest if previous is not None else None
+            if seen is not None and seen.changes is not None and seen.compared_with == base:
+                print(f"Already analyzed as {seen.deck} ({seen.analyzed}); reusing its change list")
+            elif previous is not None:
+                print(f"Previous version: {previous.deck} (analyzed {previous.analyzed})")
+
+        vision_enabled = use_openrouter and model_supports_vision(vision_model)
+        first_pages = Future()
+        image_queue = queue.Queue() if vision_enabled else None
+
+        try:
+            with ThreadPoolExecutor(max_workers=5, thread_name_prefix="pda-stage") as stages:
+                extraction = submit(stages, _extract_stage, pages, image_queue, first_pages, assets_dir, spool)
+                vision = None
+                analyzer = None
+                if vision_enabled:
+                    analyzer = ImageAnalyzer(client, max_workers=image_workers,
+                                             dedupe=dedupe_images, dedup_threshold=dedup_threshold,
+                                             batch_size=None if batch_images else 1)
+                    known = (deck_manifest.known_analyses(vision_model) if deck_manifest is not None and use_cache
+                             else None)
+                    vision = submit(stages, analyzer.analyze_images, _drain(image_queue), model, vision_model, known)
+                company = submit(stages, _company_stage, first_pages, client if use_openrouter else None, model,
+                                 deck_manifest if use_cache else None, in_path)
+                web = (submit(stages, _web_stage, company, first_pages, page_cache, use_cache, index, use_index)
+                       if search_online else None)
+
+                deck_text, images, page_records = extraction.result()
+                print(f"Extracted {len(deck_text)} characters of text and {len(images)} images")
+                summary = None
+                if use_openrouter and deck_text and (map_reduce or (map_reduce is None and needs_map_reduce(deck_text, model))):
+                    summary = submit(stages, _summary_stage, deck_text, client, model)
+                company_hint = company.result()
+
+                images_analyses = {}
+                if vision is not None:
+                    images_analyses = vision.result()
+                elif images and use_openrouter:
+                    print(f"Warning: chosen vision model '{vision_model}' does not look vision-capable. Skipping image analyses.")
+                    for p in images:
+                        images_analyses[str(p.name)] = f"(skipped) model '{vision_model}' not vision-capable"
+
+                web_texts = web.result() if web is not None else []
+
+                synthesis_text = deck_text
+                if summary is not None:
+                    try:
+                        synthesis_text = summary.result()
+                    except Exception as e:
+                        print(f"Map-reduce summarization failed, using the raw deck text: {e}")
+
+            changes = ""
+            if deck_manifest is not None:
+                unit = "Page" if in_path.suffix.lower() == ".pdf" else "Slide"
+                version = DeckVersion.from_pages(deck_digest, in_path.name, unit, modified, page_records)
+                version.compared_with = base
+                if seen is not None and seen.changes is not None and seen.compared_with == base:
+                    changes = seen.changes  # the same file against the same version: reuse its change list
+                else:
+                    changes = changes_section(previous, version)
+                    if previous is not None and not changes:
+                        print(f"{previous.deck} shares no {version.unit.lower()}s with this deck; not listing changes")
+                version.changes = changes
+                deck_manifest.update(version, images_analyses, images, company_hint, first_pages.result(),
+                                     borrowed=analyzer.near_duplicates if analyzer is not None else (),
+                                     vision_model=vision_model if vision is not None else None)
+
+            # Generate report
+            streamed = False
+            failure = None
+            with span("synthesis", model=model, streamed=bool(use_openrouter and stream)):
+                if use_openrouter and stream:
+                    streamed = True
+                    with open(out_path, "w", encoding="utf-8") as f:
+                        try:
+                            generator = ReportGenerator(client)
+                            generator.synthesize_report(
+                                synthesis_text, images_analyses, web_texts, company_hint, model, vision_model,
+                                stream_to=[f, sys.stdout]
+                            )
+                            print()
+                        except Exception as e:
+                            print(f"\nOpenRouter synthesis failed: {e}")
+                            failure = e
+                            f.write("\n\n" + _failure_report(e, deck_text))
+                        if changes:
+                            f.write("\n\n" + changes)
+                elif use_openrouter:
+                    try:
+                        generator = ReportGenerator(client)
+                        final_markdown = generator.synthesize_report(
+                            synthesis_text, images_analyses, web_texts, company_hint, model, vision_model
+                        )
+                    except Exception as e:
+                        print(f"OpenRouter synthesis failed: {e}")
+                        failure = e
+                        final_markdown = _failure_report(e, deck_text)
+                else:
+                    generator = ReportGenerator(None)
+                    final_markdown = generator.generate_local_report(deck_text, images_analyses, company_hint,
+                                                                    extract_kpis(deck_text), web_texts)
+
+            if deck_manifest is not None:
+                deck_manifest.save()
+
+            if client is not None and client.cache is not None:
+                stats = client.cache.stats()
+                print(f"LLM cache: {stats['hits']} hits, {stats['misses']} misses")
+        finally:
+            if owns_client:
+                client.close()
+                if client.cache is not None:
+                    client.cache.close()
+            spool.close()
+
+        # Clean and write report (already done incrementally when streamed)
+        if not streamed:
+            with open(out_path, "w", encoding="utf-8") as f:
+                f.write(strip_markdown_fence(final_markdown))
+                if changes:
+                    f.write("\n\n" + changes)
+
+        print(f"Wrote report to {out_path}")
+        if assets_dir is not None:
+            print(f"Assets and extracted images are in: {assets_dir}")
+        if use_index and failure is None:
+            _record_run(index, in_path, out_path, company_hint, deck_text, images_analyses, web_texts, model)
+
+    if profile_path:
+        profiler.write_json(profile_path)
+        print(f"Wrote profile to {profile_path}")
+    if failure is not None:
+        raise SynthesisError(f"OpenRouter synthesis failed: {failure}") from failure
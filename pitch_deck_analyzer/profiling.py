@@ -0,0 +1,179 @@
+"""
+Run profiling: nested timing spans with byte, token and cache counters
+"""
+
+import contextvars
+import json
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, List
+
+# Counters summed per span name in the totals and the Prometheus dump
+COUNTERS = ("request_bytes", "response_bytes", "prompt_tokens", "completion_tokens", "cache_hits", "cache_misses",
+            "retries", "items")
+
+_profiler = contextvars.ContextVar("pda_profiler", default=None)
+_parent = contextvars.ContextVar("pda_span", default=None)
+
+class Span:
+    """One timed operation; attributes are free-form, COUNTERS are also aggregated"""
+
+    __slots__ = ("id", "name", "parent", "thread", "start", "seconds", "attrs", "_t0")
+
+    def __init__(self, span_id: int, name: str, parent: int, start: float, attrs: dict):
+        self.id = span_id
+        self.name = name
+        self.parent = parent
+        self.thread = threading.current_thread().name
+        self.start = start
+        self.seconds = None
+        self.attrs = attrs
+        self._t0 = time.perf_counter()
+
+    def set(self, **attrs):
+        self.attrs.update(attrs)
+
+    def add(self, key: str, n: int = 1):
+        self.attrs[key] = self.attrs.get(key, 0) + (n or 0)
+
+    def finish(self):
+        if self.seconds is None:
+            self.seconds = time.perf_counter() - self._t0
+
+    def to_dict(self) -> dict:
+        return {"id": self.id, "name": self.name, "parent": self.parent, "thread": self.thread,
+                "start": round(self.start, 6), "seconds": None if self.seconds is None else round(self.seconds, 6),
+                **self.attrs}
+
+class _NullSpan:
+    """Returned when no profiler is active, so instrumented code needs no checks"""
+
+    def set(self, **attrs):
+        pass
+
+    def add(self, key: str, n: int = 1):
+        pass
+
+    def finish(self):
+        pass
+
+NULL_SPAN = _NullSpan()
+
+class Profiler:
+    """Collects spans for one run; thread-safe. Activate it, then use `span()` anywhere below."""
+
+    def __init__(self, run: str = None):
+        self.run = run
+        self.started_at = time.time()
+        self._t0 = time.perf_counter()
+        self.seconds = None
+        self.spans: List[Span] = []
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def activate(self):
+        """Make this the current profiler (for this thread and work handed off with `submit`)"""
+        token = _profiler.set(self)
+        try:
+            yield self
+        finally:
+            _profiler.reset(token)
+            self.seconds = time.perf_counter() - self._t0
+
+    def _open(self, name: str, attrs: dict) -> Span:
+        parent = _parent.get()
+        with self._lock:
+            span = Span(len(self.spans) + 1, name, parent.id if parent else None, time.perf_counter() - self._t0, attrs)
+            self.spans.append(span)
+        return span
+
+    def totals(self) -> Dict[str, dict]:
+        """Per span name: count, total seconds and summed COUNTERS"""
+        totals = {}
+        with self._lock:
+            spans = list(self.spans)
+        for s in spans:
+            t = totals.setdefault(s.name, {"count": 0, "seconds": 0.0})
+            t["count"] += 1
+            t["seconds"] += s.seconds or 0.0
+            for key in COUNTERS:
+                value = s.attrs.get(key)
+                if isinstance(value, bool):
+                    value = int(value)
+                if isinstance(value, (int, float)):
+                    t[key] = t.get(key, 0) + value
+        return totals
+
+    def to_dict(self) -> dict:
+        with self._lock:
+            spans = [s.to_dict() for s in self.spans]
+        seconds = self.seconds if self.seconds is not None else time.perf_counter() - self._t0
+        return {"run": self.run, "started": self.started_at, "seconds": round(seconds, 6),
+                "totals": self.totals(), "spans": spans}
+
+    def write_json(self, path):
+        Path(path).write_text(json.dumps(self.to_dict(), indent=1), encoding="utf-8")
+
+def current() -> Profiler:
+    return _profiler.get()
+
+@contextmanager
+def span(name: str, **attrs):
+    """Time the enclosed block as a child of the current span; a no-op without an active profiler"""
+    profiler = _profiler.get()
+    if profiler is None:
+        yield NULL_SPAN
+        return
+    s = profiler._open(name, attrs)
+    token = _parent.set(s)
+    try:
+        yield s
+    except BaseException as e:
+        s.attrs["error"] = type(e).__name__
+        raise
+    finally:
+        s.finish()
+        _parent.reset(token)
+
+def start_span(name: str, **attrs):
+    """Open a span without making it the parent of later spans (e.g. across a generator's yields);
+    call `finish()` on it when done"""
+    profiler = _profiler.get()
+    return profiler._open(name, attrs) if profiler is not None else NULL_SPAN
+
+def submit(pool, fn, *args, **kwargs):
+    """pool.submit that carries the current profiler and parent span into the worker thread"""
+    return pool.submit(contextvars.copy_context().run, fn, *args, **kwargs)
+
+def _label(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", " ")
+
+def prometheus_text(profilers: List[Profiler]) -> str:
+    """Prometheus text exposition of the span totals summed over `profilers` (e.g. a whole batch)"""
+    totals: Dict[str, dict] = {}
+    for profiler in profilers:
+        for name, t in profiler.totals().items():
+            agg = totals.setdefault(name, {})
+            for key, value in t.items():
+                agg[key] = agg.get(key, 0) + value
+
+    lines = ["# HELP pda_runs_total Analysis runs included in this dump",
+             "# TYPE pda_runs_total counter",
+             f"pda_runs_total {len(profilers)}",
+             "# HELP pda_span_seconds Wall time spent in each span",
+             "# TYPE pda_span_seconds summary"]
+    for name, t in sorted(totals.items()):
+        lines.append(f'pda_span_seconds_sum{{span="{_label(name)}"}} {t["seconds"]:.6f}')
+        lines.append(f'pda_span_seconds_count{{span="{_label(name)}"}} {t["count"]}')
+    for key in COUNTERS:
+        rows = [(name, t[key]) for name, t in sorted(totals.items()) if t.get(key)]
+        if not rows:
+            continue
+        lines.append(f"# TYPE pda_{key}_total counter")
+        lines += [f'pda_{key}_total{{span="{_label(name)}"}} {value}' for name, value in rows]
+    return "\n".join(lines) + "\n"
+
+def write_prometheus(path, profilers: List[Profiler]):
+    Path(path).write_text(prometheus_text(profilers), encoding="utf-8")
@@ -3,17 +3,78 @@ Report generation functionality
 """
 
 from pitch_deck_analyzer.analysis.openrouter import OpenRouterClient, model_supports_vision
+from pitch_deck_analyzer.analysis.context import ContextPacker, estimate_tokens, model_token_budget
 from pitch_deck_analyzer.config import MAX_SEARCH_RESULTS
 
+FENCE_OPEN = "```markdown"
+FENCE_CLOSE = "```"
+
+def strip_markdown_fence(text: str) -> str:
+    """Remove a ```markdown ... ``` wrapper the model sometimes puts around the whole report"""
+    if text.startswith(FENCE_OPEN):
+        text = text[len(FENCE_OPEN):].lstrip("\n")
+    if text.endswith(FENCE_CLOSE):
+        text = text[:-len(FENCE_CLOSE)].rstrip("\n")
+    return text
+
+class FenceStripper:
+    """Incremental strip_markdown_fence: feed() stream chunks, then finish(); the output matches the batch version.
+
+    Only the opening fence candidate and a trailing run of newlines/backticks are held back.
+    """
+
+    def __init__(self):
+        self._head = ""
+        self._started = False
+        self._lstrip = False
+        self._tail = ""
+
+    def feed(self, chunk: str) -> str:
+        if not self._started:
+            self._head += chunk
+            if len(self._head) < len(FENCE_OPEN) and FENCE_OPEN.startswith(self._head):
+                return ""
+            return self._start()
+        return self._emit(chunk)
+
+    def _start(self) -> str:
+        text, self._head, self._started = self._head, "", True
+        if text.startswith(FENCE_OPEN):
+            text = text[len(FENCE_OPEN):]
+            self._lstrip = True
+        return self._emit(text)
+
+    def _emit(self, text: str) -> str:
+        if self._lstrip:
+            text = text.lstrip("\n")
+            if not text:
+                return ""
+            self._lstrip = False
+        buf = self._tail + text
+        keep = len(buf) - len(buf.rstrip("\n`"))
+        self._tail = buf[len(buf) - keep:]
+        return buf[:len(buf) - keep]
+
+    def finish(self) -> str:
+        out = self._start() if not self._started else ""
+        tail, self._tail = self._tail, ""
+        if (out + tail).endswith(FENCE_CLOSE):
+            # tail holds every trailing newline/backtick, so the fence and the newlines before it are in it
+            tail = tail[:-len(FENCE_CLOSE)].rstrip("\n")
+        return out + tail
+
 class ReportGenerator:
     def __init__(self, openrouter_client: OpenRouterClient):
         self.client = openrouter_client
 
     def synthesize_report(self, deck_text: str, images_analyses: dict, web_texts: list, 
-                         company_hint: str = None, model: str = None, vision_model: str = None) -> str:
-        """Synthesize final report from all data sources"""
-        image_section = "\n\n".join(f"Image {i+1}:\n{images_analyses[p]}" for i, p in enumerate(images_analyses))
-        web_section = "\n\n---\n\n".join(web_texts[:5]) if web_texts else ""
+                         company_hint: str = None, model: str = None, vision_model: str = None,
+                         stream_to: list = None) -> str:
+        """Synthesize final report from all data sources.
+
+        With `stream_to` (writable text streams, e.g. the output file and stdout) the completion is
+        streamed, fence-stripped on the fly and written to each sink; the cleaned text is returned.
+        """
 
         instruction = """
 You are an expert Venture Capital analyst preparing a report in MARKDOWN for an Investment Manager focused on early-stage startups. Use the data below which contains: 1) text extracted from a pitch deck, 2) summaries of images from the deck, and 3) text fetched from the web.\n\n
@@ -21,11 +82,18 @@ Produce a well-structured markdown document with the following sections: Title h
 Search online to find latest information about the company and consider that as well while responding. If something is uncertain, label it as a guess. Prioritize correctness over imaginative claims.
 """
 
+        # Deck slides, image summaries and web sources share one token budget for the model
+        hint = f"Company hint: {company_hint}" if company_hint else ""
+        budget = model_token_budget(model) - estimate_tokens(instruction) - estimate_tokens(hint)
+        deck_section, image_section, web_section = ContextPacker(max(0, budget)).pack(
+            deck_text, images_analyses, (web_texts or [])[:MAX_SEARCH_RESULTS]
+        )
+
         context_parts = []
-        if company_hint:
-            context_parts.append(f"Company hint: {company_hint}")
-        if deck_text:
-            context_parts.append("=== DECK TEXT START ===\n" + (deck_text[:6000]) + "\n=== DECK TEXT END ===")
+        if hint:
+            context_parts.append(hint)
+        if deck_section:
+            context_parts.append("=== DECK TEXT START ===\n" + deck_section + "\n=== DECK TEXT END ===")
         if image_section:
             context_parts.append("=== IMAGE SUMMARIES START ===\n" + image_section + "\n=== IMAGE SUMMARIES END ===")
         if web_section:
@@ -33,16 +101,61 @@ Search online to find latest information about the company and consider that as
 
         big_prompt = "\n\n".join(context_parts) + "\n\n" + instruction
         messages = [{"role": "user", "content": big_prompt}]
-        return self.client.chat(messages, model=model, max_tokens=5000)
+        if stream_to is None:
+            return self.client.chat(messages, model=model, max_tokens=5000)
+
+        # Streaming: write fence-stripped Markdown to every sink as tokens arrive
+        stripper = FenceStripper()
+        parts = []
+
+        def write(text):
+            if text:
+                parts.append(text)
+                for sink in stream_to:
+                    sink.write(text)
+                    sink.flush()
+
+        for delta in self.client.chat_stream(messages, model=model, max_tokens=5000):
+            write(stripper.feed(delta))
+        write(stripper.finish())
+        return "".join(parts)
+
+    def generate_local_report(self, deck_text: str, images_analyses: dict, company: str = None,
+                              kpis: dict = None, web_texts: list = None) -> str:
+        """Generate report without OpenRouter (local only): heuristic KPIs, outline, images and sources"""
+        from pitch_deck_analyzer.analysis.heuristics import deck_outline
+
+        report = f"# Quick Pitch Deck Extract{': ' + company if company else ''}\n\n"
+        if company:
+            report += f"**Company (guessed from the title slide):** {company}\n\n"
+
+        if kpis:
+            report += "## Key metrics (found in the deck text)\n\n"
+            report += "| Metric | Value | Where | Context |\n|---|---|---|---|\n"
+            for metric, entries in kpis.items():
+                for entry in entries[:5]:
+                    context = entry["context"].replace("|", "\\|")
+                    report += f"| {metric} | {entry['text']} | {entry['page']} | {context} |\n"
+            report += "\n"
+
+        outline = deck_outline(deck_text)
+        if outline:
+            report += "## Deck outline\n\n"
+            for kind, number, first in outline:
+                report += f"- {kind.title()} {number}: {first}\n"
+            report += "\n"
 
-    def generate_local_report(self, deck_text: str, images_analyses: dict) -> str:
-        """Generate report without OpenRouter (local only)"""
-        report = "# Quick Pitch Deck Extract\n\n"
-        report += "## Extracted deck text (truncated)\n\n```\n" + deck_text + "\n```\n\n"
-        
         if images_analyses:
             report += "## Images\n\n"
             for k, v in images_analyses.items():
                 report += f"### {k}\n\n{v}\n\n"
-        
+
+        if web_texts:
+            report += "## Web sources\n\n"
+            for text in web_texts[:MAX_SEARCH_RESULTS]:
+                source, _, body = text.partition("\n\n")
+                report += f"- {source.replace('Source: ', '')}: {body[:200].strip()}\n"
+            report += "\n"
+
+        report += "## Extracted deck text\n\n```\n" + deck_text + "\n```\n"
         return report
\ No newline at end of file
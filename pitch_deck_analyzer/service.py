@@ -0,0 +1,312 @@
+"""
+Local HTTP service: persistent job queue and worker pool around analyze_pitchdeck
+"""
+
+import json
+import queue
+import re
+import sqlite3
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qs, urlparse
+
+from pitch_deck_analyzer.utils import slugify_filename
+from pitch_deck_analyzer.config import SERVICE_DIR, SERVICE_WORKERS, SERVICE_QUEUE_SIZE, SERVICE_MAX_UPLOAD_BYTES
+from pitch_deck_analyzer.config import IMAGE_ANALYSIS_WORKERS, OPENROUTER_POOL_SIZE
+
+DECK_SUFFIXES = (".pdf", ".pptx")
+# Per-job options accepted as POST /jobs query parameters
+JOB_OPTIONS = {"search_online": "bool", "map_reduce": "bool", "dedupe_images": "bool",
+               "batch_images": "bool", "model": "str", "vision_model": "str"}
+
+class QueueFull(Exception):
+    """Raised by AnalysisService.submit when SERVICE_QUEUE_SIZE jobs are already waiting"""
+
+class JobStore:
+    """SQLite-backed job records, so queued and finished jobs survive restarts"""
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), timeout=30, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS jobs ("
+            " id TEXT PRIMARY KEY, status TEXT, deck_name TEXT, deck_path TEXT, report_path TEXT,"
+            " options TEXT, error TEXT, created REAL, started REAL, finished REAL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS jobs_status ON jobs(status, created)")
+        self._conn.commit()
+
+    def create(self, job_id: str, deck_name: str, deck_path: str, report_path: str, options: dict):
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO jobs (id, status, deck_name, deck_path, report_path, options, created)"
+                " VALUES (?, 'queued', ?, ?, ?, ?, ?)",
+                (job_id, deck_name, deck_path, report_path, json.dumps(options), time.time()),
+            )
+            self._conn.commit()
+
+    def get(self, job_id: str) -> dict:
+        with self._lock:
+            row = self._conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        if row is None:
+            return None
+        job = dict(row)
+        job["options"] = json.loads(job["options"] or "{}")
+        return job
+
+    def update(self, job_id: str, **fields):
+        columns = ", ".join(f"{name} = ?" for name in fields)
+        with self._lock:
+            self._conn.execute(f"UPDATE jobs SET {columns} WHERE id = ?", (*fields.values(), job_id))
+            self._conn.commit()
+
+    def requeue_interrupted(self) -> list:
+        """Reset jobs left running by a previous process; returns ids of all queued jobs, oldest first"""
+        with self._lock:
+            self._conn.execute("UPDATE jobs SET status = 'queued', started = NULL WHERE status = 'running'")
+            self._conn.commit()
+            rows = self._conn.execute("SELECT id FROM jobs WHERE status = 'queued' ORDER BY created").fetchall()
+        return [row["id"] for row in rows]
+
+    def counts(self) -> dict:
+        with self._lock:
+            rows = self._conn.execute("SELECT status, COUNT(*) FROM jobs GROUP BY status").fetchall()
+        return {status: n for status, n in rows}
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+class AnalysisService:
+    """Bounded job queue drained by `workers` threads that share one OpenRouter client and the caches.
+
+    `analyze_kwargs` are analyze_pitchdeck defaults; jobs may override the JOB_OPTIONS subset.
+    """
+
+    def __init__(self, data_dir: str = None, workers: int = None, queue_size: int = None,
+                 use_openrouter: bool = True, use_cache: bool = True, image_workers: int = None,
+                 **analyze_kwargs):
+        from pitch_deck_analyzer.analysis.openrouter import OpenRouterClient, open_llm_cache
+        from pitch_deck_analyzer.web.cache import open_page_cache
+        from pitch_deck_analyzer.index import open_run_index
+
+        self.data_dir = Path(data_dir or SERVICE_DIR)
+        self.workers = max(1, workers or SERVICE_WORKERS)
+        self.queue_size = queue_size or SERVICE_QUEUE_SIZE
+        self.analyze_kwargs = dict(analyze_kwargs, use_openrouter=use_openrouter, use_cache=use_cache,
+                                   image_workers=image_workers)
+        (self.data_dir / "uploads").mkdir(parents=True, exist_ok=True)
+        (self.data_dir / "reports").mkdir(parents=True, exist_ok=True)
+        self.store = JobStore(self.data_dir / "jobs.sqlite3")
+
+        self.client = None
+        if use_openrouter:
+            pool_size = max(OPENROUTER_POOL_SIZE, self.workers * (image_workers or IMAGE_ANALYSIS_WORKERS))
+            self.client = OpenRouterClient(cache=open_llm_cache() if use_cache else None, pool_size=pool_size)
+        self.page_cache = open_page_cache() if use_cache else None
+        self.index = open_run_index() if analyze_kwargs.get("use_index", True) else None
+
+        self._queue = queue.Queue()
+        self._waiting = 0
+        self._lock = threading.Lock()
+        self._stopping = threading.Event()
+        self._threads = []
+
+    def start(self):
+        """Re-enqueue jobs persisted by a previous run, then start the workers"""
+        pending = self.store.requeue_interrupted()
+        for job_id in pending:
+            self._enqueue(job_id)
+        if pending:
+            print(f"Resuming {len(pending)} queued job(s) from {self.store.path}")
+        for i in range(self.workers):
+            thread = threading.Thread(target=self._work, name=f"pda-job-{i}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def _enqueue(self, job_id: str):
+        with self._lock:
+            self._waiting += 1
+        self._queue.put(job_id)
+
+    def submit(self, deck_name: str, data: bytes, options: dict = None) -> str:
+        """Store an uploaded deck and queue it; raises QueueFull when the queue is at capacity"""
+        suffix = Path(deck_name).suffix.lower()
+        if suffix not in DECK_SUFFIXES:
+            raise ValueError("Unsupported input format. Only .pdf and .pptx are supported.")
+        with self._lock:
+            if self._waiting >= self.queue_size:
+                raise QueueFull(f"{self._waiting} jobs already queued")
+            self._waiting += 1  # reserve the slot before writing the upload
+        job_id = uuid.uuid4().hex
+        try:
+            # Each upload has its own directory, so uploads never share a manifest (see manifest.manifest_path)
+            deck_path = self.data_dir / "uploads" / job_id / f"{slugify_filename(Path(deck_name).stem)}{suffix}"
+            deck_path.parent.mkdir(parents=True, exist_ok=True)
+            deck_path.write_bytes(data)
+            report_path = self.data_dir / "reports" / f"{job_id}.md"
+            self.store.create(job_id, Path(deck_name).name, str(deck_path), str(report_path), options or {})
+        except BaseException:
+            with self._lock:
+                self._waiting -= 1
+            raise
+        self._queue.put(job_id)
+        return job_id
+
+    def _work(self):
+        from pitch_deck_analyzer.pipeline import analyze_pitchdeck
+
+        while True:
+            job_id = self._queue.get()
+            if job_id is None or self._stopping.is_set():
+                return  # jobs still queued stay queued in the store and resume on the next start
+            with self._lock:
+                self._waiting -= 1
+            job = self.store.get(job_id)
+            if job is None or job["status"] != "queued":
+                continue
+            self.store.update(job_id, status="running", started=time.time())
+            kwargs = dict(self.analyze_kwargs, **job["options"])
+            try:
+                analyze_pitchdeck(job["deck_path"], job["report_path"], client=self.client,
+                                  page_cache=self.page_cache, index=self.index, **kwargs)
+                self.store.update(job_id, status="done", finished=time.time())
+            except Exception as e:
+                print(f"Job {job_id} failed: {e}")
+                self.store.update(job_id, status="failed", error=str(e), finished=time.time())
+
+    def status(self) -> dict:
+        counts = self.store.counts()
+        status = {"workers": self.workers, "queue_size": self.queue_size, "waiting": self._waiting, "jobs": counts}
+        if self.client is not None:
+            governor = self.client.governor
+            status["openrouter"] = {"circuit": governor.breaker.state,
+                                    "rates": {m: round(r, 2) for m, r in governor.rates().items()}}
+        return status
+
+    def close(self):
+        """Stop the workers after their current job and release shared clients and stores"""
+        self._stopping.set()
+        for _ in self._threads:
+            self._queue.put(None)
+        for thread in self._threads:
+            thread.join()
+        if self.client is not None:
+            self.client.close()
+            if self.client.cache is not None:
+                self.client.cache.close()
+        if self.page_cache is not None:
+            self.page_cache.close()
+        if self.index is not None:
+            self.index.close()
+        self.store.close()
+
+def parse_job_options(query: dict) -> dict:
+    """analyze_pitchdeck overrides from POST /jobs query parameters (see JOB_OPTIONS)"""
+    options = {}
+    for name, kind in JOB_OPTIONS.items():
+        if name not in query:
+            continue
+        value = query[name][-1]
+        if kind == "bool":
+            if value.lower() not in ("1", "0", "true", "false", "yes", "no"):
+                raise ValueError(f"{name} must be true or false")
+            options[name] = value.lower() in ("1", "true", "yes")
+        else:
+            options[name] = value
+    return options
+
+def _job_view(job: dict) -> dict:
+    view = {k: job[k] for k in ("id", "status", "deck_name", "options", "error", "created", "started", "finished")}
+    view["result"] = f"/jobs/{job['id']}/result" if job["status"] == "done" else None
+    return view
+
+JOB_PATH = re.compile(r"^/jobs/([0-9a-f]{32})(/result)?$")
+
+class ServiceHandler(BaseHTTPRequestHandler):
+    """Routes: POST /jobs, GET /jobs/<id>, GET /jobs/<id>/result, GET /health"""
+
+    service = None  # set by make_server
+    server_version = "PitchDeckAnalyzer/1.0"
+    protocol_version = "HTTP/1.1"  # keep-alive, and answers `Expect: 100-continue` before large uploads
+
+    def _send(self, code: int, body, content_type: str = "application/json", headers: dict = None):
+        data = body.encode("utf-8") if isinstance(body, str) else json.dumps(body).encode("utf-8")
+        self.send_response(code)
+        self.send_header("Content-Type", f"{content_type}; charset=utf-8")
+        self.send_header("Content-Length", str(len(data)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_POST(self):
+        url = urlparse(self.path)
+        if url.path != "/jobs":
+            self.close_connection = True  # the unread body must not be parsed as the next request
+            return self._send(404, {"error": "not found"})
+        query = parse_qs(url.query)
+        deck_name = (query.get("filename") or [self.headers.get("X-Filename", "")])[-1]
+        try:
+            length = int(self.headers.get("Content-Length", ""))
+        except ValueError:
+            self.close_connection = True
+            return self._send(411, {"error": "Content-Length required"})
+        if length > SERVICE_MAX_UPLOAD_BYTES:
+            self.close_connection = True
+            return self._send(413, {"error": f"deck larger than {SERVICE_MAX_UPLOAD_BYTES} bytes"})
+        data = self.rfile.read(length)
+        try:
+            options = parse_job_options(query)
+            job_id = self.service.submit(deck_name, data, options)
+        except QueueFull as e:
+            return self._send(429, {"error": f"queue full: {e}"}, headers={"Retry-After": "30"})
+        except ValueError as e:
+            return self._send(400, {"error": str(e)})
+        job = self.service.store.get(job_id)
+        self._send(202, _job_view(job), headers={"Location": f"/jobs/{job_id}"})
+
+    def do_GET(self):
+        path = urlparse(self.path).path
+        if path == "/health":
+            return self._send(200, self.service.status())
+        m = JOB_PATH.match(path)
+        job = self.service.store.get(m.group(1)) if m else None
+        if job is None:
+            return self._send(404, {"error": "not found"})
+        if not m.group(2):
+            return self._send(200, _job_view(job))
+        if job["status"] != "done":
+            return self._send(409, _job_view(job))
+        try:
+            report = Path(job["report_path"]).read_text(encoding="utf-8")
+        except OSError:
+            return self._send(410, {"error": "report file is gone"})
+        self._send(200, report, content_type="text/markdown")
+
+    def log_message(self, format, *args):
+        print(f"[service] {self.address_string()} {format % args}")
+
+def make_server(service: AnalysisService, host: str = "127.0.0.1", port: int = 8080) -> ThreadingHTTPServer:
+    handler = type("BoundServiceHandler", (ServiceHandler,), {"service": service})
+    return ThreadingHTTPServer((host, port), handler)
+
+def serve(host: str = "127.0.0.1", port: int = 8080, **service_kwargs):
+    """Run the service until interrupted; queued jobs are picked up again on the next start"""
+    service = AnalysisService(**service_kwargs)
+    service.start()
+    server = make_server(service, host, port)
+    print(f"Serving on http://{host}:{server.server_port} ({service.workers} workers, queue of {service.queue_size})")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("Shutting down; waiting for running jobs to finish (Ctrl+C again to abort)")
+    finally:
+        server.server_close()
+        service.close()
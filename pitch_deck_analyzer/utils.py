@@ -2,27 +2,19 @@
 Utility functions
 """
 
+import importlib.util
 import sys
 from pathlib import Path
 
-def ensure_requirements():
-    """Check if required packages are installed"""
-    missing = []
-    try:
-        import fitz
-    except ImportError:
-        missing.append("PyMuPDF (fitz)")
-    
-    try:
-        from pptx import Presentation
-    except ImportError:
-        missing.append("python-pptx")
-    
-    try:
-        from PIL import Image
-    except ImportError:
-        missing.append("Pillow")
-    
+def ensure_requirements(suffixes=None):
+    """Check that the packages needed for these deck formats (default: all) are installed, without importing them"""
+    required = [("PIL", "Pillow")]
+    if suffixes is None or ".pdf" in suffixes:
+        required.append(("fitz", "PyMuPDF (fitz)"))
+    if suffixes is None or ".pptx" in suffixes:
+        required.append(("pptx", "python-pptx"))
+
+    missing = [package for module, package in required if importlib.util.find_spec(module) is None]
     if missing:
         print("Missing required packages: " + ", ".join(missing))
         print("Run: pip install -r requirements.txt")
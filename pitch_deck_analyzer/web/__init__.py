@@ -2,7 +2,25 @@
 Web search and content fetching
 """
 
-from .search import duckduckgo_search
-from .fetcher import fetch_page_text
+import importlib
 
-__all__ = ['duckduckgo_search', 'fetch_page_text']
\ No newline at end of file
+# Exported name -> submodule; submodules (and requests / BeautifulSoup behind them) load on first access
+_EXPORTS = {
+    'duckduckgo_search': '.search',
+    'fetch_page_text': '.fetcher',
+    'fetch_pages': '.fetcher',
+    'PageCache': '.cache',
+    'open_page_cache': '.cache',
+}
+
+__all__ = list(_EXPORTS)
+
+def __getattr__(name):
+    if name in _EXPORTS:
+        value = getattr(importlib.import_module(_EXPORTS[name], __name__), name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+def __dir__():
+    return sorted(set(globals()) | set(_EXPORTS))
@@ -0,0 +1,63 @@
+"""
+HTTP cache for fetched pages and search results
+"""
+
+import json
+import time
+from pathlib import Path
+from pitch_deck_analyzer.cache import DiskCache
+from pitch_deck_analyzer.config import CACHE_DIR, WEB_CACHE_MAX_BYTES, WEB_SEARCH_TTL
+
+class PageCache:
+    """Stores raw bodies, extracted text and validators per URL, plus search result lists.
+
+    `backend` is any DiskCache-compatible store (DiskCache, MemoryCache, ...).
+    """
+
+    def __init__(self, backend, search_ttl: float = WEB_SEARCH_TTL):
+        self.backend = backend
+        self.search_ttl = search_ttl
+
+    def get_page(self, url: str) -> dict:
+        """Cached entry for `url` ({body, text, etag, last_modified, fetched}) or None"""
+        raw = self.backend.get("page:" + url)
+        return json.loads(raw) if raw is not None else None
+
+    def put_page(self, url: str, body: str, text: str, etag: str = None, last_modified: str = None):
+        entry = {"body": body, "text": text, "etag": etag, "last_modified": last_modified, "fetched": time.time()}
+        self.backend.set("page:" + url, json.dumps(entry))
+
+    def conditional_headers(self, entry: dict) -> dict:
+        """If-None-Match / If-Modified-Since headers to revalidate a cached page"""
+        headers = {}
+        if entry and entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry and entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+        return headers
+
+    def get_search(self, query: str, max_results: int) -> list:
+        """Cached result links for a query, or None if missing or older than `search_ttl`"""
+        raw = self.backend.get(f"search:{max_results}:{query}")
+        if raw is None:
+            return None
+        entry = json.loads(raw)
+        if time.time() - entry["fetched"] > self.search_ttl:
+            return None
+        return entry["links"]
+
+    def put_search(self, query: str, max_results: int, links: list):
+        self.backend.set(f"search:{max_results}:{query}", json.dumps({"links": links, "fetched": time.time()}))
+
+    def stats(self) -> dict:
+        return self.backend.stats()
+
+    def clear(self):
+        self.backend.clear()
+
+    def close(self):
+        self.backend.close()
+
+def open_page_cache(path: str = None) -> PageCache:
+    """Open the on-disk web cache"""
+    return PageCache(DiskCache(path or Path(CACHE_DIR) / "web.sqlite3", max_bytes=WEB_CACHE_MAX_BYTES))
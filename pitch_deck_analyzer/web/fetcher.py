@@ -2,35 +2,263 @@
 Web page content fetching
 """
 
+import codecs
+import threading
 import requests
-from bs4 import BeautifulSoup
-from pitch_deck_analyzer.config import USER_AGENT
+from concurrent.futures import ThreadPoolExecutor, as_completed, TimeoutError as FuturesTimeout
+from html.parser import HTMLParser
+from typing import Iterable, List, Tuple
+from urllib.parse import urlparse
+from pitch_deck_analyzer.config import USER_AGENT, MAX_SEARCH_RESULTS
+from pitch_deck_analyzer.config import WEB_FETCH_WORKERS, WEB_FETCH_PER_HOST, WEB_FETCH_DEADLINE
+from pitch_deck_analyzer.config import WEB_MAX_BODY_BYTES, WEB_MAX_PARAGRAPHS
+from pitch_deck_analyzer.web.cache import PageCache
+from pitch_deck_analyzer.profiling import span, submit
 
-def fetch_page_text(url: str) -> str:
-    """Fetch and extract main text content from web page"""
-    headers = {"User-Agent": USER_AGENT}
-    
+HTML_TYPES = ("text/html", "application/xhtml+xml")
+CHUNK_BYTES = 64 * 1024  # larger chunks mean fewer re-scans of long <script> bodies by HTMLParser
+
+class PageTextParser(HTMLParser):
+    """Incremental extractor for the title, meta description and first `max_paragraphs` <p> elements.
+
+    Fed chunk by chunk; `done` turns true once enough paragraphs have been seen, so the caller can
+    stop reading the body. Text inside <script>, <style> and similar elements is ignored. A <p> without
+    </p> ends at the next <p>, at </body> or </html>, or at the end of the document.
+    """
+
+    SKIP = {"script", "style", "noscript", "template", "svg"}
+
+    def __init__(self, max_paragraphs: int = None):
+        super().__init__(convert_charrefs=True)
+        self.max_paragraphs = WEB_MAX_PARAGRAPHS if max_paragraphs is None else max_paragraphs
+        self.title = None
+        self.description = None
+        self.og_description = None
+        self.paragraphs = []
+        self.seen = 0
+        self._title = None
+        self._paragraph = None
+        self._depth = 0  # nesting inside the open <p>
+        self._skip = 0
+
+    @property
+    def done(self) -> bool:
+        return self.seen >= self.max_paragraphs
+
+    def handle_starttag(self, tag, attrs):
+        if tag in self.SKIP:
+            self._skip += 1
+        elif tag == "title" and self.title is None:
+            self._title = []
+        elif tag == "meta":
+            attrs = dict(attrs)
+            if attrs.get("name", "").lower() == "description" and self.description is None:
+                self.description = attrs.get("content")
+            elif attrs.get("property", "").lower() == "og:description" and self.og_description is None:
+                self.og_description = attrs.get("content")
+        elif tag == "p":
+            if self._paragraph is not None:
+                self._close_paragraph()  # an unclosed <p> ends where the next one starts
+            if not self.done:
+                self._paragraph = []
+                self._depth = 0
+        elif self._paragraph is not None:
+            self._depth += 1
+
+    def handle_endtag(self, tag):
+        if tag in self.SKIP:
+            self._skip = max(0, self._skip - 1)
+        elif tag == "title" and self._title is not None:
+            self.title = "".join(self._title).strip()
+            self._title = None
+        elif tag in ("p", "body", "html") and self._paragraph is not None:
+            self._close_paragraph()
+        elif self._paragraph is not None and self._depth:
+            self._depth -= 1
+
+    def handle_data(self, data):
+        if self._skip:
+            return
+        if self._title is not None:
+            self._title.append(data)
+        if self._paragraph is not None:
+            self._paragraph.append(data)
+
+    def _close_paragraph(self):
+        text = "".join(self._paragraph).strip()
+        self._paragraph = None
+        self.seen += 1
+        if len(text) > 30:
+            self.paragraphs.append(text)
+
+    def close(self):
+        super().close()
+        if self._paragraph is not None:
+            self._close_paragraph()
+
+    def text(self) -> str:
+        if self._paragraph is not None:
+            self._close_paragraph()
+        parts = [self.title] if self.title else []
+        description = self.description or self.og_description
+        if description and description.strip():
+            parts.append(description.strip())
+        return "\n\n".join(parts + self.paragraphs)
+
+def extract_page_text(chunks: Iterable[bytes], encoding: str = None, max_bytes: int = None,
+                      max_paragraphs: int = None, keep_body: bool = False) -> Tuple[str, int, str]:
+    """Feed body chunks through PageTextParser until it has enough paragraphs or `max_bytes` were read.
+
+    Returns (text, bytes read, decoded body read so far if `keep_body` else "").
+    """
+    max_bytes = WEB_MAX_BODY_BYTES if max_bytes is None else max_bytes
+    parser = PageTextParser(max_paragraphs)
+    decoder = codecs.getincrementaldecoder(encoding or "utf-8")(errors="replace")
+    body, read = [], 0
+    for chunk in chunks:
+        if not chunk:
+            continue
+        chunk = chunk[:max(0, max_bytes - read)]
+        read += len(chunk)
+        html = decoder.decode(chunk)
+        if keep_body:
+            body.append(html)
+        parser.feed(html)
+        if parser.done or read >= max_bytes:
+            break
+    else:
+        parser.feed(decoder.decode(b"", final=True))
+    parser.close()
+    return parser.text(), read, "".join(body)
+
+def _encoding(resp: requests.Response) -> str:
+    """Charset declared in the Content-Type header (requests' ISO-8859-1 default for text/* is ignored)"""
+    content_type = resp.headers.get("Content-Type", "")
+    if "charset=" not in content_type.lower():
+        return None
     try:
-        r = requests.get(url, headers=headers, timeout=12, allow_redirects=True)
-        if r.status_code != 200:
+        return codecs.lookup(resp.encoding).name if resp.encoding else None
+    except LookupError:
+        return None
+
+def _until(chunks: Iterable[bytes], stop: threading.Event) -> Iterable[bytes]:
+    for chunk in chunks:
+        if stop.is_set():
+            return
+        yield chunk
+
+def fetch_page_text(url: str, cache: PageCache = None, session: requests.Session = None,
+                    stop: threading.Event = None) -> str:
+    """Fetch and extract main text content from web page.
+
+    The body is streamed: non-HTML responses are skipped and reading stops once enough paragraphs
+    are extracted or WEB_MAX_BODY_BYTES were read. With a cache, known pages are revalidated with
+    a conditional GET and a 304 reuses the stored text without re-parsing; on network errors the
+    stored text is served. Once `stop` is set the body is no longer read and nothing is cached.
+    """
+    with span("web.fetch", host=urlparse(url).netloc) as s:
+        headers = {"User-Agent": USER_AGENT}
+        entry = cache.get_page(url) if cache is not None else None
+        if entry:
+            headers.update(cache.conditional_headers(entry))
+
+        try:
+            with (session or requests).get(url, headers=headers, timeout=12, allow_redirects=True, stream=True) as r:
+                s.set(status=r.status_code)
+                if r.status_code == 304 and entry:
+                    s.set(cache_hits=1)
+                    return entry["text"]
+                if r.status_code != 200:
+                    return ""
+                content_type = r.headers.get("Content-Type", "").split(";")[0].strip().lower()
+                if content_type and content_type not in HTML_TYPES:
+                    s.set(skipped=content_type)
+                    return ""
+                chunks = r.iter_content(CHUNK_BYTES)
+                if stop is not None:
+                    if stop.is_set():
+                        s.set(status="stopped")
+                        return ""
+                    chunks = _until(chunks, stop)
+                text, read, body = extract_page_text(chunks, _encoding(r), keep_body=cache is not None)
+                s.set(response_bytes=read)
+        except Exception as e:
+            s.set(status=type(e).__name__, cache_hits=1 if entry else 0)
+            return entry["text"] if entry else ""
+
+        if stop is not None and stop.is_set():
             return ""
-    except Exception:
-        return ""
-
-    soup = BeautifulSoup(r.text, "html.parser")
-    parts = []
-    
-    if soup.title and soup.title.text:
-        parts.append(soup.title.text.strip())
-    
-    meta = soup.find('meta', attrs={'name': 'description'}) or soup.find('meta', attrs={'property': 'og:description'})
-    if meta and meta.get('content'):
-        parts.append(meta.get('content').strip())
-
-    ps = soup.find_all('p')
-    for p in ps[:10]:
-        txt = p.get_text().strip()
-        if txt and len(txt) > 30:
-            parts.append(txt)
-    
-    return "\n\n".join(parts)
\ No newline at end of file
+        if cache is not None:
+            cache.put_page(url, body, text, r.headers.get("ETag"), r.headers.get("Last-Modified"))
+        return text
+
+class _GatedCache:
+    """PageCache view for fetch_pages workers: after `stop()` returns no worker reads or writes the cache,
+    so the caller may close it while abandoned fetches are still running"""
+
+    def __init__(self, cache: PageCache, stopped: threading.Event):
+        self._cache = cache
+        self._stopped = stopped
+        self._lock = threading.Lock()
+
+    def get_page(self, url: str) -> dict:
+        with self._lock:
+            return None if self._stopped.is_set() else self._cache.get_page(url)
+
+    def put_page(self, *args, **kwargs):
+        with self._lock:
+            if not self._stopped.is_set():
+                self._cache.put_page(*args, **kwargs)
+
+    def conditional_headers(self, entry: dict) -> dict:
+        return self._cache.conditional_headers(entry)
+
+    def stop(self):
+        with self._lock:  # waits for a read or write in progress
+            self._stopped.set()
+
+def fetch_pages(urls: list, limit: int = MAX_SEARCH_RESULTS, max_workers: int = WEB_FETCH_WORKERS,
+                per_host: int = WEB_FETCH_PER_HOST, deadline: float = WEB_FETCH_DEADLINE,
+                cache: PageCache = None) -> List[Tuple[str, str]]:
+    """Fetch URLs concurrently and return the first `limit` pages with text, as (url, text) in search order.
+
+    At most `per_host` requests hit the same host at once. Fetching stops once `limit` pages have
+    arrived or `deadline` seconds have passed; pending fetches are cancelled and not waited on, and
+    those still running stop reading and never touch `cache` after this returns.
+    """
+    if not urls or limit <= 0:
+        return []
+
+    stop = threading.Event()
+    gated = _GatedCache(cache, stop) if cache is not None else None
+    host_slots = {}
+    for url in urls:
+        host_slots.setdefault(urlparse(url).netloc.lower(), threading.Semaphore(per_host))
+
+    def fetch(url):
+        with host_slots[urlparse(url).netloc.lower()]:
+            if stop.is_set():
+                return ""
+            return fetch_page_text(url, cache=gated, stop=stop)
+
+    rank = {url: i for i, url in enumerate(urls)}
+    pages = []
+    pool = ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(urls))))
+    try:
+        futures = {submit(pool, fetch, url): url for url in urls}
+        for future in as_completed(futures, timeout=deadline):
+            text = future.result()
+            if text:
+                pages.append((futures[future], text))
+            if len(pages) >= limit:
+                break
+    except FuturesTimeout:
+        print(f"Web fetch deadline ({deadline}s) reached with {len(pages)} pages")
+    finally:
+        if gated is not None:
+            gated.stop()
+        else:
+            stop.set()
+        pool.shutdown(wait=False, cancel_futures=True)
+
+    return sorted(pages, key=lambda page: rank[page[0]])
@@ -5,7 +5,9 @@ DuckDuckGo search functionality
 import requests
 from bs4 import BeautifulSoup
 from urllib.parse import urlparse, parse_qs, unquote, urljoin
-from pitch_deck_analyzer.config import USER_AGENT, MAX_SEARCH_RESULTS
+from pitch_deck_analyzer.config import USER_AGENT, MAX_SEARCH_RESULTS, DUCKDUCKGO_URL
+from pitch_deck_analyzer.web.cache import PageCache
+from pitch_deck_analyzer.profiling import span
 
 def _unwrap_duckduckgo_redirect(href: str) -> str:
     """Unwrap DuckDuckGo redirect URLs"""
@@ -18,46 +20,58 @@ def _unwrap_duckduckgo_redirect(href: str) -> str:
         pass
     return href
 
-def duckduckgo_search(query: str, max_results: int = MAX_SEARCH_RESULTS):
-    """Perform DuckDuckGo search and return cleaned URLs"""
-    url = "https://duckduckgo.com/html/"
-    headers = {"User-Agent": USER_AGENT}
+def duckduckgo_search(query: str, max_results: int = MAX_SEARCH_RESULTS, cache: PageCache = None):
+    """Perform DuckDuckGo search and return cleaned URLs; results are cached for the cache's search TTL"""
+    with span("web.search") as s:
+        if cache is not None:
+            cached = cache.get_search(query, max_results)
+            if cached is not None:
+                s.set(cache_hits=1, items=len(cached))
+                return cached
+
+        url = DUCKDUCKGO_URL
+        headers = {"User-Agent": USER_AGENT}
     
-    try:
-        resp = requests.get(url, params={"q": query}, headers=headers, timeout=15)
-        resp.raise_for_status()
-    except Exception as e:
-        print(f"DuckDuckGo search failed: {e}")
-        return []
-
-    soup = BeautifulSoup(resp.text, "html.parser")
-    links = []
-
-    for a in soup.select("a.result__a"):
-        href = a.get('href') or a.get('data-href')
-        if not href:
-            continue
-        href = _unwrap_duckduckgo_redirect(href)
-        if href.startswith('/'):
-            href = urljoin('https://duckduckgo.com', href)
-        links.append(href)
-        if len(links) >= max_results:
-            break
-
-    if not links:
-        for a in soup.select('a[href]'):
-            h = a.get('href')
-            if h and h.startswith('http'):
-                links.append(h)
+        try:
+            resp = requests.get(url, params={"q": query}, headers=headers, timeout=15)
+            resp.raise_for_status()
+            s.set(status=resp.status_code, response_bytes=len(resp.content))
+        except Exception as e:
+            print(f"DuckDuckGo search failed: {e}")
+            return []
+
+        soup = BeautifulSoup(resp.text, "html.parser")
+        links = []
+
+        for a in soup.select("a.result__a"):
+            href = a.get('href') or a.get('data-href')
+            if not href:
+                continue
+            href = _unwrap_duckduckgo_redirect(href)
+            if href.startswith('/'):
+                href = urljoin(url, href)
+            links.append(href)
             if len(links) >= max_results:
                 break
 
-    cleaned = []
-    seen = set()
-    for link in links:
-        if not link or link in seen:
-            continue
-        seen.add(link)
-        cleaned.append(link)
+        if not links:
+            for a in soup.select('a[href]'):
+                h = a.get('href')
+                if h and h.startswith('http'):
+                    links.append(h)
+                if len(links) >= max_results:
+                    break
+
+        cleaned = []
+        seen = set()
+        for link in links:
+            if not link or link in seen:
+                continue
+            seen.add(link)
+            cleaned.append(link)
     
-    return cleaned[:max_results]
\ No newline at end of file
+        cleaned = cleaned[:max_results]
+        s.set(items=len(cleaned))
+        if cache is not None and cleaned:
+            cache.put_search(query, max_results, cleaned)
+        return cleaned
\ No newline at end of file